@@ -0,0 +1,5 @@
+from .utils import startup_profile
+
+# Must run before the rest of the package is imported so that module import
+# times are captured when STARTUP_PROFILE is enabled.
+startup_profile.install()
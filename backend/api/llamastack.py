@@ -1,12 +1,12 @@
 import logging
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from dotenv import load_dotenv
 from fastapi import Request
-from llama_stack_client import AsyncLlamaStackClient
 
-from ..virtual_agents.agent_resource import EnhancedAgentResource
+if TYPE_CHECKING:
+    from llama_stack_client import AsyncLlamaStackClient
 
 load_dotenv()
 
@@ -52,7 +52,7 @@ def get_sa_token() -> Optional[str]:
 
 def get_client(
     api_key: Optional[str], headers: Optional[dict[str, str]] = None
-) -> AsyncLlamaStackClient:
+) -> "AsyncLlamaStackClient":
     """
     Create an AsyncLlamaStackClient with the given configuration.
 
@@ -63,6 +63,12 @@ def get_client(
     Returns:
         AsyncLlamaStackClient: Configured client instance
     """
+    # Imported on first use: llama_stack_client is one of the heaviest
+    # imports in the process and is not needed until a request arrives.
+    from llama_stack_client import AsyncLlamaStackClient
+
+    from ..virtual_agents.agent_resource import EnhancedAgentResource
+
     client = AsyncLlamaStackClient(
         base_url=LLAMASTACK_URL,
         default_headers=headers or {},
@@ -73,7 +79,7 @@ def get_client(
     return client
 
 
-def get_client_from_request(request: Optional[Request]) -> AsyncLlamaStackClient:
+def get_client_from_request(request: Optional[Request]) -> "AsyncLlamaStackClient":
     """
     Create a client configured with authentication from the request context.
 
@@ -129,6 +135,13 @@ def get_user_headers_from_request(request: Optional[Request]) -> dict[str, str]:
     if request is None:
         return headers
 
+    # Parsed once per request by IdentityMiddleware; the auth request context
+    # posted to /validate has headers but no request state
+    state = getattr(request, "state", None)
+    identity = getattr(state, "identity", None)
+    if identity is not None:
+        return identity.headers
+
     # Get user header
     user_header = get_header_case_insensitive(request, "X-Forwarded-User")
     if user_header:
@@ -142,7 +155,26 @@ def get_user_headers_from_request(request: Optional[Request]) -> dict[str, str]:
     return headers
 
 
-def get_sync_client() -> AsyncLlamaStackClient:
+_sync_client: Optional["AsyncLlamaStackClient"] = None
+
+
+def get_sync_client() -> "AsyncLlamaStackClient":
+    """
+    Get the shared sync client with admin credentials.
+
+    The client is created on first use rather than at import time, so that
+    importing this module stays cheap during cold start.
+
+    Returns:
+        AsyncLlamaStackClient: Configured client instance with admin credentials
+    """
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = create_sync_client()
+    return _sync_client
+
+
+def create_sync_client() -> "AsyncLlamaStackClient":
     """
     Create a sync client with admin credentials.
 
@@ -165,7 +197,3 @@ def get_sync_client() -> AsyncLlamaStackClient:
         logger.warning("ADMIN_USERNAME environment variable not set")
 
     return get_client(token, headers)
-
-
-# Create sync client instance
-sync_client = get_sync_client()
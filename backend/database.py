@@ -1,32 +1,359 @@
 """
 Database configuration and session management for PostgreSQL with SQLAlchemy async.
 
-This module sets up the async database engine and provides session management
-for the AI Virtual Assistant application.
+This module sets up the async database engines and provides session management
+for the AI Virtual Assistant application. Two engine profiles are created:
+
+- "api": serves request handlers through get_db()
+- "background": serves sync workers and reconcilers, so long running syncs
+  cannot exhaust the connections available to requests
+
+When DATABASE_REPLICA_URL is set, a "replica" engine serves read-only routes
+through get_read_db(). Reads fall back to the primary while the replica is
+unhealthy or lagging, and for DB_READ_AFTER_WRITE_SECONDS after the same
+request or caller wrote to the primary, so callers always read their writes.
+
+Every setting is read from the environment; a DB_BACKGROUND_* or
+DB_REPLICA_* variable overrides the matching DB_* variable for that profile.
+
+Environment variables:
+- DB_POOL_SIZE / DB_MAX_OVERFLOW: Persistent and burst connections per pool
+- DB_POOL_TIMEOUT: Seconds to wait for a free connection before failing
+- DB_POOL_RECYCLE: Seconds after which connections are replaced
+- DB_POOL_PRE_PING: "true" to test connections on checkout
+- DB_STATEMENT_CACHE_SIZE: asyncpg prepared statement cache size per
+  connection (set to 0 behind PgBouncer in transaction mode)
+- DB_ECHO: "true" to log every SQL statement
+- DB_READ_AFTER_WRITE_SECONDS: How long a caller's reads stay on the primary
+- DB_REPLICA_MAX_LAG_SECONDS: Replication lag above which the replica is skipped
+- DB_REPLICA_CHECK_SECONDS: Interval between replica health checks
 """
 
+import asyncio
 import os
+import time
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .utils import metrics, query_stats
+from .utils.cache import TTLCache
+from .utils.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+DB_READ_AFTER_WRITE_SECONDS = float(os.getenv("DB_READ_AFTER_WRITE_SECONDS", "5"))
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "2"))
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))
+
+PROFILE_DEFAULTS: Dict[str, Dict[str, str]] = {
+    "api": {"POOL_SIZE": "10", "MAX_OVERFLOW": "20"},
+    "background": {"POOL_SIZE": "2", "MAX_OVERFLOW": "3"},
+    "replica": {"POOL_SIZE": "10", "MAX_OVERFLOW": "20"},
+}
+COMMON_DEFAULTS = {
+    "POOL_TIMEOUT": "30",
+    "POOL_RECYCLE": "1800",
+    "POOL_PRE_PING": "true",
+    "STATEMENT_CACHE_SIZE": "100",
+    "ECHO": "false",
+}
+
+
+def _setting(profile: str, name: str) -> str:
+    default = PROFILE_DEFAULTS[profile].get(name, COMMON_DEFAULTS.get(name))
+    value = os.getenv(f"DB_{name}", default)
+    if profile != "api":
+        value = os.getenv(f"DB_{profile.upper()}_{name}", value)
+    return value
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+
+def instrumented_pool_class(profile: str) -> type:
+    """
+    Build a queue pool class that records how long checkouts wait.
+
+    Pool events only fire once a connection has been handed out, so the wait
+    is timed around Pool.connect(), the public checkout entry point.
+
+    Args:
+        profile: Profile name used as the metric's pool label
+
+    Returns:
+        type: AsyncAdaptedQueuePool subclass for the profile
+    """
+
+    class InstrumentedPool(AsyncAdaptedQueuePool):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                metrics.observe(
+                    "db_pool_wait", time.perf_counter() - start, pool=profile
+                )
+
+    return InstrumentedPool
+
+
+def _record_pool_usage(pool: Any, profile: str) -> None:
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return
+    metrics.set_gauge("db_pool_checked_out", pool.checkedout(), pool=profile)
+    metrics.set_gauge("db_pool_overflow", max(pool.overflow(), 0), pool=profile)
+
+
+def engine_options(profile: str, url: str) -> Dict[str, Any]:
+    """
+    Build create_async_engine() keyword arguments for a profile.
+
+    Args:
+        profile: "api", "background" or "replica"
+        url: Database URL, used to skip options the driver does not support
+
+    Returns:
+        Dict[str, Any]: Engine keyword arguments
+    """
+    options: Dict[str, Any] = {
+        "echo": _flag(_setting(profile, "ECHO")),
+        "pool_pre_ping": _flag(_setting(profile, "POOL_PRE_PING")),
+        "pool_logging_name": profile,
+    }
+    if url.startswith("sqlite"):
+        # SQLite uses its own single-connection pools
+        return options
+
+    options.update(
+        poolclass=instrumented_pool_class(profile),
+        pool_size=int(_setting(profile, "POOL_SIZE")),
+        max_overflow=int(_setting(profile, "MAX_OVERFLOW")),
+        pool_timeout=float(_setting(profile, "POOL_TIMEOUT")),
+        pool_recycle=int(_setting(profile, "POOL_RECYCLE")),
+    )
+    if "+asyncpg" in url:
+        cache_size = int(_setting(profile, "STATEMENT_CACHE_SIZE"))
+        # statement_cache_size is asyncpg's own cache; the dialect keeps a
+        # second prepared statement cache that must be sized the same
+        options["connect_args"] = {
+            "statement_cache_size": cache_size,
+            "prepared_statement_cache_size": cache_size,
+        }
+    return options
+
+
+def create_engine_for_profile(profile: str, url: str = DATABASE_URL) -> AsyncEngine:
+    """
+    Create an async engine for a profile and attach pool metrics.
+
+    Args:
+        profile: "api", "background" or "replica"
+        url: Database URL
+
+    Returns:
+        AsyncEngine: The configured engine
+    """
+    db_engine = create_async_engine(url, **engine_options(profile, url))
+    if query_stats.QUERY_STATS_ENABLED:
+        query_stats.instrument_engine(db_engine)
+
+    @event.listens_for(db_engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("db_pool_checkouts", pool=profile)
+        _record_pool_usage(db_engine.sync_engine.pool, profile)
+
+    @event.listens_for(db_engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        _record_pool_usage(db_engine.sync_engine.pool, profile)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+    return db_engine
+
+
+engine = create_engine_for_profile("api")
+background_engine = create_engine_for_profile("background")
 
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
+BackgroundSessionLocal = sessionmaker(
+    bind=background_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+replica_engine: Optional[AsyncEngine] = None
+ReplicaSessionLocal = None
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine_for_profile("replica", DATABASE_REPLICA_URL)
+    ReplicaSessionLocal = sessionmaker(
+        bind=replica_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+# Callers (forwarded identities) that recently wrote to the primary
+_recent_writers = TTLCache(10000, DB_READ_AFTER_WRITE_SECONDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_statement_write(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["wrote"] = True
+
+
+def _caller_key(request: Request) -> Optional[Any]:
+    identity = getattr(request.state, "identity", None)
+    if identity is None or identity.is_anonymous:
+        return None
+    return identity
+
+
+def record_write(request: Request) -> None:
+    """Pin the request and its caller to the primary after a write."""
+    request.state.wrote_to_primary = True
+    caller = _caller_key(request)
+    if caller is not None:
+        _recent_writers.set(caller, True)
+
+
+class ReplicaHealth:
+    """Tracks whether the read replica is reachable and caught up."""
+
+    def __init__(self):
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def mark_unhealthy(self, error: str) -> None:
+        if self.healthy:
+            logger.warning(f"Read replica marked unhealthy: {error}")
+        self.healthy = False
+        self.last_error = error
+        metrics.set_gauge("db_replica_healthy", 0)
+
+    async def check(self) -> bool:
+        """
+        Measure replication lag and update the health state.
+
+        Returns:
+            bool: True if reads may be sent to the replica
+        """
+        try:
+            async with replica_engine.connect() as connection:
+                # An idle primary produces no replay timestamps, so a replica
+                # that has replayed everything it received counts as lag 0
+                result = await connection.execute(
+                    text(
+                        "SELECT CASE"
+                        " WHEN NOT pg_is_in_recovery() THEN 0"
+                        " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()"
+                        " THEN 0"
+                        " ELSE COALESCE(EXTRACT(EPOCH FROM"
+                        " now() - pg_last_xact_replay_timestamp()), 0)"
+                        " END"
+                    )
+                )
+                self.lag_seconds = float(result.scalar() or 0)
+        except Exception as e:
+            self.mark_unhealthy(str(e))
+            return False
 
+        metrics.set_gauge("db_replica_lag_seconds", self.lag_seconds)
+        if self.lag_seconds > DB_REPLICA_MAX_LAG_SECONDS:
+            self.mark_unhealthy(f"replication lag {self.lag_seconds:.1f}s")
+            return False
+        if not self.healthy:
+            logger.info("Read replica is healthy")
+        self.healthy = True
+        self.last_error = None
+        metrics.set_gauge("db_replica_healthy", 1)
+        return True
 
-async def get_db():
+
+replica_health = ReplicaHealth()
+
+
+async def run_replica_health_checks() -> None:
+    """Check the read replica every DB_REPLICA_CHECK_SECONDS until cancelled."""
+    if replica_engine is None:
+        return
+    while True:
+        await replica_health.check()
+        await asyncio.sleep(DB_REPLICA_CHECK_SECONDS)
+
+
+def use_replica(request: Request) -> bool:
+    """Decide whether a read-only request may be served by the replica."""
+    if ReplicaSessionLocal is None or not replica_health.healthy:
+        return False
+    if getattr(request.state, "wrote_to_primary", False):
+        return False
+    caller = _caller_key(request)
+    return caller is None or _recent_writers.get(caller) is None
+
+
+async def get_db(request: Request):
     """
     Dependency function that provides database sessions for FastAPI endpoints.
 
+    Writes made through the session pin the caller's reads to the primary
+    for DB_READ_AFTER_WRITE_SECONDS.
+
+    Args:
+        request: Current request
+
     Yields:
         AsyncSession: Database session that automatically handles cleanup
     """
     async with AsyncSessionLocal() as session:
-        yield session
+        try:
+            yield session
+        finally:
+            if session.info.get("wrote"):
+                record_write(request)
+
+
+async def get_read_db(request: Request):
+    """
+    Dependency providing a session for read-only endpoints.
+
+    The session is bound to the read replica when one is configured, healthy
+    and the caller has not just written; otherwise to the primary.
+
+    Args:
+        request: Current request
+
+    Yields:
+        AsyncSession: Database session that automatically handles cleanup
+    """
+    if not use_replica(request):
+        metrics.increment("db_reads", target="primary")
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+
+    metrics.increment("db_reads", target="replica")
+    async with ReplicaSessionLocal() as session:
+        try:
+            yield session
+        except (DBAPIError, OSError) as e:
+            # Send following reads to the primary until the next check passes
+            replica_health.mark_unhealthy(str(e))
+            raise
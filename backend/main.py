@@ -18,24 +18,30 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
-from kubernetes import client, config
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from .database import AsyncSessionLocal
+from . import database
+from .database import BackgroundSessionLocal
 from .routes import (
     chat_sessions,
     guardrails,
     knowledge_bases,
     llama_stack,
     mcp_servers,
+    metrics,
     model_servers,
     tools,
     users,
     validate,
     virtual_assistants,
 )
+from .services import drift_reconciler, leader, sync_outbox
+from .services.identity import IdentityMiddleware
+from .utils import query_stats, startup_profile
 from .utils.logging_config import get_logger, setup_logging
 
+startup_profile.mark("application modules imported")
+
 load_dotenv()
 
 # Configure centralized logging
@@ -59,6 +65,9 @@ def wait_for_service_ready(
     interval_seconds: int = 5,
 ) -> bool:
     """Wait for a Kubernetes service to be ready."""
+    # Imported lazily: the kubernetes client is large and only needed here
+    from kubernetes import client, config
+
     start_time = time.time()
 
     while time.time() - start_time < timeout_seconds:
@@ -104,9 +113,10 @@ async def sync_all_services():
 
     for service_name, sync_func in sync_operations:
         try:
-            async with AsyncSessionLocal() as session:
-                await sync_func(session)
-            logger.info(f"Successfully synced {service_name}")
+            with startup_profile.phase(f"sync {service_name}"):
+                async with BackgroundSessionLocal() as session:
+                    result = await sync_func(session)
+            logger.info(f"Successfully synced {service_name}: {result.summary()}")
         except Exception as e:
             logger.error(f"Failed to sync {service_name}: {str(e)}")
 
@@ -118,10 +128,21 @@ async def startup_tasks():
     service_name = "ai-virtual-assistant"
     namespace = get_incluster_namespace()
 
-    if wait_for_service_ready(service_name, namespace):
-        logger.info("Service is ready, proceeding with sync operations.")
-        await sync_all_services()
-        logger.info("All startup tasks completed successfully!")
+    with startup_profile.phase("wait for service ready"):
+        # Run the blocking readiness poll off the event loop so the server
+        # keeps answering requests while it waits
+        service_ready = await asyncio.to_thread(
+            wait_for_service_ready, service_name, namespace
+        )
+
+    if service_ready:
+        # Only one replica syncs; the others pick up leadership on failover
+        if await leader.elector.try_acquire():
+            logger.info("Service is ready, proceeding with sync operations.")
+            await sync_all_services()
+            logger.info("All startup tasks completed successfully!")
+        else:
+            logger.info("Another replica leads LlamaStack sync, skipping it.")
     else:
         logger.error("Service did not become ready within the timeout.")
 
@@ -129,6 +150,7 @@ async def startup_tasks():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("FastAPI app is starting up...")
+    startup_profile.mark("lifespan started")
 
     # Schedule startup tasks to run after server is ready
     async def run_startup_tasks():
@@ -139,22 +161,31 @@ async def lifespan(app: FastAPI):
             await startup_tasks()
         except Exception as e:
             logger.error(f"Error running post-startup tasks: {e}")
+        finally:
+            startup_profile.mark("post-startup tasks finished")
+            startup_profile.report()
+        await leader.run_leader_loop(drift_reconciler.check_all)
 
     # Create background task for startup
     task = asyncio.create_task(run_startup_tasks())
+    # Drain queued LlamaStack syncs; safe to run on every replica
+    outbox_task = asyncio.create_task(sync_outbox.run_worker())
+    replica_task = asyncio.create_task(database.run_replica_health_checks())
     logger.info("Startup event completed, server will start accepting connections")
 
     yield
 
     # Shutdown
     logger.info("FastAPI app is shutting down...")
-    # Cancel the background task if it's still running
-    if not task.done():
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
+    # Cancel the background tasks if they're still running
+    for background_task in (task, outbox_task, replica_task):
+        if not background_task.done():
+            background_task.cancel()
+            try:
+                await background_task
+            except asyncio.CancelledError:
+                pass
+    await validate.close_http_client()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -169,6 +200,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(IdentityMiddleware)
+if query_stats.QUERY_STATS_ENABLED:
+    app.add_middleware(query_stats.QueryStatsMiddleware)
+
 app.include_router(validate.router)
 app.include_router(users.router, prefix="/api")
 app.include_router(mcp_servers.router, prefix="/api")
@@ -179,6 +214,7 @@ app.include_router(guardrails.router, prefix="/api")
 app.include_router(model_servers.router, prefix="/api")
 app.include_router(llama_stack.router, prefix="/api")
 app.include_router(chat_sessions.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 
 class SPAStaticFiles(StaticFiles):
@@ -208,3 +244,5 @@ class SPAStaticFiles(StaticFiles):
 app.mount(
     "/", SPAStaticFiles(directory="backend/public", html=True), name="spa-static-files"
 )
+
+startup_profile.mark("application created")
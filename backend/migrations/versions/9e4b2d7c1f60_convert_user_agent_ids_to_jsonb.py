@@ -0,0 +1,47 @@
+"""convert users.agent_ids to jsonb
+
+Revision ID: 9e4b2d7c1f60
+Revises: 5c0e7d1b9a42
+Create Date: 2026-10-19 11:04:52.618203
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4b2d7c1f60"
+down_revision: Union[str, None] = "5c0e7d1b9a42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column("users", "agent_ids", server_default=None)
+    op.alter_column(
+        "users",
+        "agent_ids",
+        type_=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using="agent_ids::jsonb",
+    )
+    op.alter_column(
+        "users", "agent_ids", server_default=sa.text("'[]'::jsonb")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column("users", "agent_ids", server_default=None)
+    op.alter_column(
+        "users",
+        "agent_ids",
+        type_=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using="agent_ids::json",
+    )
+    op.alter_column("users", "agent_ids", server_default=sa.text("'[]'::json"))
@@ -0,0 +1,34 @@
+"""add GIN index on users.agent_ids
+
+Revision ID: b3f81a6d2e57
+Revises: 9e4b2d7c1f60
+Create Date: 2026-10-19 11:48:13.207519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3f81a6d2e57"
+down_revision: Union[str, None] = "9e4b2d7c1f60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_users_agent_ids",
+        "users",
+        ["agent_ids"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"agent_ids": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_agent_ids", table_name="users")
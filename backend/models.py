@@ -8,13 +8,27 @@ This module defines the database schema and relationships for:
 - Virtual assistants and chat sessions
 - Guardrails for AI safety
 - Model servers for LLM providers
+- Outbox of pending LlamaStack sync operations
 """
 
 import enum
 import uuid
 
-from sqlalchemy import JSON, TIMESTAMP, Boolean, Column, Enum, ForeignKey, String, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    JSON,
+    TIMESTAMP,
+    BigInteger,
+    Boolean,
+    Column,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -32,7 +46,7 @@ class User(Base):
     username = Column(String(255), unique=True, nullable=False)
     email = Column(String(255), unique=True, nullable=False)
     role = Column(Enum(RoleEnum, name="role"), nullable=False)
-    agent_ids = Column(JSON, nullable=False, default=list)
+    agent_ids = Column(JSONB, nullable=False, default=list)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(
         TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -41,6 +55,16 @@ class User(Base):
     knowledge_bases = relationship("KnowledgeBase", back_populates="creator")
     guardrails = relationship("Guardrail", back_populates="creator")
 
+    # jsonb_path_ops serves the "agent_ids @> ..." containment lookups
+    __table_args__ = (
+        Index(
+            "ix_users_agent_ids",
+            "agent_ids",
+            postgresql_using="gin",
+            postgresql_ops={"agent_ids": "jsonb_path_ops"},
+        ),
+    )
+
 
 class MCPServer(Base):
     __tablename__ = "mcp_servers"
@@ -112,3 +136,25 @@ class ModelServer(Base):
     model_name = Column(String(255), nullable=False)
     endpoint_url = Column(String(255), nullable=False)
     token = Column(String(255), nullable=True)
+
+
+class SyncOutbox(Base):
+    """Pending LlamaStack sync for a single entity, written in the same
+    transaction as the entity change and drained by a background worker."""
+
+    __tablename__ = "sync_outbox"
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(String(255), nullable=False)
+    operation = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, server_default="pending")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    last_error = Column(Text, nullable=True)
+    available_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_sync_outbox_status_available_at", "status", "available_at"),
+    )
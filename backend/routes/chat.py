@@ -2,16 +2,19 @@ import asyncio
 import enum
 import json
 import os
-from typing import List
+from typing import TYPE_CHECKING, List
 
 from fastapi import Request
-from llama_stack_client.lib.agents.react.tool_parser import ReActOutput
-from llama_stack_client.types.shared_params.agent_config import AgentConfig, Toolgroup
 
-from ..agents import ExistingAsyncAgent, ExistingReActAgent
 from ..api.llamastack import get_client_from_request
 from ..utils.logging_config import get_logger
 
+if TYPE_CHECKING:
+    from llama_stack_client.types.shared_params.agent_config import (
+        AgentConfig,
+        Toolgroup,
+    )
+
 logger = get_logger(__name__)
 
 
@@ -43,7 +46,7 @@ class Chat:
     def _get_client(self):
         return get_client_from_request(self.request)
 
-    async def _get_agent_config(self, agent_id: str) -> AgentConfig | None:
+    async def _get_agent_config(self, agent_id: str) -> "AgentConfig | None":
         """
         Retrieve agent configuration from LlamaStack.
 
@@ -60,7 +63,7 @@ class Chat:
             self.log.error(f"Error retrieving agent config for {agent_id}: {e}")
             return None
 
-    async def _get_toolgroups_for_agent(self, agent_id: str) -> List[Toolgroup]:
+    async def _get_toolgroups_for_agent(self, agent_id: str) -> List["Toolgroup"]:
         """
         Retrieve tools configuration for an agent from LlamaStack.
 
@@ -105,6 +108,10 @@ class Chat:
 
     async def _create_agent_with_existing_id(self, agent_id: str):
         """Create an agent instance using an existing agent_id from LlamaStack."""
+        from llama_stack_client.lib.agents.react.tool_parser import ReActOutput
+
+        from ..agents import ExistingAsyncAgent, ExistingReActAgent
+
         try:
             agent_config = await self._get_agent_config(agent_id)
             if not agent_config:
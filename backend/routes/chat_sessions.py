@@ -18,15 +18,18 @@ conversation state across multiple interactions.
 
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 from fastapi import APIRouter, HTTPException, Request
-from llama_stack_client.types.agents.session import Session
 from pydantic import BaseModel
 
 from ..api.llamastack import get_client_from_request
-from ..virtual_agents.agent_resource import EnhancedAgentResource
-from ..virtual_agents.session_resource import EnhancedSessionResource
+
+if TYPE_CHECKING:
+    from llama_stack_client.types.agents.session import Session
+
+    from ..virtual_agents.agent_resource import EnhancedAgentResource
+    from ..virtual_agents.session_resource import EnhancedSessionResource
 
 log = logging.getLogger(__name__)
 router = APIRouter(prefix="/chat_sessions", tags=["chat_sessions"])
@@ -14,9 +14,12 @@ from sqlalchemy.future import select
 
 from .. import models, schemas
 from ..database import get_db
+from ..utils.crud_cache import CrudCache
 
 router = APIRouter(prefix="/guardrails", tags=["guardrails"])
 
+guardrail_cache = CrudCache("guardrails", schemas.GuardrailRead)
+
 
 @router.post(
     "/", response_model=schemas.GuardrailRead, status_code=status.HTTP_201_CREATED
@@ -38,6 +41,7 @@ async def create_guardrail(
     db.add(db_item)
     await db.commit()
     await db.refresh(db_item)
+    await guardrail_cache.invalidate()
     return db_item
 
 
@@ -52,8 +56,12 @@ async def read_guardrails(db: AsyncSession = Depends(get_db)):
     Returns:
         List of all guardrails with their rules and metadata
     """
-    result = await db.execute(select(models.Guardrail))
-    return result.scalars().all()
+
+    async def load():
+        result = await db.execute(select(models.Guardrail))
+        return result.scalars().all()
+
+    return await guardrail_cache.get_list(load)
 
 
 @router.get("/{guardrail_id}", response_model=schemas.GuardrailRead)
@@ -71,10 +79,14 @@ async def read_guardrail(guardrail_id: UUID, db: AsyncSession = Depends(get_db))
     Raises:
         HTTPException: 404 if guardrail not found
     """
-    result = await db.execute(
-        select(models.Guardrail).where(models.Guardrail.id == guardrail_id)
-    )
-    item = result.scalar_one_or_none()
+
+    async def load():
+        result = await db.execute(
+            select(models.Guardrail).where(models.Guardrail.id == guardrail_id)
+        )
+        return result.scalar_one_or_none()
+
+    item = await guardrail_cache.get_item(guardrail_id, load)
     if not item:
         raise HTTPException(status_code=404, detail="Guardrail not found")
     return item
@@ -110,6 +122,7 @@ async def update_guardrail(
         setattr(db_item, field, value)
     await db.commit()
     await db.refresh(db_item)
+    await guardrail_cache.invalidate(guardrail_id)
     return db_item
 
 
@@ -136,4 +149,5 @@ async def delete_guardrail(guardrail_id: UUID, db: AsyncSession = Depends(get_db
         raise HTTPException(status_code=404, detail="Guardrail not found")
     await db.delete(db_item)
     await db.commit()
+    await guardrail_cache.invalidate(guardrail_id)
     return None
@@ -14,7 +14,7 @@ Key Features:
 """
 
 import os
-from typing import List
+from typing import Any, Dict, List
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -22,14 +22,20 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models, schemas
-from ..api.llamastack import get_client_from_request, sync_client
+from ..api.llamastack import get_client_from_request, get_sync_client
 from ..database import get_db
+from ..services import drift_reconciler
+from ..services.sync_engine import SyncResult, SyncSpec, listing_to_dicts, reconcile
+from ..utils.crud_cache import CrudCache
 from ..utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/knowledge_bases", tags=["knowledge_bases"])
 
+# Ingestion status changes without database writes, so it is never cached
+knowledge_base_cache = CrudCache("knowledge_bases", schemas.KnowledgeBaseRead)
+
 
 @router.post(
     "/", response_model=schemas.KnowledgeBaseRead, status_code=status.HTTP_201_CREATED
@@ -58,6 +64,7 @@ async def create_knowledge_base(
     db.add(db_kb)
     await db.commit()
     await db.refresh(db_kb)
+    await knowledge_base_cache.invalidate()
 
     # Auto-sync with LlamaStack after creation
     try:
@@ -84,11 +91,15 @@ async def read_knowledge_bases(db: AsyncSession = Depends(get_db)):
     Returns:
         List[schemas.KnowledgeBaseRead]: List of all knowledge bases
     """
-    result = await db.execute(select(models.KnowledgeBase))
-    kbs = result.scalars().all()
-    for kb in kbs:
-        kb.status = await get_pipeline_status(kb.vector_db_name)
-    return kbs
+
+    async def load():
+        result = await db.execute(select(models.KnowledgeBase))
+        return result.scalars().all()
+
+    kbs = await knowledge_base_cache.get_list(load)
+    return [
+        {**kb, "status": await get_pipeline_status(kb["vector_db_name"])} for kb in kbs
+    ]
 
 
 @router.get("/{vector_db_name}", response_model=schemas.KnowledgeBaseRead)
@@ -109,17 +120,20 @@ async def read_knowledge_base(vector_db_name: str, db: AsyncSession = Depends(ge
     Raises:
         HTTPException: 404 if the knowledge base is not found
     """
-    result = await db.execute(
-        select(models.KnowledgeBase).where(
-            models.KnowledgeBase.vector_db_name == vector_db_name
+
+    async def load():
+        result = await db.execute(
+            select(models.KnowledgeBase).where(
+                models.KnowledgeBase.vector_db_name == vector_db_name
+            )
         )
-    )
-    kb = result.scalar_one_or_none()
+        return result.scalar_one_or_none()
+
+    kb = await knowledge_base_cache.get_item(vector_db_name, load)
     if not kb:
         raise HTTPException(status_code=404, detail="Knowledge base not found")
 
-    kb.status = await get_pipeline_status(kb.vector_db_name)
-    return kb
+    return {**kb, "status": await get_pipeline_status(vector_db_name)}
 
 
 @router.delete("/{vector_db_name}", status_code=status.HTTP_204_NO_CONTENT)
@@ -176,6 +190,7 @@ async def delete_knowledge_base(
     # Then delete from database
     await db.delete(db_kb)
     await db.commit()
+    await knowledge_base_cache.invalidate(vector_db_name)
 
     logger.info(f"Successfully deleted knowledge base from database: {kb_name}")
     return None
@@ -200,7 +215,10 @@ async def sync_knowledge_bases_endpoint(db: AsyncSession = Depends(get_db)):
         HTTPException: If synchronization fails due to LlamaStack errors
     """
     try:
-        return await sync_knowledge_bases(db)
+        kbs = (await sync_knowledge_bases(db)).rows
+        for kb in kbs:
+            kb.status = await get_pipeline_status(kb.vector_db_name)
+        return kbs
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -289,128 +307,99 @@ async def get_pipeline_status(pipeline_name: str) -> str:
             return "unknown"
 
 
-async def sync_knowledge_bases(db: AsyncSession):
+KNOWLEDGE_BASE_SYNC_SPEC = SyncSpec(
+    model=models.KnowledgeBase,
+    key="vector_db_name",
+    fields=("embedding_model", "provider_id"),
+    insert_only_fields=(
+        "name",
+        "version",
+        "is_external",
+        "source",
+        "source_configuration",
+    ),
+    delete_missing=False,
+    on_change=knowledge_base_cache.clear,
+)
+
+
+async def fetch_llamastack_knowledge_bases() -> Dict[str, Dict[str, Any]]:
+    """
+    Build the desired knowledge base rows from the LlamaStack vector DB listing.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Vector DB identifier -> knowledge base values
+
+    Raises:
+        Exception: If the LlamaStack vector database listing fails
+    """
+    logger.debug("Fetching vector databases from LlamaStack")
+    try:
+        vector_dbs = listing_to_dicts(await get_sync_client().vector_dbs.list())
+    except Exception as e:
+        raise Exception(f"Failed to fetch vector databases from LlamaStack: {str(e)}")
+
+    desired = {}
+    for vector_db in vector_dbs:
+        identifier = vector_db.get("identifier")
+        if not identifier:
+            logger.debug(f"Skipping vector database without identifier: {vector_db}")
+            continue
+        desired[identifier] = {
+            "name": identifier,
+            "version": "1.0",
+            "embedding_model": vector_db.get("embedding_model", "all-MiniLM-L6-v2"),
+            "provider_id": vector_db.get("provider_id"),
+            "vector_db_name": identifier,
+            "is_external": False,
+            "source": None,
+            "source_configuration": {
+                "embedding_dimension": vector_db.get("embedding_dimension"),
+                "type": vector_db.get("type"),
+                "provider_resource_id": vector_db.get("provider_resource_id"),
+            },
+        }
+    return desired
+
+
+async def sync_knowledge_bases(db: AsyncSession) -> SyncResult:
     """
     Internal synchronization function for knowledge bases with LlamaStack.
 
-    This function performs the actual sync logic by fetching vector databases
-    from LlamaStack and updating the local database. It's called automatically
-    after knowledge base operations and by the manual sync endpoint.
+    This function fetches vector databases from LlamaStack and reconciles the
+    local knowledge base table against them. It's called automatically after
+    knowledge base operations and by the manual sync endpoint.
 
-    The sync is unidirectional - it only adds missing items from LlamaStack
-    to the database without removing existing database entries. This preserves
-    knowledge bases in PENDING status during ingestion processes.
+    The sync is unidirectional - it adds missing items from LlamaStack and
+    refreshes the LlamaStack-owned fields (embedding model and provider) of
+    existing ones, without removing database entries. This preserves
+    knowledge bases in PENDING status during ingestion processes, as well as
+    the name and source configuration entered when a knowledge base was
+    created locally. Rows that did not change are not written.
 
     Args:
         db: Database session for executing queries
 
     Returns:
-        List[models.KnowledgeBase]: List of synchronized knowledge bases
+        SyncResult: Diff summary and the synchronized knowledge bases
 
     Raises:
         Exception: If LlamaStack communication fails or database operations fail
     """
     try:
         logger.info("Starting knowledge base sync")
-        logger.debug("Fetching vector databases from LlamaStack")
-        try:
-            response = await sync_client.vector_dbs.list()
-
-            if isinstance(response, list):
-                vector_dbs = [item.__dict__ for item in response]
-            elif isinstance(response, dict):
-                vector_dbs = response.get("data", [])
-            elif hasattr(response, "data"):
-                vector_dbs = response.data
-            else:
-                logger.warning(f"Unexpected response type: {type(response)}")
-                vector_dbs = []
-
-        except Exception as e:
-            raise Exception(
-                f"Failed to fetch vector databases from LlamaStack: {str(e)}"
-            )
-
-        logger.debug("Fetching existing knowledge bases from database...")
-        result = await db.execute(select(models.KnowledgeBase))
-        existing_kbs = {kb.vector_db_name: kb for kb in result.scalars().all()}
-        logger.debug(
-            f"Found {len(existing_kbs)} existing knowledge bases: "
-            f"{list(existing_kbs.keys())}"
+        desired = await fetch_llamastack_knowledge_bases()
+        result = await reconcile(
+            db, KNOWLEDGE_BASE_SYNC_SPEC, desired, "Knowledge bases"
         )
-
-        synced_kbs = []
-
-        logger.debug("Processing vector databases...")
-        for vector_db in vector_dbs:
-            try:
-                if not vector_db.get("identifier"):
-                    logger.debug(
-                        f"Skipping vector database without identifier: {vector_db}"
-                    )
-                    continue
-
-                kb_data = {
-                    "name": vector_db["identifier"],
-                    "version": "1.0",
-                    "embedding_model": vector_db.get(
-                        "embedding_model", "all-MiniLM-L6-v2"
-                    ),
-                    "provider_id": vector_db.get("provider_id"),
-                    "vector_db_name": vector_db["identifier"],
-                    "is_external": False,
-                    "source": None,
-                    "source_configuration": {
-                        "embedding_dimension": vector_db.get("embedding_dimension"),
-                        "type": vector_db.get("type"),
-                        "provider_resource_id": vector_db.get("provider_resource_id"),
-                    },
-                }
-                logger.debug(
-                    f"Processing vector database {vector_db['identifier']} "
-                    f"with data: {kb_data}"
-                )
-
-                if vector_db["identifier"] in existing_kbs:
-                    logger.debug(
-                        "Updating existing knowledge base: "
-                        f"{vector_db['identifier']}"
-                    )
-                    kb = existing_kbs[vector_db["identifier"]]
-                    for field, value in kb_data.items():
-                        setattr(kb, field, value)
-                else:
-                    logger.debug(
-                        f"Creating new knowledge base: {vector_db['identifier']}"
-                    )
-                    kb = models.KnowledgeBase(**kb_data)
-                    db.add(kb)
-
-                synced_kbs.append(kb)
-            except Exception as e:
-                logger.error(
-                    "Error processing vector database "
-                    f"{vector_db.get('identifier', 'unknown')}: {str(e)}"
-                )
-                continue
-
-        # Note: We no longer remove knowledge bases from DB that don't
-        # exist in LlamaStack. This allows for PENDING status (exists in DB
-        # but not yet in LlamaStack during ingestion). Deletion from DB should
-        # only happen through explicit delete API calls
-        logger.info("Sync complete - only added missing items from LlamaStack to DB")
-
-        logger.debug("Committing changes to database...")
-        await db.commit()
-
-        logger.debug("Refreshing synced knowledge bases...")
-        for kb in synced_kbs:
-            await db.refresh(kb)
-            kb.status = await get_pipeline_status(kb.vector_db_name)
-
-        logger.info(f"Sync complete. Synced {len(synced_kbs)} knowledge bases.")
-        return synced_kbs
+        logger.info(f"Sync complete. Synced {len(result.rows)} knowledge bases.")
+        return result
 
     except Exception as e:
         logger.error(f"Error during sync: {str(e)}")
         raise Exception(f"Failed to sync knowledge bases: {str(e)}")
+
+
+drift_reconciler.register_resource(
+    "knowledge_bases", KNOWLEDGE_BASE_SYNC_SPEC, fetch_llamastack_knowledge_bases
+)
@@ -31,7 +31,6 @@ from backend.database import get_db
 
 from .. import models
 from ..api.llamastack import get_client_from_request
-from .chat import Chat
 from .virtual_assistants import read_virtual_assistant
 
 
@@ -432,6 +431,10 @@ async def chat(
 
         log.info(f"Using agent: {agent_id} with session: {session_id}")
 
+        # Deferred import: the chat module loads the llama_stack_client agent
+        # libraries, which are only needed once a chat is actually streamed
+        from .chat import Chat
+
         # Create stateless Chat instance (no longer needs assistant or session_state)
         chat = Chat(log, request)
 
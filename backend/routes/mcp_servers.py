@@ -12,21 +12,30 @@ Key Features:
 - Integration with virtual assistants for enhanced capabilities
 """
 
-from typing import List
+import dataclasses
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from .. import models, schemas
-from ..api.llamastack import sync_client
+from ..api.llamastack import get_sync_client
 from ..database import get_db
+from ..services import drift_reconciler, sync_outbox, tool_catalog
+from ..services.llamastack_sync import MCP_PROVIDER_ID, LlamaStackSyncService
+from ..services.sync_engine import SyncResult, SyncSpec, listing_to_dicts, reconcile
+from ..utils.crud_cache import CrudCache
 from ..utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/mcp_servers", tags=["mcp_servers"])
 
+MCP_SERVER_ENTITY = "mcp_server"
+
+mcp_server_cache = CrudCache("mcp_servers", schemas.MCPServerRead)
+
 
 @router.post(
     "/", response_model=schemas.MCPServerRead, status_code=status.HTTP_201_CREATED
@@ -37,8 +46,8 @@ async def create_mcp_server(
     """
     Create a new MCP server configuration.
 
-    This endpoint registers a new MCP server in the database and triggers
-    automatic synchronization with LlamaStack to discover available tools.
+    This endpoint registers a new MCP server in the database and queues its
+    registration with LlamaStack, which is performed by the sync outbox worker.
 
     Args:
         server: MCP server creation data including name, endpoint, and configuration
@@ -52,15 +61,12 @@ async def create_mcp_server(
     """
     db_server = models.MCPServer(**server.dict())
     db.add(db_server)
+    sync_outbox.enqueue_sync(db, MCP_SERVER_ENTITY, db_server.toolgroup_id, "create")
     await db.commit()
     await db.refresh(db_server)
-
-    # Auto-sync with LlamaStack after creation
-    try:
-        logger.info(f"Auto-syncing MCP servers after creation of: {db_server.name}")
-        await sync_mcp_servers(db)
-    except Exception as e:
-        logger.warning(f"Failed to auto-sync after MCP server creation: {str(e)}")
+    tool_catalog.invalidate()
+    await mcp_server_cache.invalidate()
+    sync_outbox.notify_worker()
 
     return db_server
 
@@ -79,8 +85,12 @@ async def read_mcp_servers(db: AsyncSession = Depends(get_db)):
     Returns:
         List[schemas.MCPServerRead]: List of all MCP servers
     """
-    result = await db.execute(select(models.MCPServer))
-    return result.scalars().all()
+
+    async def load():
+        result = await db.execute(select(models.MCPServer))
+        return result.scalars().all()
+
+    return await mcp_server_cache.get_list(load)
 
 
 @router.get("/{toolgroup_id}", response_model=schemas.MCPServerRead)
@@ -101,10 +111,16 @@ async def read_mcp_server(toolgroup_id: str, db: AsyncSession = Depends(get_db))
     Raises:
         HTTPException: 404 if the MCP server is not found
     """
-    result = await db.execute(
-        select(models.MCPServer).where(models.MCPServer.toolgroup_id == toolgroup_id)
-    )
-    server = result.scalar_one_or_none()
+
+    async def load():
+        result = await db.execute(
+            select(models.MCPServer).where(
+                models.MCPServer.toolgroup_id == toolgroup_id
+            )
+        )
+        return result.scalar_one_or_none()
+
+    server = await mcp_server_cache.get_item(toolgroup_id, load)
     if not server:
         raise HTTPException(status_code=404, detail="Server not found")
     return server
@@ -141,15 +157,15 @@ async def update_mcp_server(
         raise HTTPException(status_code=404, detail="Server not found")
     for field, value in server.dict().items():
         setattr(db_server, field, value)
+    # The payload may rename the toolgroup; retire the old one as well
+    if db_server.toolgroup_id != toolgroup_id:
+        sync_outbox.enqueue_sync(db, MCP_SERVER_ENTITY, toolgroup_id, "delete")
+    sync_outbox.enqueue_sync(db, MCP_SERVER_ENTITY, db_server.toolgroup_id, "update")
     await db.commit()
     await db.refresh(db_server)
-
-    # Auto-sync with LlamaStack after update
-    try:
-        logger.info(f"Auto-syncing MCP servers after update of: {db_server.name}")
-        await sync_mcp_servers(db)
-    except Exception as e:
-        logger.warning(f"Failed to auto-sync after MCP server update: {str(e)}")
+    tool_catalog.invalidate()
+    await mcp_server_cache.invalidate(toolgroup_id, db_server.toolgroup_id)
+    sync_outbox.notify_worker()
 
     return db_server
 
@@ -179,133 +195,166 @@ async def delete_mcp_server(toolgroup_id: str, db: AsyncSession = Depends(get_db
     if not db_server:
         raise HTTPException(status_code=404, detail="Server not found")
 
-    server_name = db_server.name  # Store name before deletion
     await db.delete(db_server)
+    sync_outbox.enqueue_sync(db, MCP_SERVER_ENTITY, toolgroup_id, "delete")
     await db.commit()
+    tool_catalog.invalidate()
+    await mcp_server_cache.invalidate(toolgroup_id)
+    sync_outbox.notify_worker()
+
+    return None
+
+
+async def on_mcp_servers_changed() -> None:
+    """Drop the caches derived from the MCP server table after a sync."""
+    tool_catalog.invalidate()
+    await mcp_server_cache.clear()
+
+
+MCP_SERVER_SYNC_SPEC = SyncSpec(
+    model=models.MCPServer,
+    key="toolgroup_id",
+    fields=("name", "description", "endpoint_url", "configuration"),
+    on_change=on_mcp_servers_changed,
+)
 
-    # Auto-sync with LlamaStack after deletion
+
+async def fetch_llamastack_mcp_servers(
+    toolgroup_id: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the desired MCP server rows from the LlamaStack tool listing.
+
+    LlamaStack lists individual tools; each MCP toolgroup becomes one row,
+    keyed by its toolgroup ID.
+
+    Args:
+        toolgroup_id: Only list the tools of this toolgroup
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Toolgroup ID -> MCP server column values
+
+    Raises:
+        Exception: If the LlamaStack tool listing fails
+    """
+    logger.debug("Fetching tools from LlamaStack")
     try:
-        logger.info(f"Auto-syncing MCP servers after deletion of: {server_name}")
-        await sync_mcp_servers(db)
+        if toolgroup_id is None:
+            listing = await get_sync_client().tools.list()
+        else:
+            listing = await get_sync_client().tools.list(toolgroup_id=toolgroup_id)
+        tools = listing_to_dicts(listing)
     except Exception as e:
-        logger.warning(f"Failed to auto-sync after MCP server deletion: {str(e)}")
-
-    return None
+        raise Exception(f"Failed to fetch tools from LlamaStack: {str(e)}")
+
+    desired = {}
+    for tool in tools:
+        if tool.get("provider_id") != MCP_PROVIDER_ID:
+            continue
+        if not tool.get("identifier") or not tool.get("toolgroup_id"):
+            continue
+        try:
+            desired[tool["toolgroup_id"]] = {
+                "toolgroup_id": tool["toolgroup_id"],
+                "name": tool["identifier"],
+                "description": tool.get("description", ""),
+                "endpoint_url": (tool.get("metadata") or {}).get("endpoint", ""),
+                "configuration": {
+                    "type": tool.get("type"),
+                    "provider_id": tool.get("provider_id"),
+                    "tool_host": tool.get("tool_host"),
+                    "parameters": [p.__dict__ for p in tool.get("parameters", [])],
+                },
+            }
+        except Exception as e:
+            logger.error(
+                "Error processing MCP tool "
+                f"{tool.get('identifier', 'unknown')}: {str(e)}"
+            )
+    return desired
 
 
-async def sync_mcp_servers(db: AsyncSession):
+async def sync_mcp_servers(db: AsyncSession) -> SyncResult:
     """
     Internal synchronization function for MCP servers with LlamaStack.
 
-    This function performs the actual sync logic by fetching available tools
-    from LlamaStack and updating the MCP server database. It discovers new
-    MCP servers and removes servers that are no longer available.
+    This function fetches the MCP toolgroups registered in LlamaStack and
+    reconciles the MCP server table against them: new toolgroups are added,
+    changed ones are updated and servers that are no longer available are
+    removed. Rows that did not change are not written.
 
     Args:
         db: Database session for executing queries
 
     Returns:
-        List[models.MCPServer]: List of synchronized MCP servers
+        SyncResult: Diff summary and the synchronized MCP servers
 
     Raises:
         Exception: If LlamaStack communication fails or database operations fail
     """
     try:
         logger.info("Starting MCP server sync")
-        logger.debug("Fetching tools from LlamaStack")
-        try:
-            response = await sync_client.tools.list()
-
-            if isinstance(response, list):
-                tools = [item.__dict__ for item in response]
-            elif isinstance(response, dict):
-                tools = response.get("data", [])
-            elif hasattr(response, "data"):
-                tools = response.data
-            else:
-                logger.warning(f"Unexpected response type: {type(response)}")
-                tools = []
+        desired = await fetch_llamastack_mcp_servers()
+        result = await reconcile(db, MCP_SERVER_SYNC_SPEC, desired, "MCP servers")
+        logger.info(f"Sync complete. Synced {len(result.rows)} MCP servers.")
+        return result
 
-        except Exception as e:
-            raise Exception(f"Failed to fetch tools from LlamaStack: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error during sync: {str(e)}")
+        raise Exception(f"Failed to sync MCP servers: {str(e)}")
 
-        mcp_tools = [
-            tool
-            for tool in tools
-            if tool.get("provider_id") == "model-context-protocol"
-        ]
 
-        logger.debug("Fetching existing MCP servers from database")
-        result = await db.execute(select(models.MCPServer))
-        existing_servers = {
-            server.toolgroup_id: server for server in result.scalars().all()
-        }
-        logger.debug(
-            f"Found {len(existing_servers)} existing MCP servers: "
-            f"{list(existing_servers.keys())}"
-        )
+async def sync_mcp_server_entity(
+    db: AsyncSession, toolgroup_id: str, operation: str
+) -> bool:
+    """
+    Converge a single MCP server with LlamaStack.
 
-        synced_servers = []
-
-        for tool in mcp_tools:
-            try:
-                if not tool.get("identifier"):
-                    continue
-
-                server_data = {
-                    "name": tool["identifier"],
-                    "description": tool.get("description", ""),
-                    "endpoint_url": tool.get("metadata", {}).get("endpoint", ""),
-                    "toolgroup_id": tool.get("toolgroup_id"),
-                    "configuration": {
-                        "type": tool.get("type"),
-                        "provider_id": tool.get("provider_id"),
-                        "tool_host": tool.get("tool_host"),
-                        "parameters": [p.__dict__ for p in tool.get("parameters", [])],
-                    },
-                }
-
-                if tool.get("toolgroup_id") in existing_servers:
-                    logger.debug(
-                        f"Updating existing MCP server: {tool.get('toolgroup_id')}"
-                    )
-                    server = existing_servers[tool.get("toolgroup_id")]
-                    for field, value in server_data.items():
-                        setattr(server, field, value)
-                else:
-                    logger.debug(f"Creating new MCP server: {tool.get('toolgroup_id')}")
-                    server = models.MCPServer(**server_data)
-                    db.add(server)
-
-                synced_servers.append(server)
-            except Exception as e:
-                logger.error(
-                    "Error processing MCP tool "
-                    f"{tool.get('identifier', 'unknown')}: {str(e)}"
-                )
-                continue
-
-        logger.debug("Checking for MCP servers to remove...")
-        for toolgroup_id, server in existing_servers.items():
-            if not any(t.get("toolgroup_id") == toolgroup_id for t in mcp_tools):
-                logger.debug(
-                    f"Removing MCP server that no longer exists: {toolgroup_id}"
-                )
-                await db.delete(server)
-
-        logger.debug("Committing changes to database...")
-        await db.commit()
-
-        logger.debug("Refreshing synced MCP servers...")
-        for server in synced_servers:
-            await db.refresh(server)
-
-        logger.info(f"Sync complete. Synced {len(synced_servers)} MCP servers.")
-        return synced_servers
+    Used by the sync outbox worker. The database row is the source of truth:
+    if it exists the toolgroup is (re-)registered and the row refreshed from
+    that toolgroup's tools only, otherwise the toolgroup is unregistered. The
+    operation is informational, which keeps retries and coalesced rows safe.
 
-    except Exception as e:
-        logger.error(f"Error during sync: {str(e)}")
-        raise Exception(f"Failed to sync MCP servers: {str(e)}")
+    Args:
+        db: Database session
+        toolgroup_id: Toolgroup identifier of the MCP server
+        operation: Operation recorded in the outbox
+
+    Returns:
+        bool: True if LlamaStack matches the database row
+    """
+    result = await db.execute(
+        select(models.MCPServer).where(models.MCPServer.toolgroup_id == toolgroup_id)
+    )
+    db_server = result.scalar_one_or_none()
+    if db_server is None:
+        return await LlamaStackSyncService.sync_mcp_server_delete(toolgroup_id)
+
+    if operation == "create":
+        synced = await LlamaStackSyncService.sync_mcp_server_create(db_server)
+    else:
+        synced = await LlamaStackSyncService.sync_mcp_server_update(db_server)
+    if not synced:
+        return False
+
+    desired = await fetch_llamastack_mcp_servers(toolgroup_id=toolgroup_id)
+    await reconcile(
+        db,
+        dataclasses.replace(MCP_SERVER_SYNC_SPEC, delete_missing=False),
+        desired,
+        f"MCP server {toolgroup_id}",
+        keys=[toolgroup_id],
+    )
+    return True
+
+
+sync_outbox.register_handler(MCP_SERVER_ENTITY, sync_mcp_server_entity)
+drift_reconciler.register_resource(
+    "mcp_servers",
+    MCP_SERVER_SYNC_SPEC,
+    fetch_llamastack_mcp_servers,
+    outbox_entity_type=MCP_SERVER_ENTITY,
+)
 
 
 @router.post("/sync", response_model=List[schemas.MCPServerRead])
@@ -327,7 +376,7 @@ async def sync_mcp_servers_endpoint(db: AsyncSession = Depends(get_db)):
         HTTPException: If synchronization fails due to LlamaStack errors
     """
     try:
-        return await sync_mcp_servers(db)
+        return (await sync_mcp_servers(db)).rows
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
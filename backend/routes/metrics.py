@@ -0,0 +1,57 @@
+"""
+Operational metrics and LlamaStack sync status API endpoints.
+
+This module exposes the in-process metrics collected by the backend and the
+latest drift reports produced by the background drift reconciler, so that
+clients can see whether local data matches LlamaStack without triggering a
+full sync.
+"""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from ..services import drift_reconciler
+from ..services.llamastack_sync import LlamaStackSyncService
+from ..utils import metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/", response_model=Dict[str, Any])
+async def read_metrics():
+    """
+    Retrieve a snapshot of this replica's in-process metrics.
+
+    Returns:
+        Dict[str, Any]: Counters, gauges and timing summaries by name and labels
+    """
+    return metrics.snapshot()
+
+
+@router.get("/sync", response_model=Dict[str, Any])
+async def read_sync_status():
+    """
+    Retrieve the latest drift report of every LlamaStack-backed resource.
+
+    Reports are refreshed by the drift reconciler on the sync leader, so
+    replicas that do not lead report an empty result.
+
+    Returns:
+        Dict[str, Any]: Resource name -> latest drift report
+    """
+    return drift_reconciler.last_reports()
+
+
+@router.get("/sync/check", response_model=Dict[str, Any])
+async def check_sync_status():
+    """
+    Compare every LlamaStack-backed resource with the database now.
+
+    Unlike /sync this runs a fresh drift check on this replica, without
+    healing anything.
+
+    Returns:
+        Dict[str, Any]: Overall sync status and the report of each resource
+    """
+    return await LlamaStackSyncService.validate_sync_status()
@@ -13,7 +13,8 @@ Key Features:
 - Configuration management for model endpoints and authentication
 """
 
-from typing import List
+import uuid
+from typing import Any, Dict, List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -21,14 +22,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from .. import models, schemas
-from ..api.llamastack import sync_client
+from ..api.llamastack import get_sync_client
 from ..database import get_db
+from ..services import drift_reconciler
+from ..services.sync_engine import SyncResult, SyncSpec, listing_to_dicts, reconcile
+from ..utils.crud_cache import CrudCache
 from ..utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/model_servers", tags=["Model Servers"])
 
+model_server_cache = CrudCache("model_servers", schemas.ModelServerRead)
+
 
 @router.post(
     "/", response_model=schemas.ModelServerRead, status_code=status.HTTP_201_CREATED
@@ -56,6 +62,7 @@ async def create_model_server(
     db.add(model_server)
     await db.commit()
     await db.refresh(model_server)
+    await model_server_cache.invalidate()
 
     # Auto-sync with LlamaStack after creation
     try:
@@ -83,8 +90,12 @@ async def read_model_servers(db: AsyncSession = Depends(get_db)):
     Returns:
         List[schemas.ModelServerRead]: List of all model servers
     """
-    result = await db.execute(select(models.ModelServer))
-    return result.scalars().all()
+
+    async def load():
+        result = await db.execute(select(models.ModelServer))
+        return result.scalars().all()
+
+    return await model_server_cache.get_list(load)
 
 
 @router.get("/{server_id}", response_model=schemas.ModelServerRead)
@@ -104,10 +115,14 @@ async def read_model_server(server_id: UUID, db: AsyncSession = Depends(get_db))
     Raises:
         HTTPException: 404 if the model server is not found
     """
-    result = await db.execute(
-        select(models.ModelServer).where(models.ModelServer.id == server_id)
-    )
-    server = result.scalar_one_or_none()
+
+    async def load():
+        result = await db.execute(
+            select(models.ModelServer).where(models.ModelServer.id == server_id)
+        )
+        return result.scalar_one_or_none()
+
+    server = await model_server_cache.get_item(server_id, load)
     if not server:
         raise HTTPException(status_code=404, detail="Server not found")
     return server
@@ -146,6 +161,7 @@ async def update_mcp_server(
         setattr(db_server, field, value)
     await db.commit()
     await db.refresh(db_server)
+    await model_server_cache.invalidate(server_id)
 
     # Auto-sync with LlamaStack after update
     try:
@@ -185,6 +201,7 @@ async def delete_model_server(server_id: UUID, db: AsyncSession = Depends(get_db
     server_name = db_server.name  # Store name before deletion
     await db.delete(db_server)
     await db.commit()
+    await model_server_cache.invalidate(server_id)
 
     # Auto-sync with LlamaStack after deletion
     try:
@@ -196,111 +213,86 @@ async def delete_model_server(server_id: UUID, db: AsyncSession = Depends(get_db
     return None
 
 
-async def sync_model_servers(db: AsyncSession):
+# Model servers are also created through this API before LlamaStack knows
+# them, so servers missing from the listing are kept
+MODEL_SERVER_SYNC_SPEC = SyncSpec(
+    model=models.ModelServer,
+    key="name",
+    fields=("provider_name", "model_name", "endpoint_url"),
+    delete_missing=False,
+    new_primary_key=uuid.uuid4,
+    on_change=model_server_cache.clear,
+)
+
+
+async def fetch_llamastack_model_servers() -> Dict[str, Dict[str, Any]]:
+    """
+    Build the desired model server rows from the LlamaStack model listing.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Model identifier -> model server column values
+
+    Raises:
+        Exception: If the LlamaStack model listing fails
+    """
+    logger.debug("Fetching models from LlamaStack")
+    try:
+        llamastack_models = listing_to_dicts(await get_sync_client().models.list())
+    except Exception as e:
+        raise Exception(f"Failed to fetch models from LlamaStack: {str(e)}")
+
+    desired = {}
+    for model in llamastack_models:
+        identifier = model.get("identifier")
+        if not identifier:
+            logger.debug(f"Skipping model without identifier: {model}")
+            continue
+        metadata = model.get("metadata") or {}
+        desired[identifier] = {
+            "name": identifier,
+            "provider_name": model.get("provider_id") or "",
+            "model_name": model.get("provider_resource_id") or identifier,
+            "endpoint_url": metadata.get("endpoint_url", metadata.get("url", "")),
+        }
+    return desired
+
+
+async def sync_model_servers(db: AsyncSession) -> SyncResult:
     """
     Internal synchronization function for model servers with LlamaStack.
 
-    This function performs the actual sync logic by fetching available models
-    from LlamaStack and updating the model server database. It discovers new
-    model providers and removes servers that are no longer available.
+    This function fetches the models registered in LlamaStack and reconciles
+    the model server table against them, matching rows by name: new models
+    are added and changed ones are updated. Servers that LlamaStack doesn't
+    list are kept, since they may have been created here. Rows that did not
+    change are not written.
 
     Args:
         db: Database session for executing queries
 
     Returns:
-        List[models.ModelServer]: List of synchronized model servers
+        SyncResult: Diff summary and the synchronized model servers
 
     Raises:
         Exception: If LlamaStack communication fails or database operations fail
     """
     try:
         logger.info("Starting model server sync")
-        logger.debug("Fetching models from LlamaStack")
-        try:
-            response = await sync_client.models.list()
-
-            if isinstance(response, list):
-                models = [item.__dict__ for item in response]
-            elif isinstance(response, dict):
-                models = response.get("data", [])
-            elif hasattr(response, "data"):
-                models = response.data
-            else:
-                logger.warning(f"Unexpected response type: {type(response)}")
-                models = []
-
-        except Exception as e:
-            raise Exception(f"Failed to fetch models from LlamaStack: {str(e)}")
-
-        logger.debug("Fetching existing model servers from database...")
-        result = await db.execute(select(models.ModelServer))
-        existing_servers = {server.name: server for server in result.scalars().all()}
-        logger.debug(
-            f"Found {len(existing_servers)} existing model servers: "
-            f"{list(existing_servers.keys())}"
-        )
-
-        synced_servers = []
-
-        logger.debug("Processing models...")
-        for model in models:
-            try:
-                if not model.get("name"):
-                    logger.debug(f"Skipping model without name: {model}")
-                    continue
-
-                server_data = {
-                    "name": model["name"],
-                    "title": model.get("title", model["name"]),
-                    "description": model.get("description", ""),
-                    "endpoint_url": model.get("endpoint_url", ""),
-                    "configuration": model.get("configuration", {}),
-                    "created_by": "admin",
-                }
-                logger.debug(
-                    f"Processing model {model['name']} with data: {server_data}"
-                )
-
-                if model["name"] in existing_servers:
-                    logger.debug(f"Updating existing model server: {model['name']}")
-                    server = existing_servers[model["name"]]
-                    for field, value in server_data.items():
-                        setattr(server, field, value)
-                else:
-                    logger.debug(f"Creating new model server: {model['name']}")
-                    server = models.ModelServer(**server_data)
-                    db.add(server)
-
-                synced_servers.append(server)
-            except Exception as e:
-                logger.error(
-                    f"Error processing model {model.get('name', 'unknown')}: {str(e)}"
-                )
-                continue
-
-        logger.debug("Checking for model servers to remove...")
-        for server_name, server in existing_servers.items():
-            if not any(m.get("name") == server_name for m in models):
-                logger.debug(
-                    f"Removing model server that no longer exists: {server_name}"
-                )
-                await db.delete(server)
-
-        logger.debug("Committing changes to database...")
-        await db.commit()
-
-        logger.debug("Refreshing synced model servers...")
-        for server in synced_servers:
-            await db.refresh(server)
-
-        logger.info(f"Sync complete. Synced {len(synced_servers)} model servers.")
-        return synced_servers
+        desired = await fetch_llamastack_model_servers()
+        result = await reconcile(db, MODEL_SERVER_SYNC_SPEC, desired, "Model servers")
+        logger.info(f"Sync complete. Synced {len(result.rows)} model servers.")
+        return result
 
     except Exception as e:
         logger.error(f"Error during sync: {str(e)}")
         raise Exception(f"Failed to sync model servers: {str(e)}")
 
 
+drift_reconciler.register_resource(
+    "model_servers", MODEL_SERVER_SYNC_SPEC, fetch_llamastack_model_servers
+)
+
+
 @router.post("/sync", response_model=List[schemas.ModelServerRead])
 async def sync_model_servers_endpoint(db: AsyncSession = Depends(get_db)):
     """
@@ -320,7 +312,7 @@ async def sync_model_servers_endpoint(db: AsyncSession = Depends(get_db)):
         HTTPException: If synchronization fails due to LlamaStack errors
     """
     try:
-        return await sync_model_servers(db)
+        return (await sync_model_servers(db)).rows
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -5,15 +5,11 @@ This module provides endpoints to retrieve and manage tool groups, including
 both MCP (Model Context Protocol) servers and LlamaStack builtin tools.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from fastapi import APIRouter, Query
 
-from .. import models
-from ..api.llamastack import get_client_from_request
-from ..database import get_db
+from ..services import tool_catalog
 from ..utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -22,7 +18,12 @@ router = APIRouter(prefix="/tools", tags=["tools"])
 
 
 @router.get("/", response_model=List[Dict[str, Any]])
-async def get_all_tool_groups(request: Request, db: AsyncSession = Depends(get_db)):
+async def get_all_tool_groups(
+    toolgroup_id: Optional[str] = Query(None, description="Only this tool group"),
+    provider_id: Optional[str] = Query(
+        None, description="Only tool groups of this provider"
+    ),
+):
     """
     Get all available tool groups from both MCP servers and LlamaStack builtin tools.
 
@@ -30,63 +31,14 @@ async def get_all_tool_groups(request: Request, db: AsyncSession = Depends(get_d
     - MCP servers stored in the database
     - Builtin tools available through LlamaStack
 
+    The merged catalog is cached; see services.tool_catalog.
+
     Args:
-        db: Database session dependency
+        toolgroup_id: Only return this tool group
+        provider_id: Only return tool groups of this provider
 
     Returns:
         List of tool groups with their metadata and configuration
     """
-    tool_groups = {}
-
-    # Get all MCP servers from database
-    mcp_result = await db.execute(select(models.MCPServer))
-    mcp_servers = mcp_result.scalars().all()
-
-    for server in mcp_servers:
-        tool_groups[server.toolgroup_id] = {
-            "toolgroup_id": server.toolgroup_id,
-            "name": server.name,
-            "description": server.description,
-            "endpoint_url": server.endpoint_url,
-            "configuration": server.configuration,
-            "created_at": server.created_at.isoformat() if server.created_at else None,
-            "updated_at": server.updated_at.isoformat() if server.updated_at else None,
-        }
-
-    # Get builtin tools from LlamaStack
-    client = get_client_from_request(request)
-    try:
-        response = await client.tools.list()
-        if isinstance(response, list):
-            llamastack_tools = [item.__dict__ for item in response]
-        elif isinstance(response, dict):
-            llamastack_tools = response.get("data", [])
-        elif hasattr(response, "data"):
-            llamastack_tools = response.data
-        else:
-            llamastack_tools = []
-
-        # Filter for builtin tools (not MCP)
-        builtin_tools = [
-            tool
-            for tool in llamastack_tools
-            if tool.get("provider_id") != "model-context-protocol"
-        ]
-
-        # Group builtin tools by toolgroup_id
-        for tool in builtin_tools:
-            toolgroup_id = tool.get("toolgroup_id", tool.get("identifier"))
-            if toolgroup_id and toolgroup_id not in tool_groups:
-                tool_groups[toolgroup_id] = {
-                    "toolgroup_id": toolgroup_id,
-                    "name": toolgroup_id,  # Use toolgroup_id as display name
-                    "description": tool.get("description", f"Tools for {toolgroup_id}"),
-                    "endpoint_url": None,
-                    "configuration": tool.get("metadata", {}),
-                    "created_at": None,
-                    "updated_at": None,
-                }
-    except Exception as e:
-        logger.warning(f"Failed to fetch builtin tools from LlamaStack: {str(e)}")
-
-    return list(tool_groups.values())
+    catalog = await tool_catalog.get_catalog()
+    return catalog.select(toolgroup_id=toolgroup_id, provider_id=provider_id)
@@ -15,12 +15,18 @@ import logging
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..services.identity import (
+    get_current_user,
+    identity_from_headers,
+    invalidate_users,
+    resolve_user,
+)
 from ..services.user_service import UserService
 
 log = logging.getLogger(__name__)
@@ -29,36 +35,21 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 
 async def get_user_from_headers(headers: dict[str, str], db: AsyncSession):
-    username = headers.get("X-Forwarded-User")
-    email = headers.get("X-Forwarded-Email")
-    if not username and not email:
-        username = headers.get("x-forwarded-user")
-        email = headers.get("x-forwarded-email")
-        if not username and not email:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-            )
-    result = await db.execute(
-        select(models.User).where(
-            (models.User.username == username) | (models.User.email == email)
-        )
-    )
-    return result.scalar_one_or_none()
+    return await resolve_user(identity_from_headers(headers), db)
 
 
 # profile endpoint must be declared first in order to function within
 # the /api/users context
 @router.get("/profile", response_model=schemas.UserRead)
 @router.get("/profile/", response_model=schemas.UserRead)
-async def read_profile(request: Request, db: AsyncSession = Depends(get_db)):
+async def read_profile(user: schemas.UserRead = Depends(get_current_user)):
     """
     Retrieve an authorized user's profile.
 
     This endpoint fetches an authorized user's profile information.
 
     Args:
-        request: HTTP request details
-        db: Database session dependency
+        user: The caller's user, resolved once per request
 
     Returns:
         schemas.UserRead: The authorized user's profile
@@ -67,7 +58,6 @@ async def read_profile(request: Request, db: AsyncSession = Depends(get_db)):
         HTTPException: 401 if the user is not authorized
         HTTPException: 403 if the user is not found
     """
-    user = await get_user_from_headers(request.headers, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="User not found"
@@ -101,11 +91,12 @@ async def create_user(user: schemas.UserBase, db: AsyncSession = Depends(get_db)
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
+    invalidate_users()
     return db_user
 
 
 @router.get("/", response_model=List[schemas.UserRead])
-async def read_users(db: AsyncSession = Depends(get_db)):
+async def read_users(db: AsyncSession = Depends(get_read_db)):
     """
     Retrieve all user accounts from the database.
 
@@ -178,6 +169,7 @@ async def update_user(
 
     await db.commit()
     await db.refresh(db_user)
+    invalidate_users()
     return db_user
 
 
@@ -205,9 +197,51 @@ async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     await db.delete(db_user)
     await db.commit()
+    invalidate_users()
     return None
 
 
+@router.post("/bulk/agents", response_model=List[schemas.UserRead])
+async def assign_agents_to_users(
+    assignment: schemas.BulkUserAgentAssignment,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Add agents to the assignment lists of many users in one transaction.
+
+    Agents already assigned to a user are skipped. Either every user is
+    updated or, if any user doesn't exist, none is.
+
+    Args:
+        assignment: User IDs and the agent IDs to assign to each of them
+        db: Database session dependency
+
+    Returns:
+        List[schemas.UserRead]: The updated user profiles
+
+    Raises:
+        HTTPException: 404 if any of the users is not found
+        HTTPException: 404 if any of the specified agents don't exist in LlamaStack
+    """
+    await UserService.verify_agents_exist(assignment.agent_ids)
+
+    user_ids = list(dict.fromkeys(assignment.user_ids))
+    users = await UserService.assign_agents(db, user_ids, assignment.agent_ids)
+    if len(users) != len(user_ids):
+        await db.rollback()
+        found = {user.id for user in users}
+        missing = [str(user_id) for user_id in user_ids if user_id not in found]
+        raise HTTPException(
+            status_code=404, detail=f"Users not found: {', '.join(missing)}"
+        )
+
+    await db.commit()
+    invalidate_users()
+
+    log.info(f"Assigned agents {assignment.agent_ids} to {len(users)} users")
+    return users
+
+
 @router.post("/{user_id}/agents", response_model=schemas.UserRead)
 async def update_user_agents(
     user_id: UUID,
@@ -218,8 +252,8 @@ async def update_user_agents(
     Add agents to a user's assignment list.
 
     This endpoint assigns existing agents from LlamaStack to the specified user.
-    The system prevents duplicate agent assignments by checking if the user
-    already has the agent ID assigned.
+    Agents the user already has are skipped. The list is extended in a single
+    UPDATE, so concurrent assignments to the same user are all kept.
 
     Args:
         user_id: The unique identifier of the user
@@ -233,28 +267,17 @@ async def update_user_agents(
         HTTPException: 404 if the user is not found
         HTTPException: 404 if any of the specified agents don't exist in LlamaStack
     """
-    # Get the user from database
-    result = await db.execute(select(models.User).where(models.User.id == user_id))
-    db_user = result.scalar_one_or_none()
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Get current user agent assignments
-    current_agent_ids = getattr(db_user, "agent_ids", []) or []
-
-    # Use the service to assign agents
-    updated_agent_ids = await UserService.assign_agents_to_user(
-        user_agent_ids=current_agent_ids,
-        requested_agent_ids=agent_assignment.agent_ids,
-    )
+    await UserService.verify_agents_exist(agent_assignment.agent_ids)
 
-    # Update user's agent assignments with the updated agent IDs
-    setattr(db_user, "agent_ids", updated_agent_ids)
+    users = await UserService.assign_agents(db, [user_id], agent_assignment.agent_ids)
+    if not users:
+        raise HTTPException(status_code=404, detail="User not found")
+    db_user = users[0]
 
     await db.commit()
-    await db.refresh(db_user)
+    invalidate_users()
 
-    log.info(f"Updated agents for user {str(db_user.username)}: {updated_agent_ids}")
+    log.info(f"Updated agents for user {str(db_user.username)}: {db_user.agent_ids}")
     return db_user
 
 
@@ -308,29 +331,16 @@ async def remove_user_agents(
     Raises:
         HTTPException: 404 if the user is not found
     """
-    # Get the user from database
-    result = await db.execute(select(models.User).where(models.User.id == user_id))
-    db_user = result.scalar_one_or_none()
-    if not db_user:
+    users = await UserService.remove_agents(db, [user_id], agent_assignment.agent_ids)
+    if not users:
         raise HTTPException(status_code=404, detail="User not found")
-
-    # Get current user agent assignments
-    current_agent_ids = getattr(db_user, "agent_ids", []) or []
-
-    # Use the service to remove agents
-    remaining_agent_ids = await UserService.remove_agents_from_user(
-        current_agent_ids=current_agent_ids,
-        agents_to_remove=agent_assignment.agent_ids,
-    )
-
-    # Update user's agent assignments with the remaining agent IDs
-    setattr(db_user, "agent_ids", remaining_agent_ids)
+    db_user = users[0]
 
     await db.commit()
-    await db.refresh(db_user)
+    invalidate_users()
 
     log.info(
         f"Removed agents from {str(db_user.username)}: {agent_assignment.agent_ids}"
     )
-    log.info(f"Remaining agents: {remaining_agent_ids}")
+    log.info(f"Remaining agents: {db_user.agent_ids}")
     return db_user
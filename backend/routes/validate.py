@@ -1,13 +1,23 @@
-"""Authentication validation endpoints."""
+"""
+Authentication validation endpoints.
+
+``/validate`` is called by LlamaStack in front of every authenticated agent
+call. Validation outcomes are cached per token and forwarded identity:
+successes until the token expires (at most VALIDATION_CACHE_TTL_SECONDS),
+rejections for VALIDATION_NEGATIVE_TTL_SECONDS. Concurrent validations of
+the same token share one upstream request, and upstream requests reuse a
+pooled HTTP client.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import time
+from typing import Optional
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from llama_stack.distribution.server.auth_providers import (
-    AuthRequest,
-    AuthRequestContext,
-    AuthResponse,
-    User,
-)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..api.llamastack import (
@@ -17,6 +27,10 @@ from ..api.llamastack import (
 )
 from ..database import get_db
 from ..routes.users import get_user_from_headers
+from ..schemas import AuthRequest, AuthRequestContext, AuthResponse, AuthUser
+from ..services import identity
+from ..utils import metrics
+from ..utils.cache import SingleFlight, TTLCache
 
 router = APIRouter(prefix="/validate", tags=["validate"])
 
@@ -24,6 +38,87 @@ SAR_VALIDATION_URL = "http://localhost:8887/validate-token"
 TEST_AUTH_URL = "http://localhost:8887/validate"
 REQUEST_TIMEOUT = 10.0
 
+VALIDATION_CACHE_TTL_SECONDS = float(os.getenv("VALIDATION_CACHE_TTL_SECONDS", "60"))
+VALIDATION_NEGATIVE_TTL_SECONDS = float(
+    os.getenv("VALIDATION_NEGATIVE_TTL_SECONDS", "5")
+)
+VALIDATION_CACHE_MAX_ENTRIES = int(os.getenv("VALIDATION_CACHE_MAX_ENTRIES", "10000"))
+
+# Cache key -> AuthResponse, or the detail of a cached token rejection
+validation_cache = TTLCache(VALIDATION_CACHE_MAX_ENTRIES, VALIDATION_CACHE_TTL_SECONDS)
+_validation_flight = SingleFlight()
+# Cached validations carry the user's role, so drop them when users change
+identity.register_invalidation_hook(validation_cache.clear)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+class TokenRejected(HTTPException):
+    """403 for a token the auth service rejected, the only cached failure."""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared, connection-pooled client for the auth service."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared auth service client, e.g. on shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def validation_cache_key(token: str, user_headers: dict[str, str]) -> str:
+    """Hash the token and forwarded identity so tokens are never kept in memory."""
+    identity = "\0".join(
+        [
+            token,
+            user_headers.get("X-Forwarded-User", ""),
+            user_headers.get("X-Forwarded-Email", ""),
+        ]
+    )
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """
+    Read the ``exp`` claim of a JWT without verifying it.
+
+    The claim only bounds how long a validation is cached; the token itself
+    is always verified by the auth service.
+
+    Args:
+        token: Bearer token, with or without the "Bearer " prefix
+
+    Returns:
+        Optional[float]: Expiry as a Unix timestamp, None if not a JWT
+    """
+    try:
+        payload = token.removeprefix("Bearer ").split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp is not None else None
+    except Exception:
+        return None
+
+
+def positive_ttl(token: str) -> float:
+    """Return how long a successful validation of token may be cached."""
+    expiry = token_expiry(token)
+    if expiry is None:
+        return VALIDATION_CACHE_TTL_SECONDS
+    return min(VALIDATION_CACHE_TTL_SECONDS, expiry - time.time())
+
 
 async def make_http_request(
     url: str,
@@ -33,21 +128,21 @@ async def make_http_request(
 ) -> httpx.Response:
     """Make an HTTP request with proper error handling."""
     try:
-        async with httpx.AsyncClient() as client:
-            if method.upper() == "GET":
-                response = await client.get(
-                    url=url,
-                    headers=headers,
-                    timeout=REQUEST_TIMEOUT,
-                )
-            else:
-                response = await client.post(
-                    url=url,
-                    headers=headers,
-                    json=json_data,
-                    timeout=REQUEST_TIMEOUT,
-                )
-            return response
+        client = get_http_client()
+        if method.upper() == "GET":
+            response = await client.get(
+                url=url,
+                headers=headers,
+                timeout=REQUEST_TIMEOUT,
+            )
+        else:
+            response = await client.post(
+                url=url,
+                headers=headers,
+                json=json_data,
+                timeout=REQUEST_TIMEOUT,
+            )
+        return response
     except httpx.TimeoutException:
         raise HTTPException(
             status_code=status.HTTP_408_REQUEST_TIMEOUT,
@@ -66,7 +161,8 @@ async def validate(auth_request: AuthRequest, db: AsyncSession = Depends(get_db)
     """
     Validate a bearer token.
 
-    This endpoint fetches an authorized user's profile information.
+    This endpoint fetches an authorized user's profile information. Results
+    are served from the validation cache when possible.
 
     Args:
         auth_request: HTTP request details
@@ -76,17 +172,69 @@ async def validate(auth_request: AuthRequest, db: AsyncSession = Depends(get_db)
         AuthResponse: The authorized user's profile
 
     Raises:
-        HTTPException: 401 if the user is not authorized
-        HTTPException: 403 if the user is not found
+        HTTPException: 403 if the token is not valid or the user is not found
+        HTTPException: 503 if the auth service is unreachable
+    """
+    user_headers = get_user_headers_from_request(auth_request.request)
+    key = validation_cache_key(auth_request.api_key, user_headers)
+
+    cached = validation_cache.get(key)
+    metrics.set_gauge("validation_cache_hit_rate", validation_cache.stats()["hit_rate"])
+    if cached is not None:
+        if isinstance(cached, str):
+            metrics.increment("validation_cache", result="negative_hit")
+            raise TokenRejected(cached)
+        metrics.increment("validation_cache", result="hit")
+        return cached
+
+    if _validation_flight.in_flight(key):
+        metrics.increment("validation_cache", result="shared")
+    else:
+        metrics.increment("validation_cache", result="miss")
+
+    async def validate_and_cache() -> AuthResponse:
+        try:
+            auth_response = await validate_uncached(auth_request, user_headers, db)
+        except TokenRejected as e:
+            # Auth service errors and unknown users are retried instead
+            validation_cache.set(key, e.detail, VALIDATION_NEGATIVE_TTL_SECONDS)
+            raise
+        validation_cache.set(key, auth_response, positive_ttl(auth_request.api_key))
+        return auth_response
+
+    return await _validation_flight.do(key, validate_and_cache)
+
+
+async def validate_uncached(
+    auth_request: AuthRequest, user_headers: dict[str, str], db: AsyncSession
+) -> AuthResponse:
+    """
+    Validate a bearer token against the auth service and the users table.
+
+    Args:
+        auth_request: HTTP request details
+        user_headers: Forwarded identity headers of the request
+        db: Database session
+
+    Returns:
+        AuthResponse: The authorized user's profile
+
+    Raises:
+        HTTPException: 403 if the token is not valid or the user is not found
+        HTTPException: 503 if the auth service is unreachable
     """
     # Prepare headers
     headers = token_to_auth_header(auth_request.api_key)
-    user_headers = get_user_headers_from_request(auth_request.request)
     headers.update(user_headers)
 
     # Make validation request
     response = await make_http_request(SAR_VALIDATION_URL, headers)
 
+    if response.status_code in (
+        status.HTTP_401_UNAUTHORIZED,
+        status.HTTP_403_FORBIDDEN,
+    ):
+        raise TokenRejected(f"Authentication failed: {response.status_code}")
     if response.status_code != 200:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -109,8 +257,8 @@ async def validate(auth_request: AuthRequest, db: AsyncSession = Depends(get_db)
     )
 
 
-@router.post("/test", response_model=User)
-async def validate_with_headers(request: Request) -> User:
+@router.post("/test", response_model=AuthUser)
+async def validate_with_headers(request: Request) -> AuthUser:
     """
     Validate authentication using request headers.
 
@@ -120,7 +268,7 @@ async def validate_with_headers(request: Request) -> User:
         request: FastAPI request object containing headers
 
     Returns:
-        User: Authenticated user information
+        AuthUser: Authenticated user information
 
     Raises:
         HTTPException: If authentication fails
@@ -153,7 +301,9 @@ async def validate_with_headers(request: Request) -> User:
     try:
         response_data = response.json()
         auth_response = AuthResponse(**response_data)
-        return User(auth_response.principal, auth_response.attributes)
+        return AuthUser(
+            principal=auth_response.principal, attributes=auth_response.attributes
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -4,22 +4,50 @@ Virtual Assistants API endpoints for managing AI agents through LlamaStack.
 This module provides CRUD operations for virtual assistants (AI agents) that are
 managed through the LlamaStack platform. Virtual assistants can be configured with
 different models, tools, knowledge bases, and safety shields.
+
+Listings can be filtered to the caller's assigned agents and by name, and
+paginated by cursor. Agents are filtered before they are converted, and the
+converted VirtualAssistantRead objects are memoized per agent ID and config
+version, so listing a few assigned agents doesn't pay for all of them.
+LlamaStack has no paged agent listing, so every page still lists all agents
+from LlamaStack; pagination only trims the response.
+
+Environment variables:
+- VA_PROJECTION_CACHE_MAX_ENTRIES: Number of memoized agent projections
 """
 
-from typing import List
+import base64
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Request, status
-from llama_stack_client.lib.agents.agent import AgentUtils
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import schemas
 from ..api.llamastack import get_client_from_request
+from ..database import get_db, get_read_db
+from ..services.identity import get_current_user, invalidate_users
+from ..services.user_service import UserService
+from ..utils.cache import TTLCache
 from ..utils.logging_config import get_logger
-from ..virtual_agents.agent_model import VirtualAgent
+
+if TYPE_CHECKING:
+    from ..virtual_agents.agent_model import VirtualAgent
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/virtual_assistants", tags=["virtual_assistants"])
 
+VA_PROJECTION_CACHE_MAX_ENTRIES = int(
+    os.getenv("VA_PROJECTION_CACHE_MAX_ENTRIES", "5000")
+)
+
+# Agent configs are immutable in LlamaStack, so entries only need to expire
+# to bound memory; the config version in the key covers re-created agents
+_projection_cache = TTLCache(VA_PROJECTION_CACHE_MAX_ENTRIES, 24 * 3600)
+
 
 def get_strategy(temperature, top_p):
     """
@@ -59,6 +87,9 @@ async def create_virtual_assistant(
     Raises:
         HTTPException: If creation fails
     """
+    # Deferred import: the agent helpers pull in most of llama_stack_client
+    from llama_stack_client.lib.agents.agent import AgentUtils
+
     client = get_client_from_request(request)
     try:
         sampling_params = {
@@ -95,6 +126,7 @@ async def create_virtual_assistant(
         agentic_system_create_response = await client.agents.create(
             agent_config=agent_config,
         )
+        UserService.invalidate_agent_cache()
 
         return schemas.VirtualAssistantRead(
             id=agentic_system_create_response.agent_id,
@@ -114,7 +146,7 @@ async def create_virtual_assistant(
         )
 
 
-def to_va_response(agent: VirtualAgent):
+def to_va_response(agent: "VirtualAgent"):
     """
     Convert a LlamaStack VirtualAgent to API response format.
 
@@ -157,21 +189,118 @@ def to_va_response(agent: VirtualAgent):
     )
 
 
+def config_version(agent_config: Dict[str, Any]) -> str:
+    """Hash an agent config so that changed configs get new cache entries."""
+    payload = json.dumps(agent_config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cached_va_response(agent: "VirtualAgent") -> schemas.VirtualAssistantRead:
+    """
+    Convert an agent to its API response, memoized per ID and config version.
+
+    Args:
+        agent: VirtualAgent object from LlamaStack
+
+    Returns:
+        VirtualAssistantRead schema with formatted data
+    """
+    key = (agent.agent_id, config_version(agent.agent_config))
+    response = _projection_cache.get(key)
+    if response is None:
+        response = to_va_response(agent)
+        _projection_cache.set(key, response)
+    return response
+
+
+def encode_cursor(agent_id: str) -> str:
+    """Encode the position after agent_id as an opaque page cursor."""
+    payload = json.dumps({"after": agent_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Decode a cursor made by encode_cursor into the agent ID it follows.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded))["after"]
+    except (ValueError, TypeError, KeyError):
+        after = None
+    if not isinstance(after, str):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return after
+
+
 @router.get("/", response_model=List[schemas.VirtualAssistantRead])
-async def get_virtual_assistants(request: Request):
+async def get_virtual_assistants(
+    request: Request,
+    response: Response,
+    assigned: bool = Query(
+        False, description="Only return agents assigned to the current user"
+    ),
+    name: Optional[str] = Query(
+        None, description="Case-insensitive substring of the agent name"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor value returned by the previous page"
+    ),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Retrieve all virtual assistants from LlamaStack.
+    Retrieve virtual assistants from LlamaStack.
+
+    Without a limit or cursor every matching agent is returned in LlamaStack
+    order. Paginated results are ordered by agent ID; when more agents
+    follow, the X-Next-Cursor response header holds the cursor for the next
+    page. Each page is cut from a full LlamaStack listing, so pagination
+    bounds the response size but not the LlamaStack traffic.
+
+    Args:
+        assigned: Only return agents assigned to the current user
+        name: Case-insensitive substring the agent name must contain
+        cursor: Return agents after this cursor
+        limit: Maximum number of agents to return
+        db: Database session dependency, used to resolve the current user
 
     Returns:
-        List of all virtual assistants configured in the system
+        List of virtual assistants configured in the system
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+        HTTPException: 401 if assigned is set and the request carries no identity
     """
-    # get all virtual assitants or agents from llama stack
-    client = get_client_from_request(request)
-    agents = await client.agents.list()
-    response_list = []
-    for agent in agents:
-        response_list.append(to_va_response(agent))
-    return response_list
+    after = decode_cursor(cursor) if cursor is not None else None
+    agents = await get_client_from_request(request).agents.list()
+
+    if assigned:
+        user = await get_current_user(request, db)
+        allowed = set(user.agent_ids or []) if user else set()
+        agents = [agent for agent in agents if agent.agent_id in allowed]
+    if name:
+        needle = name.lower()
+        agents = [
+            agent
+            for agent in agents
+            if needle in (agent.agent_config.get("name") or "").lower()
+        ]
+
+    if cursor is not None or limit is not None:
+        agents = sorted(agents, key=lambda agent: agent.agent_id)
+        if after is not None:
+            agents = [agent for agent in agents if agent.agent_id > after]
+        if limit is not None and len(agents) > limit:
+            agents = agents[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(agents[-1].agent_id)
+
+    return [cached_va_response(agent) for agent in agents]
 
 
 @router.get("/{va_id}", response_model=schemas.VirtualAssistantRead)
@@ -193,22 +322,47 @@ async def read_virtual_assistant(va_id: str, request: Request):
     return to_va_response(agent)
 
 
+@router.get("/{va_id}/users", response_model=List[schemas.UserRead])
+async def read_virtual_assistant_users(
+    va_id: str, db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Retrieve the users a virtual assistant is assigned to.
+
+    Args:
+        va_id: The unique identifier of the virtual assistant
+        db: Database session dependency
+
+    Returns:
+        List of users having the virtual assistant in their agent list
+    """
+    return await UserService.get_users_with_agent(db, va_id)
+
+
 # @router.put("/{va_id}", response_model=schemas.VirtualAssistantRead)
 # async def update_virtual_assistant(va_id: str):
 #     pass
 
 
 @router.delete("/{va_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_virtual_assistant(va_id: str, request: Request):
+async def delete_virtual_assistant(
+    va_id: str, request: Request, db: AsyncSession = Depends(get_db)
+):
     """
-    Delete a virtual assistant from LlamaStack.
+    Delete a virtual assistant from LlamaStack and unassign it from all users.
 
     Args:
         va_id: The unique identifier of the virtual assistant to delete
+        db: Database session dependency
 
     Returns:
         None (204 No Content status)
     """
     client = get_client_from_request(request)
     await client.agents.delete(agent_id=va_id)
+    UserService.invalidate_agent_cache()
+
+    if await UserService.remove_agent_from_all_users(db, va_id):
+        await db.commit()
+        invalidate_users()
     return None
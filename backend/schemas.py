@@ -57,6 +57,11 @@ class UserAgentAssignment(BaseModel):
     agent_ids: List[str]
 
 
+class BulkUserAgentAssignment(BaseModel):
+    user_ids: List[UUID4]
+    agent_ids: List[str]
+
+
 # MCPServer Schemas
 class MCPServerBase(BaseModel):
     toolgroup_id: str  # LlamaStack identifier (now PK)
@@ -214,3 +219,28 @@ class ModelServerRead(ModelServerBase):
 
     class Config:
         orm_mode = True
+
+
+# Custom auth provider contract. These mirror the request and response models
+# in llama_stack.distribution.server.auth_providers, so validating a token
+# doesn't import the LlamaStack server package.
+class AuthRequestContext(BaseModel):
+    path: str
+    headers: Dict[str, str]
+    params: Dict[str, List[str]]
+
+
+class AuthRequest(BaseModel):
+    api_key: str
+    request: AuthRequestContext
+
+
+class AuthResponse(BaseModel):
+    principal: str
+    attributes: Optional[Dict[str, List[str]]] = None
+    message: Optional[str] = None
+
+
+class AuthUser(BaseModel):
+    principal: str
+    attributes: Optional[Dict[str, List[str]]] = None
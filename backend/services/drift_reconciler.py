@@ -0,0 +1,241 @@
+"""
+Continuous drift detection and healing between LlamaStack and the database.
+
+Each LlamaStack-backed resource registers its sync spec and listing function.
+A drift check then:
+
+1. Lists the resource from LlamaStack and fingerprints the listing, a hash
+   over the identifiers and synced field values.
+2. Fingerprints the local table the same way from a narrow column projection.
+3. Skips the resource when both fingerprints match - the common case.
+4. Otherwise computes the exact diff without writing and, if auto-heal is
+   enabled and the diff is within DRIFT_AUTOHEAL_MAX_CHANGES, applies it.
+   Larger diffs, and listings that would wipe a non-empty table, are only
+   reported so that a LlamaStack outage never empties the database.
+
+Entities with pending or failed sync outbox rows are left out of the check
+and listed under "unsynced" in the report. Their LlamaStack state lags
+behind the database until the outbox worker has synced them, so healing them
+could delete a freshly created row, or one whose registration ran out of
+retries, or restore a stale one.
+
+Drift counts and check outcomes are exported through utils.metrics.
+
+Environment variables:
+- DRIFT_AUTOHEAL: "true" to apply small diffs automatically (default "true")
+- DRIFT_AUTOHEAL_MAX_CHANGES: Largest diff (rows) that is healed automatically
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..database import BackgroundSessionLocal
+from ..utils import metrics
+from ..utils.logging_config import get_logger
+from .sync_engine import SyncSpec, reconcile
+
+logger = get_logger(__name__)
+
+DRIFT_AUTOHEAL = os.getenv("DRIFT_AUTOHEAL", "true").lower() in ("1", "true", "yes")
+DRIFT_AUTOHEAL_MAX_CHANGES = int(os.getenv("DRIFT_AUTOHEAL_MAX_CHANGES", "25"))
+
+
+@dataclass(frozen=True)
+class DriftResource:
+    """A LlamaStack-backed table watched by the drift reconciler."""
+
+    name: str
+    spec: SyncSpec
+    fetch: Callable[[], Awaitable[Dict[Any, Dict[str, Any]]]]
+    outbox_entity_type: Optional[str] = None
+
+
+_resources: Dict[str, DriftResource] = {}
+_last_reports: Dict[str, Dict[str, Any]] = {}
+
+
+def register_resource(
+    name: str,
+    spec: SyncSpec,
+    fetch: Callable[[], Awaitable[Dict[Any, Dict[str, Any]]]],
+    outbox_entity_type: Optional[str] = None,
+) -> None:
+    """
+    Register a resource for drift checks.
+
+    Args:
+        name: Resource name used in reports and metrics
+        spec: Mapping between the LlamaStack resource and the table
+        fetch: Coroutine returning the desired rows keyed by natural key
+        outbox_entity_type: Sync outbox entity type of the resource, if its
+                            writes are synced through the outbox
+    """
+    _resources[name] = DriftResource(
+        name=name, spec=spec, fetch=fetch, outbox_entity_type=outbox_entity_type
+    )
+
+
+def fingerprint(spec: SyncSpec, rows: Dict[Any, Dict[str, Any]]) -> str:
+    """
+    Hash the keys and synced field values of a set of rows.
+
+    Args:
+        spec: Sync spec naming the key and the synced fields
+        rows: Natural key -> column values
+
+    Returns:
+        str: Hex digest that changes whenever any synced value changes
+    """
+    canonical = sorted(
+        (str(key), [values.get(name) for name in spec.fields])
+        for key, values in rows.items()
+    )
+    payload = json.dumps(canonical, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def load_local_rows(
+    db: AsyncSession, spec: SyncSpec
+) -> Dict[Any, Dict[str, Any]]:
+    """Load only the key and synced columns of the local table."""
+    columns = [getattr(spec.model, name) for name in (spec.key, *spec.fields)]
+    result = await db.execute(select(*columns))
+    return {row[0]: dict(zip(spec.fields, row[1:])) for row in result.all()}
+
+
+async def load_unsynced_outbox_keys(db: AsyncSession, entity_type: str) -> Set[str]:
+    """Load the ids of entities with pending or failed sync outbox rows."""
+    result = await db.execute(
+        select(models.SyncOutbox.entity_id)
+        .where(
+            models.SyncOutbox.entity_type == entity_type,
+            models.SyncOutbox.status.in_(("pending", "failed")),
+        )
+        .distinct()
+    )
+    return set(result.scalars().all())
+
+
+async def check_resource(
+    db: AsyncSession, resource: DriftResource, heal: bool
+) -> Dict[str, Any]:
+    """
+    Check one resource for drift and optionally heal it.
+
+    Args:
+        db: Database session
+        resource: Registered resource
+        heal: Whether small diffs may be applied
+
+    Returns:
+        Dict[str, Any]: Drift report for the resource
+    """
+    spec = resource.spec
+    desired = await resource.fetch()
+    local = await load_local_rows(db, spec)
+    if not spec.delete_missing:
+        # Local-only rows are expected (e.g. pending knowledge bases)
+        local = {key: values for key, values in local.items() if key in desired}
+    keys = None
+    unsynced: Set[str] = set()
+    if resource.outbox_entity_type is not None:
+        unsynced = await load_unsynced_outbox_keys(db, resource.outbox_entity_type)
+        if unsynced:
+            desired = {k: v for k, v in desired.items() if k not in unsynced}
+            local = {k: v for k, v in local.items() if k not in unsynced}
+            keys = sorted(set(desired) | set(local), key=str)
+
+    report: Dict[str, Any] = {
+        "resource": resource.name,
+        "remote_count": len(desired),
+        "local_count": len(local),
+        "added": [],
+        "updated": [],
+        "removed": [],
+        "unsynced": sorted(unsynced, key=str),
+    }
+    if fingerprint(spec, desired) == fingerprint(spec, local):
+        report["outcome"] = "in_sync"
+        return report
+
+    diff = await reconcile(db, spec, desired, resource.name, apply=False, keys=keys)
+    report.update(diff.summary())
+    report["resource"] = resource.name
+    changes = len(diff.added) + len(diff.updated) + len(diff.removed)
+
+    if not diff.changed:
+        report["outcome"] = "in_sync"
+    elif not heal or not DRIFT_AUTOHEAL:
+        report["outcome"] = "drift_detected"
+    elif not desired and local:
+        report["outcome"] = "held"
+        report["reason"] = "LlamaStack returned no items"
+    elif changes > DRIFT_AUTOHEAL_MAX_CHANGES:
+        report["outcome"] = "held"
+        report["reason"] = (
+            f"{changes} changes exceed DRIFT_AUTOHEAL_MAX_CHANGES "
+            f"({DRIFT_AUTOHEAL_MAX_CHANGES})"
+        )
+    else:
+        await reconcile(db, spec, desired, resource.name, keys=keys)
+        report["outcome"] = "healed"
+    return report
+
+
+def _record(report: Dict[str, Any]) -> None:
+    name = report["resource"]
+    for kind in ("added", "updated", "removed"):
+        metrics.set_gauge(f"drift_{kind}", len(report.get(kind, [])), resource=name)
+    metrics.increment("drift_checks", resource=name, outcome=report["outcome"])
+    metrics.set_gauge("drift_last_check_timestamp", report["checked_at"], resource=name)
+    if report["outcome"] == "held":
+        logger.warning(f"Drift on {name} not healed: {report.get('reason')}")
+    elif report["outcome"] != "in_sync":
+        logger.info(f"Drift on {name}: {report}")
+
+
+async def check_all(
+    heal: bool = True, names: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run a drift check on every registered resource.
+
+    Args:
+        heal: Whether small diffs may be applied
+        names: Restrict the check to these resources
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Resource name -> drift report
+    """
+    reports = {}
+    for resource in _resources.values():
+        if names is not None and resource.name not in names:
+            continue
+        start = time.perf_counter()
+        try:
+            async with BackgroundSessionLocal() as db:
+                report = await check_resource(db, resource, heal)
+        except Exception as e:
+            logger.error(f"Drift check failed for {resource.name}: {str(e)}")
+            report = {"resource": resource.name, "outcome": "error", "error": str(e)}
+        report["checked_at"] = time.time()
+        metrics.observe(
+            "drift_check_duration", time.perf_counter() - start, resource=resource.name
+        )
+        _record(report)
+        reports[resource.name] = report
+        _last_reports[resource.name] = report
+    return reports
+
+
+def last_reports() -> Dict[str, Dict[str, Any]]:
+    """Return the most recent drift report of every resource."""
+    return dict(_last_reports)
@@ -0,0 +1,179 @@
+"""
+Per-request caller identity and the in-process user cache.
+
+IdentityMiddleware parses the forwarded identity headers once per request
+into ``request.state.identity``. The matching user row is resolved lazily,
+at most once per request, through a TTL cache of ``schemas.UserRead``
+snapshots so repeated requests from the same caller do not query the users
+table. Misses are read from the primary and unknown callers are not cached,
+so a newly created user is recognized right away on every replica.
+
+The user CRUD routes call invalidate_users() after every write, which only
+clears this process's cache. Other replicas keep serving the old role and
+agent assignments of a changed user for up to USER_CACHE_TTL_SECONDS.
+
+Environment variables:
+- USER_CACHE_TTL_SECONDS: How long a resolved user is cached, which bounds
+  how stale other replicas may be
+- USER_CACHE_MAX_ENTRIES: Maximum number of cached users
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Callable, List, Mapping, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models, schemas
+from ..database import get_db
+from ..utils import metrics
+from ..utils.cache import TTLCache
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "10"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "5000"))
+
+user_cache = TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+_invalidation_hooks: List[Callable[[], None]] = []
+
+
+@dataclass(frozen=True)
+class Identity:
+    """Caller identity forwarded by the authenticating proxy."""
+
+    username: Optional[str] = None
+    email: Optional[str] = None
+
+    @property
+    def is_anonymous(self) -> bool:
+        return not self.username and not self.email
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Forwarded identity headers to pass on to LlamaStack."""
+        headers = {}
+        if self.username:
+            headers["X-Forwarded-User"] = self.username
+        if self.email:
+            headers["X-Forwarded-Email"] = self.email
+        return headers
+
+
+def identity_from_headers(headers: Mapping[str, str]) -> Identity:
+    """
+    Build an Identity from request headers.
+
+    Args:
+        headers: Starlette headers or a plain dictionary in any case
+
+    Returns:
+        Identity: The forwarded identity, possibly anonymous
+    """
+    return Identity(
+        username=headers.get("X-Forwarded-User") or headers.get("x-forwarded-user"),
+        email=headers.get("X-Forwarded-Email") or headers.get("x-forwarded-email"),
+    )
+
+
+def get_request_identity(request: Request) -> Identity:
+    """Return the identity parsed by IdentityMiddleware, parsing it if needed."""
+    identity = getattr(request.state, "identity", None)
+    if identity is None:
+        identity = identity_from_headers(request.headers)
+        request.state.identity = identity
+    return identity
+
+
+class IdentityMiddleware:
+    """ASGI middleware storing the caller identity in ``request.state``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = {
+                key.decode("latin-1"): value.decode("latin-1")
+                for key, value in scope["headers"]
+                if key in (b"x-forwarded-user", b"x-forwarded-email")
+            }
+            scope.setdefault("state", {})["identity"] = identity_from_headers(headers)
+        await self.app(scope, receive, send)
+
+
+def register_invalidation_hook(hook: Callable[[], None]) -> None:
+    """Register a callback run whenever cached users are invalidated."""
+    _invalidation_hooks.append(hook)
+
+
+def invalidate_users() -> None:
+    """Drop all cached users, e.g. after a user was created or changed."""
+    user_cache.clear()
+    for hook in _invalidation_hooks:
+        hook()
+
+
+async def resolve_user(
+    identity: Identity, db: AsyncSession
+) -> Optional[schemas.UserRead]:
+    """
+    Look up the user matching an identity, using the user cache.
+
+    Only found users are cached, so a caller who is created later isn't
+    rejected from the cache.
+
+    Args:
+        identity: Caller identity
+        db: Primary database session used on a cache miss; a lagging replica
+            would cache the user's old state
+
+    Returns:
+        Optional[schemas.UserRead]: The user, or None if no user matches
+
+    Raises:
+        HTTPException: 401 if the identity is anonymous
+    """
+    if identity.is_anonymous:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    cached = user_cache.get(identity)
+    if cached is not None:
+        metrics.increment("user_cache", result="hit")
+        return cached
+
+    metrics.increment("user_cache", result="miss")
+    result = await db.execute(
+        select(models.User).where(
+            (models.User.username == identity.username)
+            | (models.User.email == identity.email)
+        )
+    )
+    user = result.scalar_one_or_none()
+    snapshot = (
+        schemas.UserRead.model_validate(user, from_attributes=True) if user else None
+    )
+    if snapshot is not None:
+        user_cache.set(identity, snapshot)
+    return snapshot
+
+
+async def get_current_user(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> Optional[schemas.UserRead]:
+    """
+    FastAPI dependency resolving the caller's user once per request.
+
+    Args:
+        request: Current request
+        db: Database session dependency
+
+    Returns:
+        Optional[schemas.UserRead]: The caller's user, or None if unknown
+
+    Raises:
+        HTTPException: 401 if the request carries no identity
+    """
+    if not hasattr(request.state, "user"):
+        request.state.user = await resolve_user(get_request_identity(request), db)
+    return request.state.user
@@ -0,0 +1,175 @@
+"""
+Leader election across backend replicas using a Postgres advisory lock.
+
+Startup and periodic reconciliation with LlamaStack should run on exactly one
+replica. The leader holds a session-level advisory lock on a dedicated
+database connection; the lock is released when the connection closes, so a
+crashed leader is replaced as soon as another replica retries. Followers skip
+the reconciliation work and keep retrying the lock.
+
+On databases other than Postgres (local development with SQLite) every
+process is its own leader.
+
+Environment variables:
+- LEADER_LOCK_ID: Advisory lock key shared by all replicas
+- LEADER_RETRY_SECONDS: How often followers retry and the leader re-checks
+- SYNC_RECONCILE_INTERVAL_SECONDS: Interval between leader reconciliations,
+  0 disables periodic reconciliation
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..database import background_engine
+from ..utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+LEADER_LOCK_ID = int(os.getenv("LEADER_LOCK_ID", "7245811901"))
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "30"))
+SYNC_RECONCILE_INTERVAL_SECONDS = float(
+    os.getenv("SYNC_RECONCILE_INTERVAL_SECONDS", "300")
+)
+
+
+class LeaderElector:
+    """Holds (or tries to hold) the advisory lock for this process."""
+
+    def __init__(self, db_engine: AsyncEngine, lock_id: int):
+        self.engine = db_engine
+        self.lock_id = lock_id
+        self._connection: Optional[AsyncConnection] = None
+        self._is_leader = False
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    @property
+    def uses_advisory_lock(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    async def try_acquire(self) -> bool:
+        """
+        Try to become the leader without blocking.
+
+        Returns:
+            bool: True if this process is the leader
+        """
+        if self._is_leader:
+            return await self.still_leader()
+        if not self.uses_advisory_lock:
+            self._is_leader = True
+            return True
+
+        try:
+            if self._connection is None:
+                # Autocommit keeps the lock connection from idling in a
+                # transaction; session-level locks survive across statements
+                connection = await self.engine.connect()
+                self._connection = await connection.execution_options(
+                    isolation_level="AUTOCOMMIT"
+                )
+            result = await self._connection.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"),
+                {"lock_id": self.lock_id},
+            )
+            self._is_leader = bool(result.scalar())
+        except Exception as e:
+            logger.warning(f"Leader election attempt failed: {str(e)}")
+            await self._close()
+            return False
+
+        if self._is_leader:
+            logger.info("Acquired sync leadership")
+        else:
+            # Do not keep an idle connection open while following
+            await self._close()
+        return self._is_leader
+
+    async def still_leader(self) -> bool:
+        """
+        Check that the lock connection is still alive.
+
+        Returns:
+            bool: False if leadership was lost with the connection
+        """
+        if not self._is_leader or not self.uses_advisory_lock:
+            return self._is_leader
+        try:
+            await self._connection.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"Lost sync leadership: {str(e)}")
+            self._is_leader = False
+            await self._close()
+            return False
+
+    async def release(self) -> None:
+        """Give up leadership, e.g. on shutdown."""
+        if self._is_leader and self._connection is not None:
+            try:
+                await self._connection.execute(
+                    text("SELECT pg_advisory_unlock(:lock_id)"),
+                    {"lock_id": self.lock_id},
+                )
+                logger.info("Released sync leadership")
+            except Exception as e:
+                logger.warning(f"Failed to release sync leadership: {str(e)}")
+        self._is_leader = False
+        await self._close()
+
+    async def _close(self) -> None:
+        if self._connection is not None:
+            try:
+                await self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+elector = LeaderElector(background_engine, LEADER_LOCK_ID)
+
+
+async def run_leader_loop(
+    reconcile: Callable[[], Awaitable[Any]],
+    interval_seconds: float = SYNC_RECONCILE_INTERVAL_SECONDS,
+) -> None:
+    """
+    Run reconcile on the leader until cancelled.
+
+    A replica that becomes leader reconciles immediately, then every
+    interval_seconds (never again when it is 0). Followers only retry the
+    lock. Leadership is released when the loop is cancelled.
+
+    Args:
+        reconcile: Coroutine function performing one reconciliation
+        interval_seconds: Seconds between reconciliations on the leader
+    """
+    next_run = time.monotonic() + interval_seconds if elector.is_leader else 0.0
+    try:
+        while True:
+            was_leader = elector.is_leader
+            if await elector.try_acquire():
+                # A freshly elected leader always reconciles once
+                due = interval_seconds > 0 and time.monotonic() >= next_run
+                if not was_leader or due:
+                    try:
+                        await reconcile()
+                    except Exception as e:
+                        logger.error(f"Leader reconciliation failed: {str(e)}")
+                    next_run = time.monotonic() + interval_seconds
+            elif was_leader:
+                logger.info("Sync leadership moved to another replica")
+
+            sleep_for = LEADER_RETRY_SECONDS
+            if elector.is_leader and interval_seconds > 0:
+                sleep_for = min(sleep_for, max(next_run - time.monotonic(), 1.0))
+            await asyncio.sleep(sleep_for)
+    finally:
+        await elector.release()
@@ -3,15 +3,16 @@ LlamaStack synchronization service for event-driven sync operations.
 """
 
 import logging
+from datetime import datetime, timezone
 from typing import Any, Dict
 
-from sqlalchemy.ext.asyncio import AsyncSession
-
 from .. import models
-from ..api.llamastack import sync_client
+from ..api.llamastack import get_sync_client
 
 log = logging.getLogger(__name__)
 
+MCP_PROVIDER_ID = "model-context-protocol"
+
 
 class LlamaStackSyncService:
     """Service for synchronizing data with LlamaStack"""
@@ -26,7 +27,7 @@ class LlamaStackSyncService:
             log.info(f"Syncing knowledge base creation to LlamaStack: {kb.name}")
 
             # Register the vector database in LlamaStack
-            await sync_client.vector_dbs.register(
+            await get_sync_client().vector_dbs.register(
                 vector_db_id=kb.vector_db_name,
                 embedding_model=kb.embedding_model,
                 embedding_dimension=384,  # Default dimension
@@ -51,7 +52,7 @@ class LlamaStackSyncService:
 
             # Since LlamaStack doesn't have update, we re-register
             # This might overwrite existing data, but ensures consistency
-            await sync_client.vector_dbs.register(
+            await get_sync_client().vector_dbs.register(
                 vector_db_id=kb.vector_db_name,
                 embedding_model=kb.embedding_model,
                 embedding_dimension=384,
@@ -86,29 +87,44 @@ class LlamaStackSyncService:
     @staticmethod
     async def sync_mcp_server_create(server: models.MCPServer) -> bool:
         """
-        Sync a newly created MCP server to LlamaStack.
-        Note: MCP servers are typically registered directly with LlamaStack.
+        Register a newly created MCP server as a LlamaStack toolgroup.
+        Returns True if successful, False otherwise.
         """
         try:
-            log.info(f"MCP server created locally: {server.name}")
-            # MCP servers are usually managed externally and discovered by LlamaStack
-            # We don't need to register them as they should be auto-discovered
-            log.info(f"MCP server sync completed: {server.name}")
+            log.info(f"Registering MCP server in LlamaStack: {server.toolgroup_id}")
+            await get_sync_client().toolgroups.register(
+                toolgroup_id=server.toolgroup_id,
+                provider_id=MCP_PROVIDER_ID,
+                mcp_endpoint={"uri": server.endpoint_url},
+            )
+            log.info(f"Successfully registered MCP server: {server.toolgroup_id}")
             return True
 
         except Exception as e:
-            log.error(f"Failed to sync MCP server creation: {str(e)}")
+            log.error(f"Failed to register MCP server in LlamaStack: {str(e)}")
             return False
 
     @staticmethod
     async def sync_mcp_server_update(server: models.MCPServer) -> bool:
         """
         Sync an MCP server update to LlamaStack.
+        Note: LlamaStack doesn't have update operations, so we re-register.
         """
         try:
-            log.info(f"MCP server updated locally: {server.name}")
-            # MCP servers are managed externally, updates should be
-            # reflected automatically
+            log.info(f"Re-registering MCP server in LlamaStack: {server.toolgroup_id}")
+            try:
+                await get_sync_client().toolgroups.unregister(
+                    toolgroup_id=server.toolgroup_id
+                )
+            except Exception as e:
+                log.debug(f"Toolgroup not registered before update: {str(e)}")
+
+            await get_sync_client().toolgroups.register(
+                toolgroup_id=server.toolgroup_id,
+                provider_id=MCP_PROVIDER_ID,
+                mcp_endpoint={"uri": server.endpoint_url},
+            )
+            log.info(f"Successfully re-registered MCP server: {server.toolgroup_id}")
             return True
 
         except Exception as e:
@@ -116,58 +132,54 @@ class LlamaStackSyncService:
             return False
 
     @staticmethod
-    async def sync_mcp_server_delete(server_name: str) -> bool:
+    async def sync_mcp_server_delete(toolgroup_id: str) -> bool:
         """
-        Sync an MCP server deletion to LlamaStack.
+        Unregister a deleted MCP server's toolgroup from LlamaStack.
+        A toolgroup that is already gone counts as success.
         """
         try:
-            log.warning(f"MCP server deleted from local DB: {server_name}")
-            # MCP servers are managed externally, LlamaStack will discover the removal
+            log.info(f"Unregistering MCP server from LlamaStack: {toolgroup_id}")
+            await get_sync_client().toolgroups.unregister(toolgroup_id=toolgroup_id)
             return True
 
         except Exception as e:
-            log.error(f"Failed to handle MCP server deletion sync: {str(e)}")
+            if getattr(e, "status_code", None) == 404 or "not found" in str(e):
+                log.info(f"MCP server already absent from LlamaStack: {toolgroup_id}")
+                return True
+            log.error(f"Failed to unregister MCP server from LlamaStack: {str(e)}")
             return False
 
     @staticmethod
-    async def validate_sync_status(db: AsyncSession) -> Dict[str, Any]:
+    async def validate_sync_status() -> Dict[str, Any]:
         """
-        Validate that local database is in sync with LlamaStack.
-        Returns a report of sync status.
+        Validate that the local database is in sync with LlamaStack.
+        Covers every resource registered with the drift reconciler and
+        returns a per-resource report without changing anything.
         """
+        # Imported lazily: the reconciler's resources live in the routes,
+        # which import this module
+        from . import drift_reconciler
+
         try:
             log.info("Validating sync status with LlamaStack")
-
-            # Get LlamaStack vector databases
-            llamastack_vdbs = await sync_client.vector_dbs.list()
-            llamastack_vdb_names = {vdb.identifier for vdb in llamastack_vdbs}
-
-            # Get local knowledge bases
-            from sqlalchemy import select
-
-            result = await db.execute(select(models.KnowledgeBase))
-            local_kbs = result.scalars().all()
-            local_vdb_names = {kb.vector_db_name for kb in local_kbs}
-
-            # Compare
-            only_in_llamastack = llamastack_vdb_names - local_vdb_names
-            only_in_local = local_vdb_names - llamastack_vdb_names
-            in_both = llamastack_vdb_names & local_vdb_names
-
+            reports = await drift_reconciler.check_all(heal=False)
+            outcomes = {report["outcome"] for report in reports.values()}
+            if "error" in outcomes:
+                sync_status = "error"
+            elif outcomes - {"in_sync"}:
+                sync_status = "drift_detected"
+            else:
+                sync_status = "ok"
             return {
-                "sync_status": (
-                    "ok"
-                    if not only_in_llamastack and not only_in_local
-                    else "drift_detected"
-                ),
-                "total_local": len(local_vdb_names),
-                "total_llamastack": len(llamastack_vdb_names),
-                "in_sync": len(in_both),
-                "only_in_llamastack": list(only_in_llamastack),
-                "only_in_local": list(only_in_local),
-                "timestamp": None,  # Will be set by caller
+                "sync_status": sync_status,
+                "resources": reports,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
             }
 
         except Exception as e:
             log.error(f"Failed to validate sync status: {str(e)}")
-            return {"sync_status": "error", "error": str(e), "timestamp": None}
+            return {
+                "sync_status": "error",
+                "error": str(e),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
@@ -0,0 +1,254 @@
+"""
+Diff-based reconciliation engine for LlamaStack-backed tables.
+
+The MCP server, model server and knowledge base syncs all follow the same
+pattern: list a resource type from LlamaStack, compare it with a local table
+and bring the table in line. This module implements that pattern once:
+
+- The desired state is a mapping of natural key -> column values.
+- Existing rows are loaded with a single SELECT and diffed in memory using
+  set operations on the keys and per-field comparisons on the values.
+- New rows are written with one bulk upsert statement, changed rows with
+  one executemany UPDATE by primary key and removed rows with one bulk
+  DELETE statement.
+- Only rows whose values actually changed are written, so a sync with no
+  drift costs the LlamaStack listing, the table listing and no writes.
+"""
+
+from dataclasses import dataclass, field
+from inspect import isawaitable
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class SyncSpec:
+    """
+    Describes how a LlamaStack resource maps onto a local table.
+
+    Attributes:
+        model: SQLAlchemy model of the local table
+        key: Column holding the LlamaStack identifier used to match rows
+        fields: Columns owned by the sync; they are compared and overwritten
+        insert_only_fields: Columns only written when a row is first created
+        delete_missing: Remove local rows that are absent from LlamaStack
+        new_primary_key: Factory for the primary key of new rows, required
+                         when the key column is not the primary key
+        on_change: Function or coroutine function called after a sync
+                   committed changes to the table, e.g. to invalidate caches
+                   derived from it
+    """
+
+    model: Any
+    key: str
+    fields: Tuple[str, ...]
+    insert_only_fields: Tuple[str, ...] = ()
+    delete_missing: bool = True
+    new_primary_key: Optional[Callable[[], Any]] = None
+    on_change: Optional[Callable[[], Any]] = None
+
+
+@dataclass
+class SyncResult:
+    """Outcome of a reconciliation run."""
+
+    resource: str
+    added: List[Any] = field(default_factory=list)
+    updated: List[Any] = field(default_factory=list)
+    removed: List[Any] = field(default_factory=list)
+    unchanged: int = 0
+    rows: List[Any] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return a JSON friendly diff summary."""
+        return {
+            "resource": self.resource,
+            "added": [str(key) for key in self.added],
+            "updated": [str(key) for key in self.updated],
+            "removed": [str(key) for key in self.removed],
+            "unchanged": self.unchanged,
+        }
+
+
+def listing_to_dicts(response: Any) -> List[Dict[str, Any]]:
+    """
+    Normalize a LlamaStack list response into a list of dictionaries.
+
+    Args:
+        response: Result of a LlamaStack ``list()`` call
+
+    Returns:
+        List[Dict[str, Any]]: One dictionary per listed item
+    """
+    if isinstance(response, list):
+        items = response
+    elif isinstance(response, dict):
+        items = response.get("data", [])
+    elif hasattr(response, "data"):
+        items = response.data
+    else:
+        logger.warning(f"Unexpected response type: {type(response)}")
+        items = []
+    return [item if isinstance(item, dict) else item.__dict__ for item in items]
+
+
+def diff_keys(
+    desired_keys: set, existing_keys: set, delete_missing: bool = True
+) -> Tuple[set, set, set]:
+    """
+    Split keys into added, kept and removed sets.
+
+    Args:
+        desired_keys: Keys present in LlamaStack
+        existing_keys: Keys present in the local table
+        delete_missing: Whether keys absent from LlamaStack count as removed
+
+    Returns:
+        Tuple of (added, kept, removed) key sets
+    """
+    added = desired_keys - existing_keys
+    kept = desired_keys & existing_keys
+    removed = existing_keys - desired_keys if delete_missing else set()
+    return added, kept, removed
+
+
+async def reconcile(
+    db: AsyncSession,
+    spec: SyncSpec,
+    desired: Dict[Any, Dict[str, Any]],
+    resource: str,
+    apply: bool = True,
+    keys: Optional[List[Any]] = None,
+) -> SyncResult:
+    """
+    Bring a local table in line with the desired LlamaStack state.
+
+    Args:
+        db: Database session
+        spec: Mapping between the LlamaStack resource and the table
+        desired: Natural key -> column values for every LlamaStack item
+        resource: Resource name used in logs and the diff summary
+        apply: When False only compute the diff, without writing
+        keys: Restrict the sync to these natural keys; rows outside the
+              scope are neither loaded nor compared
+
+    Returns:
+        SyncResult: Diff summary and the rows that match the desired state
+    """
+    mapper = inspect(spec.model)
+    if len(mapper.primary_key) != 1:
+        raise ValueError(f"{spec.model.__name__} must have a single-column PK")
+    pk_name = mapper.primary_key[0].key
+    key_column = getattr(spec.model, spec.key)
+
+    query = select(spec.model)
+    if keys is not None:
+        query = query.where(key_column.in_(keys))
+        desired = {key: values for key, values in desired.items() if key in keys}
+    result = await db.execute(query)
+    existing = {getattr(row, spec.key): row for row in result.scalars().all()}
+
+    added, kept, removed = diff_keys(
+        set(desired), set(existing), delete_missing=spec.delete_missing
+    )
+    updated = {
+        key
+        for key in kept
+        if any(
+            getattr(existing[key], name) != desired[key].get(name)
+            for name in spec.fields
+        )
+    }
+
+    sync_result = SyncResult(
+        resource=resource,
+        added=sorted(added, key=str),
+        updated=sorted(updated, key=str),
+        removed=sorted(removed, key=str),
+        unchanged=len(kept) - len(updated),
+    )
+
+    if not apply or not sync_result.changed:
+        sync_result.rows = [existing[key] for key in desired if key in existing]
+        return sync_result
+
+    written_columns = (spec.key, *spec.fields)
+    upserts = []
+    for key in sync_result.added:
+        values = {name: desired[key].get(name) for name in written_columns}
+        values.update(
+            {name: desired[key].get(name) for name in spec.insert_only_fields}
+        )
+        if pk_name != spec.key:
+            values[pk_name] = spec.new_primary_key()
+        upserts.append(values)
+
+    if upserts:
+        # Multi-row VALUES needs the same columns on every row
+        columns = set().union(*upserts)
+        upserts = [{name: row.get(name) for name in columns} for row in upserts]
+        stmt = pg_insert(spec.model).values(upserts)
+        set_ = {name: stmt.excluded[name] for name in written_columns}
+        if "updated_at" in mapper.columns:
+            # ON CONFLICT DO UPDATE does not apply Column.onupdate
+            set_["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=[pk_name], set_=set_)
+        await db.execute(stmt)
+
+    if sync_result.updated:
+        # A plain UPDATE, since an INSERT of changed rows would need values
+        # for every NOT NULL column, including the insert-only ones. The bind
+        # names can't be the column names, which UPDATE reserves.
+        table = spec.model.__table__
+        stmt = update(table).where(table.c[pk_name] == bindparam("sync_pk"))
+        stmt = stmt.values({name: bindparam(f"sync_{name}") for name in spec.fields})
+        if "updated_at" in mapper.columns:
+            stmt = stmt.values(updated_at=func.now())
+        await db.execute(
+            stmt,
+            [
+                {
+                    "sync_pk": getattr(existing[key], pk_name),
+                    **{f"sync_{name}": desired[key].get(name) for name in spec.fields},
+                }
+                for key in sync_result.updated
+            ],
+        )
+
+    if sync_result.removed:
+        await db.execute(
+            delete(spec.model)
+            .where(key_column.in_(sync_result.removed))
+            .execution_options(synchronize_session=False)
+        )
+
+    await db.commit()
+    if spec.on_change is not None:
+        outcome = spec.on_change()
+        if isawaitable(outcome):
+            await outcome
+
+    changed_keys = sync_result.added + sync_result.updated
+    if changed_keys:
+        refreshed = await db.execute(
+            select(spec.model)
+            .where(key_column.in_(changed_keys))
+            .execution_options(populate_existing=True)
+        )
+        for row in refreshed.scalars().all():
+            existing[getattr(row, spec.key)] = row
+
+    sync_result.rows = [existing[key] for key in desired if key in existing]
+    logger.info(f"{resource} sync diff: {sync_result.summary()}")
+    return sync_result
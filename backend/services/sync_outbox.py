@@ -0,0 +1,241 @@
+"""
+Transactional outbox for entity-scoped LlamaStack sync operations.
+
+Write routes record a ``SyncOutbox`` row in the same transaction as the entity
+change and return immediately. A background worker drains the outbox:
+
+- Rows are claimed in batches with ``FOR UPDATE SKIP LOCKED`` and leased by
+  pushing ``available_at`` forward, so several replicas can drain the same
+  outbox and a crashed worker's rows become claimable again.
+- Rows for the same entity within a batch are coalesced into one call.
+- Handlers converge a single entity to its current database state, so they
+  are idempotent and safe to retry.
+- Failures are retried with exponential backoff until the attempt limit is
+  reached, after which the row is marked ``failed`` for inspection.
+
+Environment variables:
+- SYNC_OUTBOX_POLL_SECONDS: Poll interval when no wake-up is signalled
+- SYNC_OUTBOX_BATCH_SIZE: Maximum number of rows claimed per batch
+- SYNC_OUTBOX_MAX_ATTEMPTS: Attempts before a row is marked failed
+- SYNC_OUTBOX_LEASE_SECONDS: How long a claimed row stays invisible
+"""
+
+import asyncio
+import os
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..database import BackgroundSessionLocal
+from ..utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SYNC_OUTBOX_POLL_SECONDS = float(os.getenv("SYNC_OUTBOX_POLL_SECONDS", "5"))
+SYNC_OUTBOX_BATCH_SIZE = int(os.getenv("SYNC_OUTBOX_BATCH_SIZE", "20"))
+SYNC_OUTBOX_MAX_ATTEMPTS = int(os.getenv("SYNC_OUTBOX_MAX_ATTEMPTS", "5"))
+SYNC_OUTBOX_LEASE_SECONDS = int(os.getenv("SYNC_OUTBOX_LEASE_SECONDS", "60"))
+SYNC_OUTBOX_MAX_BACKOFF_SECONDS = 300
+
+# Handler signature: (db, entity_id, operation) -> success
+SyncHandler = Callable[[AsyncSession, str, str], Awaitable[bool]]
+
+_handlers: Dict[str, SyncHandler] = {}
+_wakeup: Optional[asyncio.Event] = None
+
+
+def register_handler(entity_type: str, handler: SyncHandler) -> None:
+    """
+    Register the function that syncs one entity of the given type.
+
+    Args:
+        entity_type: Outbox entity type, e.g. "mcp_server"
+        handler: Coroutine converging one entity to its database state
+    """
+    _handlers[entity_type] = handler
+
+
+def enqueue_sync(
+    db: AsyncSession, entity_type: str, entity_id: str, operation: str
+) -> None:
+    """
+    Record a pending sync in the caller's transaction.
+
+    The row becomes visible to the worker when the caller commits; call
+    notify_worker() after the commit to process it without waiting for
+    the next poll.
+
+    Args:
+        db: Database session holding the entity change
+        entity_type: Outbox entity type, e.g. "mcp_server"
+        entity_id: Identifier of the changed entity
+        operation: "create", "update" or "delete"
+    """
+    db.add(
+        models.SyncOutbox(
+            entity_type=entity_type, entity_id=entity_id, operation=operation
+        )
+    )
+
+
+def notify_worker() -> None:
+    """Wake the in-process worker so freshly committed rows are handled now."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def claim_batch(db: AsyncSession, batch_size: int) -> List[models.SyncOutbox]:
+    """
+    Claim up to batch_size due rows and lease them to this worker.
+
+    Args:
+        db: Database session
+        batch_size: Maximum number of rows to claim
+
+    Returns:
+        List[models.SyncOutbox]: Claimed rows, oldest first
+    """
+    claimable = (
+        select(models.SyncOutbox.id)
+        .where(
+            models.SyncOutbox.status == "pending",
+            models.SyncOutbox.available_at <= func.now(),
+        )
+        .order_by(models.SyncOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(models.SyncOutbox)
+        .where(models.SyncOutbox.id.in_(claimable))
+        .values(
+            attempts=models.SyncOutbox.attempts + 1,
+            available_at=func.now() + timedelta(seconds=SYNC_OUTBOX_LEASE_SECONDS),
+        )
+        .returning(models.SyncOutbox)
+        .execution_options(synchronize_session=False)
+    )
+    rows = sorted(result.scalars().all(), key=lambda row: row.id)
+    await db.commit()
+    return rows
+
+
+async def process_batch(db: AsyncSession, rows: List[models.SyncOutbox]) -> None:
+    """
+    Run handlers for a claimed batch and record the outcome.
+
+    Rows for the same entity are coalesced; the latest operation wins. A
+    failed handler's uncommitted changes are rolled back before the failure
+    is recorded, so one entity can't break the rest of the batch.
+
+    Args:
+        db: Database session
+        rows: Claimed outbox rows
+    """
+    grouped: Dict[tuple, List[models.SyncOutbox]] = {}
+    for row in rows:
+        grouped.setdefault((row.entity_type, row.entity_id), []).append(row)
+    # Read the rows up front, as a rollback expires them
+    entities = [
+        (
+            entity_type,
+            entity_id,
+            [row.id for row in entity_rows],
+            entity_rows[-1].operation,
+            max(row.attempts for row in entity_rows),
+        )
+        for (entity_type, entity_id), entity_rows in grouped.items()
+    ]
+
+    for entity_type, entity_id, ids, operation, attempts in entities:
+        handler = _handlers.get(entity_type)
+
+        error = None
+        if handler is None:
+            error = f"No sync handler registered for {entity_type}"
+        else:
+            try:
+                if not await handler(db, entity_id, operation):
+                    error = "Sync handler reported failure"
+            except Exception as e:
+                error = str(e)
+
+        if error is None:
+            await db.execute(
+                delete(models.SyncOutbox)
+                .where(models.SyncOutbox.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            logger.info(f"Synced {entity_type} {entity_id} ({operation})")
+        else:
+            # Drop whatever the handler left half done, which may also have
+            # aborted the transaction
+            await db.rollback()
+            backoff = min(2**attempts, SYNC_OUTBOX_MAX_BACKOFF_SECONDS)
+            await db.execute(
+                update(models.SyncOutbox)
+                .where(models.SyncOutbox.id.in_(ids))
+                .values(
+                    last_error=error[:2000],
+                    available_at=func.now() + timedelta(seconds=backoff),
+                    status=case(
+                        (
+                            models.SyncOutbox.attempts >= SYNC_OUTBOX_MAX_ATTEMPTS,
+                            "failed",
+                        ),
+                        else_="pending",
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            logger.warning(
+                f"Sync of {entity_type} {entity_id} ({operation}) failed on "
+                f"attempt {attempts}: {error}"
+            )
+        await db.commit()
+
+
+async def drain_once(batch_size: int = SYNC_OUTBOX_BATCH_SIZE) -> int:
+    """
+    Claim and process a single batch.
+
+    Args:
+        batch_size: Maximum number of rows to claim
+
+    Returns:
+        int: Number of rows claimed
+    """
+    async with BackgroundSessionLocal() as db:
+        rows = await claim_batch(db, batch_size)
+        if rows:
+            await process_batch(db, rows)
+        return len(rows)
+
+
+async def run_worker() -> None:
+    """Drain the outbox until cancelled, waking on notify_worker() or a poll."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    logger.info("Sync outbox worker started")
+    try:
+        while True:
+            _wakeup.clear()
+            try:
+                # Keep draining while full batches come back
+                while await drain_once() >= SYNC_OUTBOX_BATCH_SIZE:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Sync outbox worker error: {str(e)}")
+
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=SYNC_OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _wakeup = None
+        logger.info("Sync outbox worker stopped")
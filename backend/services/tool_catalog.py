@@ -0,0 +1,164 @@
+"""
+Cached catalog of tool groups served by /api/tools.
+
+The catalog merges the MCP servers stored in the database with the builtin
+tool groups listed by LlamaStack. It is built once, grouped per toolgroup
+and indexed per provider, so that requests are answered from memory.
+
+The cached catalog is dropped when MCP servers are created, updated or
+deleted, whenever a sync changes the MCP server table, and after
+TOOL_CATALOG_TTL_SECONDS so that LlamaStack catalog changes are picked up.
+A catalog built while LlamaStack was unreachable only contains the MCP
+servers and is kept for a few seconds.
+
+Environment variables:
+- TOOL_CATALOG_TTL_SECONDS: How long the merged catalog is cached
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from .. import models
+from ..api.llamastack import get_sync_client
+from ..database import AsyncSessionLocal
+from ..utils import metrics
+from ..utils.cache import SingleFlight, TTLCache
+from ..utils.logging_config import get_logger
+from .llamastack_sync import MCP_PROVIDER_ID
+from .sync_engine import listing_to_dicts
+
+logger = get_logger(__name__)
+
+TOOL_CATALOG_TTL_SECONDS = float(os.getenv("TOOL_CATALOG_TTL_SECONDS", "60"))
+TOOL_CATALOG_PARTIAL_TTL_SECONDS = 5.0
+
+_cache = TTLCache(1, TOOL_CATALOG_TTL_SECONDS)
+_flight = SingleFlight()
+_generation = 0
+
+
+@dataclass(frozen=True)
+class ToolCatalog:
+    """Tool groups keyed by toolgroup ID, with a per-provider index."""
+
+    groups: Dict[str, Dict[str, Any]]
+    by_provider: Dict[str, List[Dict[str, Any]]]
+
+    def select(
+        self, toolgroup_id: Optional[str] = None, provider_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the tool groups matching the filters.
+
+        Args:
+            toolgroup_id: Only return this tool group
+            provider_id: Only return tool groups of this provider
+
+        Returns:
+            List of tool groups in catalog order
+        """
+        if toolgroup_id is not None:
+            group = self.groups.get(toolgroup_id)
+            if group is None or provider_id not in (None, group["provider_id"]):
+                return []
+            return [group]
+        if provider_id is not None:
+            return list(self.by_provider.get(provider_id, []))
+        return list(self.groups.values())
+
+
+def _mcp_group(server: models.MCPServer) -> Dict[str, Any]:
+    return {
+        "toolgroup_id": server.toolgroup_id,
+        "name": server.name,
+        "description": server.description,
+        "endpoint_url": server.endpoint_url,
+        "configuration": server.configuration,
+        "provider_id": MCP_PROVIDER_ID,
+        "created_at": server.created_at.isoformat() if server.created_at else None,
+        "updated_at": server.updated_at.isoformat() if server.updated_at else None,
+    }
+
+
+def _builtin_group(toolgroup_id: str, tool: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "toolgroup_id": toolgroup_id,
+        "name": toolgroup_id,  # Use toolgroup_id as display name
+        "description": tool.get("description", f"Tools for {toolgroup_id}"),
+        "endpoint_url": None,
+        "configuration": tool.get("metadata", {}),
+        "provider_id": tool.get("provider_id"),
+        "created_at": None,
+        "updated_at": None,
+    }
+
+
+async def build_catalog() -> Tuple[ToolCatalog, bool]:
+    """
+    Build the merged catalog from the database and LlamaStack.
+
+    Returns:
+        Tuple of the catalog and whether the LlamaStack listing succeeded
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(models.MCPServer))
+        for server in result.scalars().all():
+            groups[server.toolgroup_id] = _mcp_group(server)
+
+    complete = True
+    try:
+        tools = listing_to_dicts(await get_sync_client().tools.list())
+        for tool in tools:
+            if tool.get("provider_id") == MCP_PROVIDER_ID:
+                continue
+            toolgroup_id = tool.get("toolgroup_id", tool.get("identifier"))
+            if toolgroup_id and toolgroup_id not in groups:
+                groups[toolgroup_id] = _builtin_group(toolgroup_id, tool)
+    except Exception as e:
+        logger.warning(f"Failed to fetch builtin tools from LlamaStack: {str(e)}")
+        complete = False
+
+    by_provider: Dict[str, List[Dict[str, Any]]] = {}
+    for group in groups.values():
+        by_provider.setdefault(group["provider_id"], []).append(group)
+    return ToolCatalog(groups=groups, by_provider=by_provider), complete
+
+
+async def get_catalog() -> ToolCatalog:
+    """
+    Return the cached catalog, building it if needed.
+
+    Concurrent misses share one build. A build that was started before an
+    invalidation is returned to its callers but not cached.
+
+    Returns:
+        ToolCatalog: The merged tool catalog
+    """
+    catalog = _cache.get("catalog")
+    if catalog is not None:
+        metrics.increment("tool_catalog", result="hit")
+        return catalog
+    metrics.increment("tool_catalog", result="miss")
+
+    generation = _generation
+
+    async def build() -> ToolCatalog:
+        catalog, complete = await build_catalog()
+        if generation == _generation:
+            ttl = None if complete else TOOL_CATALOG_PARTIAL_TTL_SECONDS
+            _cache.set("catalog", catalog, ttl)
+        return catalog
+
+    return await _flight.do(("catalog", generation), build)
+
+
+def invalidate() -> None:
+    """Drop the cached catalog and any build in progress."""
+    global _generation
+    _generation += 1
+    _cache.clear()
@@ -2,105 +2,233 @@
 User service for agent management operations.
 
 This service handles user-specific agent operations including:
-- Agent assignment management
-- Duplicate detection and prevention
+- Agent existence checks against a cached set of LlamaStack agent IDs
+- Atomic agent assignment and removal on users' ``agent_ids`` lists
+- Reverse lookup of the users an agent is assigned to
+
+Assignments are single UPDATE statements using JSONB operators, so
+concurrent assignments to the same user never lose updates and each call
+costs one round-trip regardless of how many users or agents it touches.
+
+Environment variables:
+- AGENT_ID_CACHE_TTL_SECONDS: How long the LlamaStack agent ID set is cached
 """
 
 import logging
-from typing import List
+import os
+from typing import Iterable, List, Set
+from uuid import UUID
 
 from fastapi import HTTPException
+from sqlalchemy import Text, func, literal, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..api.llamastack import client
+from .. import models
+from ..api.llamastack import get_sync_client
+from ..utils.cache import SingleFlight, TTLCache
 
 log = logging.getLogger(__name__)
 
+AGENT_ID_CACHE_TTL_SECONDS = float(os.getenv("AGENT_ID_CACHE_TTL_SECONDS", "30"))
+
+_agent_id_cache = TTLCache(1, AGENT_ID_CACHE_TTL_SECONDS)
+_agent_id_flight = SingleFlight()
+
+
+def _unique(agent_ids: Iterable[str]) -> List[str]:
+    """Drop duplicates while keeping the request order."""
+    return list(dict.fromkeys(agent_ids))
+
+
+def _has_agent(agent_id: str):
+    """Containment filter on a constant, so the GIN index on agent_ids is used."""
+    return models.User.agent_ids.contains(literal([agent_id], JSONB))
+
 
 class UserService:
     """Service for user-related agent operations"""
 
     @staticmethod
-    async def get_unique_agents_ids(
-        user_agent_ids: List[str], new_agent_ids: List[str]
-    ) -> List[str]:
+    async def get_known_agent_ids(refresh: bool = False) -> Set[str]:
         """
-        Check for duplicate agent IDs and return only new unique ones.
+        Return the IDs of all agents in LlamaStack, cached briefly.
 
         Args:
-            user_agent_ids: List of agent IDs currently assigned to the user
-            new_agent_ids: List of new agent IDs to check for duplicates
+            refresh: Bypass the cache
 
         Returns:
-            List of agent IDs that are not already assigned to the user
+            Set of agent IDs
+        """
+        if not refresh:
+            cached = _agent_id_cache.get("agents")
+            if cached is not None:
+                return cached
+
+        async def fetch() -> Set[str]:
+            agents = await get_sync_client().agents.list()
+            agent_ids = {agent.agent_id for agent in agents}
+            _agent_id_cache.set("agents", agent_ids)
+            return agent_ids
+
+        return await _agent_id_flight.do("agents", fetch)
+
+    @staticmethod
+    def invalidate_agent_cache() -> None:
+        """Forget the cached agent IDs, e.g. after an agent was created."""
+        _agent_id_cache.clear()
+
+    @staticmethod
+    async def verify_agents_exist(agent_ids: List[str]) -> None:
         """
-        unique_agent_ids = []
-        for agent_id in new_agent_ids:
-            if agent_id not in user_agent_ids:
-                unique_agent_ids.append(agent_id)
-            else:
-                log.info(f"Agent {agent_id} already assigned to user, skipping")
+        Check that all agents exist in LlamaStack with at most one listing.
 
-        return unique_agent_ids
+        Args:
+            agent_ids: Agent IDs to verify
+
+        Raises:
+            HTTPException: 404 if any agent doesn't exist in LlamaStack
+        """
+        known = await UserService.get_known_agent_ids()
+        missing = [agent_id for agent_id in agent_ids if agent_id not in known]
+        if missing:
+            # The agent may have been created after the set was cached
+            known = await UserService.get_known_agent_ids(refresh=True)
+            missing = [agent_id for agent_id in missing if agent_id not in known]
+        if missing:
+            log.error(f"Agents not found in LlamaStack: {missing}")
+            raise HTTPException(
+                status_code=404, detail=f"Agent {', '.join(missing)} not found"
+            )
 
     @staticmethod
-    async def assign_agents_to_user(
-        user_agent_ids: List[str], requested_agent_ids: List[str]
-    ) -> List[str]:
+    async def assign_agents(
+        db: AsyncSession, user_ids: List[UUID], agent_ids: List[str]
+    ) -> List[models.User]:
         """
-        Add requested agents to user's agent list, preventing duplicates.
+        Append agents to users' assignment lists, skipping ones already there.
+
+        Runs as one UPDATE; each user row is locked while its list is
+        extended, so concurrent assignments are applied one after another.
+        The caller commits.
 
         Args:
-            user_agent_ids: List of agent IDs currently assigned to the user
-            requested_agent_ids: List of agent IDs to assign to the user
+            db: Database session
+            user_ids: Users to update
+            agent_ids: Agent IDs to assign, in the order to append them
 
         Returns:
-            List of all agent IDs assigned to the user (existing + new unique ones)
-
-        Raises:
-            HTTPException: If any agent doesn't exist in LlamaStack
+            The updated users; users that don't exist are absent
         """
-        # Verify all requested agents exist in LlamaStack
-        for agent_id in requested_agent_ids:
-            try:
-                client.agents.retrieve(agent_id=agent_id)  # type: ignore
-                log.info(f"Verified agent exists: {agent_id}")
-            except Exception as e:
-                log.error(f"Agent {agent_id} not found in LlamaStack: {str(e)}")
-                raise HTTPException(
-                    status_code=404, detail=f"Agent {agent_id} not found"
+        agent_ids = _unique(agent_ids)
+        requested = func.jsonb_array_elements_text(
+            literal(agent_ids, JSONB)
+        ).table_valued("value", with_ordinality="ordinality")
+        missing = (
+            select(
+                func.coalesce(
+                    func.jsonb_agg(
+                        aggregate_order_by(requested.c.value, requested.c.ordinality)
+                    ),
+                    text("'[]'::jsonb"),
                 )
+            )
+            .where(
+                ~models.User.agent_ids.contains(
+                    func.jsonb_build_array(requested.c.value)
+                )
+            )
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(models.User)
+            .where(models.User.id.in_(user_ids))
+            .values(
+                agent_ids=models.User.agent_ids.op("||", return_type=JSONB)(missing)
+            )
+            .returning(models.User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        users = list(result.scalars().all())
+        log.info(f"Assigned agents {agent_ids} to {len(users)} users")
+        return users
+
+    @staticmethod
+    async def remove_agents(
+        db: AsyncSession, user_ids: List[UUID], agent_ids: List[str]
+    ) -> List[models.User]:
+        """
+        Remove agents from users' assignment lists in one UPDATE.
 
-        # Check for duplicates and get only new unique agent IDs
-        new_agent_ids = await UserService.get_unique_agents_ids(
-            user_agent_ids, requested_agent_ids
+        The caller commits.
+
+        Args:
+            db: Database session
+            user_ids: Users to update
+            agent_ids: Agent IDs to remove
+
+        Returns:
+            The updated users; users that don't exist are absent
+        """
+        result = await db.execute(
+            update(models.User)
+            .where(models.User.id.in_(user_ids))
+            .values(
+                agent_ids=models.User.agent_ids.op("-", return_type=JSONB)(
+                    literal(_unique(agent_ids), ARRAY(Text))
+                )
+            )
+            .returning(models.User)
+            .execution_options(synchronize_session=False, populate_existing=True)
         )
+        users = list(result.scalars().all())
+        log.info(f"Removed agents {agent_ids} from {len(users)} users")
+        return users
 
-        # Combine existing and new agent IDs
-        all_agent_ids = user_agent_ids + new_agent_ids
+    @staticmethod
+    async def get_users_with_agent(
+        db: AsyncSession, agent_id: str
+    ) -> List[models.User]:
+        """
+        Find the users an agent is assigned to.
 
-        log.info(f"Added {len(new_agent_ids)} new agents to user")
-        return all_agent_ids
+        Args:
+            db: Database session
+            agent_id: Agent ID to look up
+
+        Returns:
+            Users having the agent in their assignment list
+        """
+        result = await db.execute(
+            select(models.User)
+            .where(_has_agent(agent_id))
+            .order_by(models.User.username)
+        )
+        return list(result.scalars().all())
 
     @staticmethod
-    async def remove_agents_from_user(
-        current_agent_ids: List[str], agents_to_remove: List[str]
-    ) -> List[str]:
+    async def remove_agent_from_all_users(db: AsyncSession, agent_id: str) -> int:
         """
-        Remove specified agents from user's agent list.
+        Remove an agent from every user it is assigned to in one UPDATE.
+
+        The caller commits.
 
         Args:
-            current_agent_ids: List of agent IDs currently assigned to user
-            agents_to_remove: List of agent IDs to remove from user
+            db: Database session
+            agent_id: Agent ID to remove
 
         Returns:
-            List of remaining agent IDs after removal
+            Number of users that had the agent
         """
-        # Calculate remaining agents
-        remaining_agent_ids = [
-            agent_id
-            for agent_id in current_agent_ids
-            if agent_id not in agents_to_remove
-        ]
-
-        log.info(f"Removed {len(agents_to_remove)} agents from user")
-        return remaining_agent_ids
+        result = await db.execute(
+            update(models.User)
+            .where(_has_agent(agent_id))
+            .values(
+                agent_ids=models.User.agent_ids.op("-", return_type=JSONB)(
+                    literal(agent_id, Text)
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        log.info(f"Removed agent {agent_id} from {result.rowcount} users")
+        return result.rowcount
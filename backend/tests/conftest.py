@@ -0,0 +1,4 @@
+import os
+
+# The backend modules create their engines at import time
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
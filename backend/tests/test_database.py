@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from ..database import instrumented_pool_class
+from ..utils import metrics
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_is_recorded_per_profile(tmp_path):
+    """Test that checkouts record their wait under the profile's name."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+        poolclass=instrumented_pool_class("test_profile"),
+    )
+    try:
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    finally:
+        await engine.dispose()
+
+    waits = metrics.snapshot()["timings"]["db_pool_wait"]
+    assert [
+        summary["count"]
+        for labels, summary in waits.items()
+        if "test_profile" in labels
+    ] == [3]
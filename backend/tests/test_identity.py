@@ -0,0 +1,50 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from .. import models
+from ..services import identity
+from ..services.identity import Identity, resolve_user
+
+
+class FakeUsersTable:
+    """Session stub answering the user lookup with the current rows."""
+
+    def __init__(self):
+        self.user = None
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return SimpleNamespace(scalar_one_or_none=lambda: self.user)
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    identity.user_cache.clear()
+    yield
+    identity.user_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_is_not_cached():
+    """Test that a user created after a failed lookup is found right away."""
+    db = FakeUsersTable()
+    caller = Identity(username="alice", email="alice@example.com")
+
+    assert await resolve_user(caller, db) is None
+
+    db.user = models.User(
+        id=uuid.uuid4(),
+        username="alice",
+        email="alice@example.com",
+        role=models.RoleEnum.user,
+        agent_ids=[],
+    )
+    user = await resolve_user(caller, db)
+    assert user is not None and user.username == "alice"
+
+    # Found users are served from the cache
+    assert await resolve_user(caller, db) == user
+    assert db.queries == 2
@@ -0,0 +1,53 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from .. import models, schemas
+from ..routes import model_servers
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            models.Base.metadata.create_all, tables=[models.ModelServer.__table__]
+        )
+    session = AsyncSession(engine, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_created_server_survives_sync(db_session, monkeypatch):
+    """Test that the post-create sync keeps servers LlamaStack doesn't list."""
+
+    async def fetch():
+        return {
+            "llama-3": {
+                "name": "llama-3",
+                "provider_name": "vllm",
+                "model_name": "llama-3",
+                "endpoint_url": "http://vllm",
+            }
+        }
+
+    monkeypatch.setattr(model_servers, "fetch_llamastack_model_servers", fetch)
+    created = await model_servers.create_model_server(
+        schemas.ModelServerCreate(
+            name="my-openai",
+            provider_name="openai",
+            model_name="gpt-4o",
+            endpoint_url="https://api.openai.com",
+        ),
+        db=db_session,
+    )
+
+    result = await db_session.execute(select(models.ModelServer))
+    servers = {server.name: server for server in result.scalars().all()}
+    assert set(servers) == {"my-openai", "llama-3"}
+    assert servers["my-openai"].id == created.id
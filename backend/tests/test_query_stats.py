@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from ..utils import query_stats
+
+
+def test_failed_statement_does_not_skew_timings():
+    """Test that a statement that raises leaves no timing state behind."""
+    engine = create_engine("sqlite://")
+    query_stats.instrument_engine(engine)
+    stats = query_stats.RequestQueryStats()
+    token = query_stats._current.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            conn.execute(text("SELECT 1"))
+            assert not any("query_stats" in str(key) for key in conn.info)
+    finally:
+        query_stats._current.reset(token)
+        engine.dispose()
+
+    assert stats.count == 1
+    assert stats.shapes == {"SELECT 1": 1}
+    assert 0 <= stats.seconds < 1
@@ -0,0 +1,100 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from .. import models
+from ..routes.knowledge_bases import KNOWLEDGE_BASE_SYNC_SPEC
+from ..services.sync_engine import reconcile
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            models.Base.metadata.create_all, tables=[models.KnowledgeBase.__table__]
+        )
+    session = AsyncSession(engine, expire_on_commit=False)
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    try:
+        yield session, statements
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_updates_changed_knowledge_base(db_session):
+    """Test that a changed knowledge base is updated in place."""
+    session, statements = db_session
+    session.add(
+        models.KnowledgeBase(
+            vector_db_name="docs",
+            name="Product docs",
+            version="2.0",
+            embedding_model="all-MiniLM-L6-v2",
+            provider_id="faiss",
+            is_external=False,
+            source="URL",
+        )
+    )
+    await session.commit()
+    statements.clear()
+
+    # Only the LlamaStack-owned fields are desired; the rest must survive
+    desired = {
+        "docs": {
+            "vector_db_name": "docs",
+            "embedding_model": "all-mpnet-base-v2",
+            "provider_id": "pgvector",
+        }
+    }
+    result = await reconcile(
+        session, KNOWLEDGE_BASE_SYNC_SPEC, desired, "Knowledge bases"
+    )
+
+    assert result.updated == ["docs"]
+    assert not result.added and not result.removed
+    writes = [s for s in statements if not s.lstrip().upper().startswith("SELECT")]
+    assert len(writes) == 1 and writes[0].lstrip().upper().startswith("UPDATE")
+
+    [row] = result.rows
+    assert (row.embedding_model, row.provider_id) == ("all-mpnet-base-v2", "pgvector")
+    assert (row.name, row.version, row.source) == ("Product docs", "2.0", "URL")
+
+
+@pytest.mark.asyncio
+async def test_reconcile_skips_unchanged_knowledge_base(db_session):
+    """Test that a knowledge base without drift is not written."""
+    session, statements = db_session
+    session.add(
+        models.KnowledgeBase(
+            vector_db_name="docs",
+            name="docs",
+            version="1.0",
+            embedding_model="all-MiniLM-L6-v2",
+            provider_id="faiss",
+        )
+    )
+    await session.commit()
+    statements.clear()
+
+    desired = {
+        "docs": {
+            "vector_db_name": "docs",
+            "embedding_model": "all-MiniLM-L6-v2",
+            "provider_id": "faiss",
+        }
+    }
+    result = await reconcile(
+        session, KNOWLEDGE_BASE_SYNC_SPEC, desired, "Knowledge bases"
+    )
+
+    assert not result.changed and result.unchanged == 1
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
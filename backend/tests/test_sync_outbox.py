@@ -0,0 +1,110 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from .. import models
+from ..services import sync_outbox
+from ..services.drift_reconciler import DriftResource, check_resource
+from ..services.sync_engine import SyncSpec
+
+MCP_SERVER_SPEC = SyncSpec(
+    model=models.MCPServer, key="toolgroup_id", fields=("name", "endpoint_url")
+)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            models.Base.metadata.create_all,
+            tables=[models.MCPServer.__table__, models.SyncOutbox.__table__],
+        )
+    session = AsyncSession(engine, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+def mcp_server(toolgroup_id):
+    return models.MCPServer(
+        toolgroup_id=toolgroup_id, name=toolgroup_id, endpoint_url="http://mcp"
+    )
+
+
+def outbox_row(row_id, entity_id, status="pending"):
+    # SQLite doesn't autoincrement BIGINT keys
+    return models.SyncOutbox(
+        id=row_id,
+        entity_type="test",
+        entity_id=entity_id,
+        operation="create",
+        status=status,
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_handler_is_rolled_back(db_session, monkeypatch):
+    """Test that a failing handler's writes don't leak into the batch."""
+
+    async def handler(db, entity_id, operation):
+        if entity_id == "broken":
+            db.add(mcp_server("half-done"))
+            await db.flush()
+            raise RuntimeError("LlamaStack unavailable")
+        db.add(mcp_server(entity_id))
+        return True
+
+    monkeypatch.setitem(sync_outbox._handlers, "test", handler)
+    db_session.add_all([outbox_row(1, "broken"), outbox_row(2, "ok")])
+    await db_session.commit()
+
+    rows = await db_session.execute(select(models.SyncOutbox))
+    await sync_outbox.process_batch(db_session, list(rows.scalars().all()))
+
+    # SQLite can't read back the bumped available_at, so skip that column
+    result = await db_session.execute(
+        select(
+            models.SyncOutbox.entity_id,
+            models.SyncOutbox.status,
+            models.SyncOutbox.last_error,
+        )
+    )
+    assert result.all() == [("broken", "pending", "LlamaStack unavailable")]
+    servers = await db_session.execute(select(models.MCPServer.toolgroup_id))
+    assert servers.scalars().all() == ["ok"]
+
+
+@pytest.mark.asyncio
+async def test_drift_check_skips_pending_entities(db_session):
+    """Test that rows the outbox hasn't synced aren't deleted as drift."""
+    db_session.add_all(
+        [mcp_server("registered"), mcp_server("new"), mcp_server("gave-up")]
+    )
+    db_session.add_all([outbox_row(1, "new"), outbox_row(2, "gave-up", "failed")])
+    await db_session.commit()
+
+    async def fetch():
+        return {"registered": {"name": "registered", "endpoint_url": "http://mcp"}}
+
+    resource = DriftResource(
+        name="mcp_servers",
+        spec=MCP_SERVER_SPEC,
+        fetch=fetch,
+        outbox_entity_type="test",
+    )
+    report = await check_resource(db_session, resource, heal=True)
+
+    assert report["outcome"] == "in_sync"
+    assert report["unsynced"] == ["gave-up", "new"]
+    servers = await db_session.execute(select(models.MCPServer.toolgroup_id))
+    assert sorted(servers.scalars().all()) == ["gave-up", "new", "registered"]
+
+    # Without the outbox lookup the local-only server is drift
+    resource = DriftResource(name="mcp_servers", spec=MCP_SERVER_SPEC, fetch=fetch)
+    report = await check_resource(db_session, resource, heal=False)
+    assert report["outcome"] == "drift_detected"
+    assert report["removed"] == ["gave-up", "new"]
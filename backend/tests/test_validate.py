@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from ..routes import validate
+from ..schemas import AuthRequest, AuthRequestContext
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Stub the auth service, answering every call with service.status_code."""
+    service = SimpleNamespace(status_code=200, calls=[])
+
+    async def make_http_request(url, headers, method="GET", json_data=None):
+        service.calls.append(url)
+        return httpx.Response(service.status_code)
+
+    monkeypatch.setattr(validate, "make_http_request", make_http_request)
+    validate.validation_cache.clear()
+    yield service
+    validate.validation_cache.clear()
+
+
+def auth_request(token="token"):
+    return AuthRequest(
+        api_key=token,
+        request=AuthRequestContext(path="/", headers={}, params={}),
+    )
+
+
+@pytest.mark.asyncio
+async def test_rejection_is_cached(upstream):
+    """Test that an upstream 401 is cached as a new 403 per request."""
+    upstream.status_code = 401
+
+    with pytest.raises(HTTPException) as first:
+        await validate.validate(auth_request(), db=None)
+    with pytest.raises(HTTPException) as second:
+        await validate.validate(auth_request(), db=None)
+
+    assert first.value.status_code == second.value.status_code == 403
+    assert first.value.detail == second.value.detail
+    assert first.value is not second.value
+    assert len(upstream.calls) == 1
+
+
+@pytest.mark.parametrize("status_code", [404, 429, 500])
+@pytest.mark.asyncio
+async def test_service_error_is_not_cached(upstream, status_code):
+    """Test that auth service errors are rejected and retried, not cached."""
+    upstream.status_code = status_code
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            await validate.validate(auth_request(), db=None)
+        assert exc.value.status_code == 403
+
+    assert len(upstream.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_is_not_cached(upstream, monkeypatch):
+    """Test that a user created after a rejection is accepted right away."""
+    users = {}
+
+    async def get_user_from_headers(headers, db):
+        return users.get("alice")
+
+    monkeypatch.setattr(validate, "get_user_from_headers", get_user_from_headers)
+
+    with pytest.raises(HTTPException, match="User not found"):
+        await validate.validate(auth_request(), db=None)
+
+    users["alice"] = SimpleNamespace(username="alice", role="user")
+    response = await validate.validate(auth_request(), db=None)
+    assert response.principal == "alice"
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+
+from ..routes import virtual_assistants
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    """Stub the LlamaStack agent listing with agents a-0 to a-4."""
+    listing = [
+        SimpleNamespace(
+            agent_id=f"a-{i}",
+            agent_config={"name": f"Agent {i}", "model": "llama", "toolgroups": []},
+        )
+        for i in (3, 0, 4, 1, 2)
+    ]
+
+    async def list_agents():
+        return listing
+
+    client = SimpleNamespace(agents=SimpleNamespace(list=list_agents))
+    monkeypatch.setattr(
+        virtual_assistants, "get_client_from_request", lambda request: client
+    )
+    return listing
+
+
+async def list_page(cursor=None, limit=None):
+    response = Response()
+    page = await virtual_assistants.get_virtual_assistants(
+        request=None,
+        response=response,
+        assigned=False,
+        name=None,
+        cursor=cursor,
+        limit=limit,
+        db=None,
+    )
+    return [va.id for va in page], response.headers.get("X-Next-Cursor")
+
+
+@pytest.mark.asyncio
+async def test_pages_follow_opaque_cursors(agents):
+    """Test walking the agents by ID with the returned cursors."""
+    ids, cursor = [], None
+    while True:
+        page, cursor = await list_page(cursor=cursor, limit=2)
+        ids.extend(page)
+        if cursor is None:
+            break
+        assert not cursor.startswith("a-")
+    assert ids == [f"a-{i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_malformed_cursor_is_rejected(agents):
+    """Test that a cursor not made by the listing is a 400."""
+    with pytest.raises(HTTPException) as exc:
+        await list_page(cursor="a-1", limit=2)
+    assert exc.value.status_code == 400
@@ -0,0 +1,267 @@
+"""
+Read-through cache for the CRUD routers of rarely changing tables.
+
+Each router creates one CrudCache for its resource. GET handlers read the
+collection or a single entity through the cache. Handlers that write call
+invalidate() after committing, and syncs invalidate the whole resource
+through SyncSpec.on_change. Values are stored as JSON-ready dicts produced
+with the response schema, so they can live in process memory or in a
+shared Redis instance.
+
+Loads on a miss must read the primary (get_db), not the read replica. A
+replica lagging behind a write would otherwise refill the cache with the
+rows that write's invalidation just dropped.
+
+With the default memory backend every replica keeps its own cache, and other
+replicas see a write only when their entries expire. Set CRUD_CACHE_REDIS_URL
+(and install the ``redis`` package) to share entries and invalidations
+between replicas.
+
+Environment variables:
+- CRUD_CACHE_TTL_SECONDS: Lifetime of cached entries (0 disables caching)
+- CRUD_CACHE_MAX_ENTRIES: Entities kept per resource by the memory backend
+- CRUD_CACHE_<RESOURCE>_TTL_SECONDS / CRUD_CACHE_<RESOURCE>_MAX_ENTRIES:
+  Per-resource overrides, e.g. CRUD_CACHE_MCP_SERVERS_TTL_SECONDS
+- CRUD_CACHE_REDIS_URL: Redis URL of the shared backend
+"""
+
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from pydantic import BaseModel
+
+from . import metrics
+from .cache import SingleFlight, TTLCache
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CRUD_CACHE_TTL_SECONDS = float(os.getenv("CRUD_CACHE_TTL_SECONDS", "30"))
+CRUD_CACHE_MAX_ENTRIES = int(os.getenv("CRUD_CACHE_MAX_ENTRIES", "1000"))
+CRUD_CACHE_REDIS_URL = os.getenv("CRUD_CACHE_REDIS_URL")
+
+_LIST_KEY = "__list__"
+
+
+class MemoryBackend:
+    """Per-process backend built on TTLCache."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        # One extra slot for the collection entry
+        self._entries = TTLCache(max_entries + 1, ttl)
+
+    async def get(self, key: Hashable) -> Any:
+        return self._entries.get(key)
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        self._entries.set(key, value)
+
+    async def delete(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._entries.pop(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisBackend:
+    """Backend shared by all replicas through Redis."""
+
+    def __init__(self, client: Any, namespace: str, ttl: float):
+        self._client = client
+        self._prefix = f"crud_cache:{namespace}:"
+        self._ttl_ms = max(int(ttl * 1000), 1)
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self._prefix}{key}"
+
+    async def get(self, key: Hashable) -> Any:
+        raw = await self._client.get(self._key(key))
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        await self._client.set(self._key(key), json.dumps(value), px=self._ttl_ms)
+
+    async def delete(self, *keys: Hashable) -> None:
+        if keys:
+            await self._client.delete(*(self._key(key) for key in keys))
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._client.scan_iter(f"{self._prefix}*")]
+        if keys:
+            await self._client.delete(*keys)
+
+
+_redis_client = None
+
+
+def _get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError(
+                "CRUD_CACHE_REDIS_URL is set but the redis package is not installed"
+            )
+        _redis_client = redis.from_url(CRUD_CACHE_REDIS_URL)
+    return _redis_client
+
+
+def _setting(resource: str, name: str, default: float) -> float:
+    return float(os.getenv(f"CRUD_CACHE_{resource.upper()}_{name}", default))
+
+
+class CrudCache:
+    """
+    Read-through cache of one resource's collection and entities.
+
+    Args:
+        resource: Resource name, used in keys, metrics and env overrides
+        schema: Response schema the cached rows are serialized with
+        ttl: Entry lifetime; defaults to CRUD_CACHE_TTL_SECONDS
+        max_entries: Entity limit of the memory backend
+    """
+
+    def __init__(
+        self,
+        resource: str,
+        schema: type[BaseModel],
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.resource = resource
+        self.schema = schema
+        self.ttl = _setting(
+            resource, "TTL_SECONDS", CRUD_CACHE_TTL_SECONDS if ttl is None else ttl
+        )
+        self.max_entries = int(
+            _setting(
+                resource,
+                "MAX_ENTRIES",
+                CRUD_CACHE_MAX_ENTRIES if max_entries is None else max_entries,
+            )
+        )
+        self._flight = SingleFlight()
+        self._generation = 0
+        self._backend: Any = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _get_backend(self):
+        if self._backend is None:
+            if CRUD_CACHE_REDIS_URL:
+                self._backend = RedisBackend(
+                    _get_redis_client(), self.resource, self.ttl
+                )
+            else:
+                self._backend = MemoryBackend(self.max_entries, self.ttl)
+        return self._backend
+
+    def serialize(self, row: Any) -> Dict[str, Any]:
+        """Convert an ORM row to the JSON-ready dict that is cached."""
+        return self.schema.model_validate(row, from_attributes=True).model_dump(
+            mode="json"
+        )
+
+    async def _read_through(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        if not self.enabled:
+            return await load()
+        backend = self._get_backend()
+        try:
+            value = await backend.get(key)
+        except Exception as e:
+            logger.warning(f"{self.resource} cache read failed: {str(e)}")
+            return await load()
+        if value is not None:
+            metrics.increment("crud_cache", resource=self.resource, result="hit")
+            return value
+        metrics.increment("crud_cache", resource=self.resource, result="miss")
+
+        generation = self._generation
+
+        async def fill() -> Any:
+            value = await load()
+            # Skip storing results that an invalidation may have overtaken
+            if value is not None and generation == self._generation:
+                try:
+                    await backend.set(key, value)
+                except Exception as e:
+                    logger.warning(f"{self.resource} cache write failed: {str(e)}")
+            return value
+
+        return await self._flight.do((key, generation), fill)
+
+    async def get_list(
+        self, load: Callable[[], Awaitable[List[Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the cached collection, loading it on a miss.
+
+        Args:
+            load: Coroutine returning every row of the resource, read from
+                the primary
+
+        Returns:
+            List of serialized rows
+        """
+
+        async def load_serialized() -> List[Dict[str, Any]]:
+            return [self.serialize(row) for row in await load()]
+
+        return await self._read_through(_LIST_KEY, load_serialized)
+
+    async def get_item(
+        self, key: Any, load: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached entity, loading it on a miss.
+
+        Missing entities are not cached.
+
+        Args:
+            key: Entity identifier used in the route path
+            load: Coroutine returning the row from the primary, or None if it
+                doesn't exist
+
+        Returns:
+            The serialized row, or None if it doesn't exist
+        """
+
+        async def load_serialized() -> Optional[Dict[str, Any]]:
+            row = await load()
+            return None if row is None else self.serialize(row)
+
+        return await self._read_through(f"item:{key}", load_serialized)
+
+    async def invalidate(self, *keys: Any) -> None:
+        """
+        Drop the collection and the given entities after a write.
+
+        Args:
+            keys: Identifiers of the entities that were written
+        """
+        self._generation += 1
+        if not self.enabled:
+            return
+        try:
+            await self._get_backend().delete(
+                _LIST_KEY, *(f"item:{key}" for key in keys)
+            )
+        except Exception as e:
+            logger.warning(f"{self.resource} cache invalidation failed: {str(e)}")
+
+    async def clear(self) -> None:
+        """Drop every entry of the resource, e.g. after a sync."""
+        self._generation += 1
+        if not self.enabled:
+            return
+        try:
+            await self._get_backend().clear()
+        except Exception as e:
+            logger.warning(f"{self.resource} cache clear failed: {str(e)}")
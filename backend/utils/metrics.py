@@ -0,0 +1,81 @@
+"""
+Lightweight in-process metrics.
+
+Counters, gauges and timing summaries are kept in memory per process and
+exposed as JSON through the metrics API. Metrics are identified by a name and
+an optional set of labels, e.g. ``increment("drift_checks", resource="mcp")``.
+"""
+
+import threading
+from typing import Any, Dict, Tuple
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple], float] = {}
+_gauges: Dict[Tuple[str, Tuple], float] = {}
+# name/labels -> [count, total, max]
+_timings: Dict[Tuple[str, Tuple], list] = {}
+
+
+def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, Tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def increment(name: str, value: float = 1, **labels: Any) -> None:
+    """Add value to a counter."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels: Any) -> None:
+    """Set a gauge to its current value."""
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name: str, seconds: float, **labels: Any) -> None:
+    """Record a duration in a timing summary."""
+    key = _key(name, labels)
+    with _lock:
+        summary = _timings.setdefault(key, [0, 0.0, 0.0])
+        summary[0] += 1
+        summary[1] += seconds
+        summary[2] = max(summary[2], seconds)
+
+
+def _format(key: Tuple[str, Tuple]) -> Tuple[str, str]:
+    name, labels = key
+    return name, ",".join(f"{k}={v}" for k, v in labels)
+
+
+def snapshot() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Return all metrics grouped by type, name and label set.
+
+    Returns:
+        Dict: {"counters": {...}, "gauges": {...}, "timings": {...}}
+    """
+    result = {"counters": {}, "gauges": {}, "timings": {}}
+    with _lock:
+        for key, value in _counters.items():
+            name, labels = _format(key)
+            result["counters"].setdefault(name, {})[labels] = value
+        for key, value in _gauges.items():
+            name, labels = _format(key)
+            result["gauges"].setdefault(name, {})[labels] = value
+        for key, (count, total, maximum) in _timings.items():
+            name, labels = _format(key)
+            result["timings"].setdefault(name, {})[labels] = {
+                "count": count,
+                "avg_ms": round(total / count * 1000, 3) if count else 0.0,
+                "max_ms": round(maximum * 1000, 3),
+            }
+    return result
+
+
+def reset() -> None:
+    """Clear all metrics."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _timings.clear()
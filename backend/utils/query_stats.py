@@ -0,0 +1,162 @@
+"""
+Opt-in per-request SQL statistics and N+1 detection.
+
+When QUERY_STATS is enabled, engine cursor events count every statement and
+its execution time into the stats object of the current request, found
+through a context variable set by QueryStatsMiddleware. At the end of each
+request the totals are aggregated per route into utils.metrics, and
+statement shapes (SQL text with bind parameters collapsed) executed at
+least QUERY_STATS_N_PLUS_ONE_THRESHOLD times are logged as likely N+1
+patterns. With QUERY_STATS_HEADERS enabled the numbers are also returned as
+X-DB-* response headers for debugging.
+
+Environment variables:
+- QUERY_STATS: "true" to enable instrumentation (default "false")
+- QUERY_STATS_HEADERS: "true" to add X-DB-* response headers
+- QUERY_STATS_N_PLUS_ONE_THRESHOLD: Repetitions of one shape that are flagged
+"""
+
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from . import metrics
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+QUERY_STATS_N_PLUS_ONE_THRESHOLD = int(
+    os.getenv("QUERY_STATS_N_PLUS_ONE_THRESHOLD", "5")
+)
+
+_BIND_LISTS = re.compile(r"(\$\d+|\?|%\(\w+\)s)(\s*,\s*(\$\d+|\?|%\(\w+\)s))*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize SQL so that executions differing only in parameters match."""
+    return _WHITESPACE.sub(" ", _BIND_LISTS.sub("?", statement)).strip()
+
+
+class RequestQueryStats:
+    """Statements executed while serving one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_shapes(
+        self, threshold: int = QUERY_STATS_N_PLUS_ONE_THRESHOLD
+    ) -> List[str]:
+        """Return statement shapes executed at least threshold times."""
+        return [shape for shape, n in self.shapes.items() if n >= threshold]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    """Return the stats of the request being served, if any."""
+    return _current.get()
+
+
+def instrument_engine(db_engine) -> None:
+    """
+    Attach statement timing listeners to an engine.
+
+    Args:
+        db_engine: AsyncEngine or Engine to instrument
+    """
+    sync_engine = getattr(db_engine, "sync_engine", db_engine)
+
+    # The start time lives on the execution context, which is discarded with
+    # a failed statement; after_cursor_execute doesn't fire for those
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_stats_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_stats_start", None)
+        stats = _current.get()
+        if stats is not None and start is not None:
+            stats.record(statement, time.perf_counter() - start)
+
+
+def _route_name(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _headers(stats: RequestQueryStats) -> Dict[bytes, bytes]:
+    return {
+        b"x-db-query-count": str(stats.count).encode(),
+        b"x-db-query-time-ms": f"{stats.seconds * 1000:.1f}".encode(),
+        b"x-db-repeated-queries": str(len(stats.repeated_shapes())).encode(),
+    }
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware collecting SQL statistics for each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message):
+            if QUERY_STATS_HEADERS and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.extend(_headers(stats).items())
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            self._report(scope, stats)
+
+    @staticmethod
+    def _report(scope, stats: RequestQueryStats) -> None:
+        if not stats.count:
+            return
+        route = f"{scope.get('method', '')} {_route_name(scope)}"
+        metrics.increment("db_request_statements", stats.count, route=route)
+        metrics.observe("db_request_time", stats.seconds, route=route)
+        for shape in stats.repeated_shapes():
+            metrics.increment("db_n_plus_one", route=route)
+            logger.warning(
+                f"Possible N+1 on {route}: {stats.shapes[shape]} executions of "
+                f"{shape[:300]}"
+            )
@@ -0,0 +1,167 @@
+"""
+Cold-start profiling for the backend process.
+
+When the STARTUP_PROFILE environment variable is enabled, this module records
+how long every module takes to import and how long each lifespan phase takes,
+and logs a report once startup has finished. When it is disabled every helper
+is a cheap no-op, so the hooks can stay in place in production.
+
+Environment variables:
+- STARTUP_PROFILE: "true" to enable profiling (default "false")
+- STARTUP_PROFILE_TOP_N: number of slowest modules to include in the report
+"""
+
+import importlib.abc
+import importlib.machinery
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STARTUP_PROFILE_ENABLED = os.getenv("STARTUP_PROFILE", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+STARTUP_PROFILE_TOP_N = int(os.getenv("STARTUP_PROFILE_TOP_N", "25"))
+
+_INSTRUMENTED_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+    importlib.machinery.ExtensionFileLoader,
+)
+
+_profile_start = time.perf_counter()
+# module name -> (cumulative seconds, self seconds)
+_import_times: Dict[str, Tuple[float, float]] = {}
+_import_stack: List[List[float]] = []
+_phases: List[Tuple[str, float]] = []
+_milestones: List[Tuple[str, float]] = []
+_reported = False
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Meta path finder that times module execution for file-based loaders."""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if isinstance(spec.loader, _INSTRUMENTED_LOADERS):
+            _instrument_loader(spec.loader, fullname)
+        return spec
+
+
+def _instrument_loader(loader, fullname: str) -> None:
+    """Wrap exec_module on a per-module loader instance to record timings."""
+    exec_module = loader.exec_module
+
+    def timed_exec_module(module):
+        # Each frame tracks [start, time spent in nested imports]
+        _import_stack.append([time.perf_counter(), 0.0])
+        try:
+            exec_module(module)
+        finally:
+            start, children = _import_stack.pop()
+            elapsed = time.perf_counter() - start
+            _import_times[fullname] = (elapsed, elapsed - children)
+            if _import_stack:
+                _import_stack[-1][1] += elapsed
+
+    loader.exec_module = timed_exec_module
+
+
+def install() -> None:
+    """Start timing imports if startup profiling is enabled."""
+    global _profile_start
+    if not STARTUP_PROFILE_ENABLED:
+        return
+    if any(isinstance(finder, _ImportTimer) for finder in sys.meta_path):
+        return
+    _profile_start = time.perf_counter()
+    sys.meta_path.insert(0, _ImportTimer())
+
+
+def uninstall() -> None:
+    """Stop timing imports."""
+    sys.meta_path[:] = [f for f in sys.meta_path if not isinstance(f, _ImportTimer)]
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Record the wall-clock duration of a startup phase.
+
+    Args:
+        name: Human readable phase name shown in the report
+    """
+    if not STARTUP_PROFILE_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append((name, time.perf_counter() - start))
+
+
+def mark(name: str) -> None:
+    """Record a milestone as the time elapsed since profiling started."""
+    if STARTUP_PROFILE_ENABLED:
+        _milestones.append((name, time.perf_counter() - _profile_start))
+
+
+def build_report(top_n: Optional[int] = None) -> str:
+    """
+    Build a human readable startup report.
+
+    Args:
+        top_n: Number of slowest modules to include, defaults to
+               STARTUP_PROFILE_TOP_N
+
+    Returns:
+        str: Multi-line report with lifespan phases and import timings
+    """
+    top_n = top_n or STARTUP_PROFILE_TOP_N
+    lines = ["Startup profile report", "Milestones (since profiling start):"]
+    for name, seconds in _milestones:
+        lines.append(f"  {seconds * 1000:10.1f} ms  {name}")
+    lines.append("Lifespan phases:")
+    for name, seconds in _phases:
+        lines.append(f"  {seconds * 1000:10.1f} ms  {name}")
+
+    total_self = sum(self_time for _, self_time in _import_times.values())
+    lines.append(
+        f"Imports: {len(_import_times)} modules, {total_self * 1000:.1f} ms "
+        f"self time (top {top_n} by cumulative time):"
+    )
+    lines.append(f"  {'cumulative':>10}  {'self':>10}  module")
+    slowest = sorted(_import_times.items(), key=lambda item: item[1][0], reverse=True)
+    for module, (cumulative, self_time) in slowest[:top_n]:
+        lines.append(
+            f"  {cumulative * 1000:7.1f} ms  {self_time * 1000:7.1f} ms  {module}"
+        )
+    return "\n".join(lines)
+
+
+def report() -> None:
+    """Log the startup report once, then stop timing imports."""
+    global _reported
+    if not STARTUP_PROFILE_ENABLED or _reported:
+        return
+    _reported = True
+    uninstall()
+    logger.info(build_report())
@@ -29,7 +29,7 @@ import {
   ModalFooter,
 } from '@patternfly/react-core';
 import { Agent } from '@/routes/config/agents';
-import { fetchUserAgents } from '@/services/agents';
+import { fetchAssignedAgents } from '@/services/agents';
 import { useChat } from '@/hooks/useChat';
 import { useCurrentUser } from '@/contexts/UserContext';
 import {
@@ -359,7 +359,7 @@ export function Chat() {
 
       try {
         console.log('Fetching agents for user:', currentUser.id);
-        const agents = await fetchUserAgents(currentUser.id);
+        const agents = await fetchAssignedAgents();
         setAvailableAgents(agents);
         if (agents.length > 0) {
           const firstAgent = agents[0].id;
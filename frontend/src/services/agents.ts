@@ -11,6 +11,18 @@ export const fetchAgents = async (): Promise<Agent[]> => {
   return data as Agent[];
 };
 
+/**
+ * Fetch the agents assigned to the current user, filtered by the server
+ */
+export const fetchAssignedAgents = async (): Promise<Agent[]> => {
+  const response = await fetch(AGENTS_API_ENDPOINT + '?assigned=true');
+  if (!response.ok) {
+    throw new Error('Network response was not ok');
+  }
+  const data: unknown = await response.json();
+  return data as Agent[];
+};
+
 /**
  * Fetch agents that are specifically assigned to a user
  *
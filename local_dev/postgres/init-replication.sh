@@ -0,0 +1,5 @@
+#!/bin/bash
+# Allow streaming replication connections for the local read replica
+# (compose profile "replica"). Runs once when the primary is initialised.
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
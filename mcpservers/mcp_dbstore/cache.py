@@ -0,0 +1,255 @@
+"""
+In-process cache of serialized products for the lookup tools.
+
+Entries are reachable by product id and by name, expire after
+PRODUCT_CACHE_TTL_SECONDS and are evicted least recently used beyond
+PRODUCT_CACHE_MAX_ENTRIES. Tools that write products call
+invalidate_on_commit() so the affected entries are dropped once the write
+is committed.
+
+Without notifications, other replicas keep serving their entries until they
+expire. With PRODUCT_CACHE_NOTIFY=true on Postgres, writes also send a
+NOTIFY on the product_cache channel in their transaction, and every replica
+LISTENs on it while it has client sessions, so replicas drop each other's
+stale entries as soon as a write commits.
+
+Environment variables:
+- PRODUCT_CACHE_TTL_SECONDS: Lifetime of cached products (0 disables caching)
+- PRODUCT_CACHE_MAX_ENTRIES: Entries kept, counting the id and name keys
+- PRODUCT_CACHE_NOTIFY: "true" to share invalidations through LISTEN/NOTIFY
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import database
+
+PRODUCT_CACHE_TTL_SECONDS = float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "30"))
+PRODUCT_CACHE_MAX_ENTRIES = int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "10000"))
+PRODUCT_CACHE_NOTIFY = os.getenv("PRODUCT_CACHE_NOTIFY", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+NOTIFY_CHANNEL = "product_cache"
+LISTENER_RETRY_SECONDS = 5
+
+
+class ProductCache:
+    """LRU cache of product dicts with a TTL, keyed by id and by name."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, Any], tuple[float, dict]] = OrderedDict()
+        # Bumped by every invalidation, so loads it overtook aren't stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, field: str, value: Any) -> dict | None:
+        """Return a copy of the product cached under field ("id" or "name")."""
+        key = (field, value)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry[1])
+
+    def put(self, product: dict, generation: int) -> None:
+        """Store a product that was loaded while generation was current."""
+        if not self.enabled or generation != self._generation:
+            return
+        expires = time.monotonic() + self.ttl
+        for key in (("id", product["id"]), ("name", product["name"])):
+            self._entries[key] = (expires, product)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self, field: str, value: Any, load: Callable[[], Awaitable[dict | None]]
+    ) -> dict | None:
+        """Return the cached product, loading and caching it on a miss.
+
+        Products that don't exist are not cached.
+        """
+        product = self.get(field, value)
+        if product is not None:
+            return product
+        generation = self._generation
+        product = await load()
+        if product is not None:
+            self.put(product, generation)
+        return product
+
+    async def get_many_or_load(
+        self,
+        field: str,
+        values: Iterable[Any],
+        load: Callable[[list], Awaitable[list[dict]]],
+    ) -> list[dict]:
+        """Return the products whose field is in values, in that order.
+
+        The uncached products are loaded with a single load(missing values)
+        call. Products that don't exist are skipped.
+        """
+        values = list(dict.fromkeys(values))
+        found = {}
+        missing = []
+        for value in values:
+            product = self.get(field, value)
+            if product is None:
+                missing.append(value)
+            else:
+                found[value] = product
+        if missing:
+            generation = self._generation
+            for product in await load(missing):
+                self.put(product, generation)
+                found[product[field]] = dict(product)
+        return [found[value] for value in values if value in found]
+
+    def invalidate(
+        self, product_ids: Iterable[int] = (), names: Iterable[str] = ()
+    ) -> None:
+        """Drop the products with the given ids or names, under both keys."""
+        self._generation += 1
+        for field, values in (("id", product_ids), ("name", names)):
+            for value in values:
+                entry = self._entries.pop((field, value), None)
+                if entry is not None:
+                    product = entry[1]
+                    self._entries.pop(("id", product["id"]), None)
+                    self._entries.pop(("name", product["name"]), None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+
+product_cache = ProductCache(PRODUCT_CACHE_MAX_ENTRIES, PRODUCT_CACHE_TTL_SECONDS)
+
+
+def _notifications_enabled() -> bool:
+    return PRODUCT_CACHE_NOTIFY and database.engine.dialect.name == "postgresql"
+
+
+async def invalidate_on_commit(
+    session: AsyncSession,
+    product_ids: Iterable[int] = (),
+    names: Iterable[str] = (),
+    clear: bool = False,
+) -> None:
+    """Drop cached products once the session's transaction commits.
+
+    Call before committing a write. The local entries are dropped right after
+    the commit, and with notifications enabled other replicas are told
+    through a NOTIFY that Postgres only delivers if the transaction commits.
+    Set clear to drop every cached product.
+    """
+    product_ids, names = list(product_ids), list(names)
+
+    def on_commit(_session) -> None:
+        if clear:
+            product_cache.clear()
+        else:
+            product_cache.invalidate(product_ids, names)
+
+    event.listen(session.sync_session, "after_commit", on_commit, once=True)
+
+    if _notifications_enabled():
+        payload = json.dumps({"ids": product_ids, "names": names, "clear": clear})
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": NOTIFY_CHANNEL, "payload": payload},
+        )
+
+
+def _on_notification(connection, pid, channel, payload) -> None:
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        return
+    if message.get("clear"):
+        product_cache.clear()
+    else:
+        product_cache.invalidate(message.get("ids", ()), message.get("names", ()))
+
+
+async def _listen() -> None:
+    """Apply invalidations from other replicas, reconnecting when needed."""
+    import asyncpg
+
+    dsn = database.engine.url.set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+    while True:
+        try:
+            connection = await asyncpg.connect(dsn)
+        except Exception as e:
+            print(f"WARNING:  MCP_DBStore: Product cache listener can't connect: {e}")
+            await asyncio.sleep(LISTENER_RETRY_SECONDS)
+            continue
+
+        closed = asyncio.Event()
+        connection.add_termination_listener(lambda _connection: closed.set())
+        try:
+            await connection.add_listener(NOTIFY_CHANNEL, _on_notification)
+            # Notifications sent while nobody listened are lost
+            product_cache.clear()
+            await closed.wait()
+            print("WARNING:  MCP_DBStore: Product cache listener disconnected.")
+        except Exception as e:
+            print(f"WARNING:  MCP_DBStore: Product cache listener failed: {e}")
+        finally:
+            if not connection.is_closed():
+                await connection.close()
+        await asyncio.sleep(LISTENER_RETRY_SECONDS)
+
+
+_listener_task: asyncio.Task | None = None
+_listener_users = 0
+
+
+@asynccontextmanager
+async def invalidation_listener() -> AsyncIterator[None]:
+    """Keep the LISTEN subscription open while at least one caller is inside.
+
+    Does nothing unless notifications are enabled.
+    """
+    global _listener_task, _listener_users
+    if not _notifications_enabled():
+        yield
+        return
+
+    _listener_users += 1
+    if _listener_task is None:
+        _listener_task = asyncio.create_task(_listen())
+    try:
+        yield
+    finally:
+        _listener_users -= 1
+        if _listener_users == 0 and _listener_task is not None:
+            _listener_task.cancel()
+            _listener_task = None
+            # Writes of other replicas go unnoticed until the next start
+            product_cache.clear()
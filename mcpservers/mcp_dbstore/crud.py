@@ -1,4 +1,34 @@
-from sqlalchemy import or_, select
+import base64
+import csv
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+from pydantic import ValidationError
+from sqlalchemy import (
+    ARRAY,
+    Float,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    and_,
+    any_,
+    case,
+    cast,
+    column,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 """
@@ -26,29 +56,308 @@ async def get_product_by_name(
     return result.scalars().first()
 
 
+# Fields of models.Product, in its order, for rows served without the ORM
+PRODUCT_FIELDS = ("name", "description", "inventory", "price", "id")
+# The database converts the price, so no Decimal is built per row
+PRODUCT_COLUMNS = (
+    database.ProductDB.name,
+    database.ProductDB.description,
+    database.ProductDB.inventory,
+    cast(database.ProductDB.price, Float),
+    database.ProductDB.id,
+)
+
+
+def _product_dicts(rows) -> list[dict]:
+    return [dict(zip(PRODUCT_FIELDS, row)) for row in rows]
+
+
 async def get_products(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> list[database.ProductDB]:  # Return list of DB models
+    db: AsyncSession, skip: int = 0, limit: int = 100, as_dicts: bool = False
+) -> list[database.ProductDB] | list[dict]:
+    """Fetch products with offset paging.
+
+    With as_dicts, only the product columns are selected and each row is
+    returned as a plain dict shaped like models.Product, skipping the ORM
+    instance and the Pydantic round trip.
+    """
+    if as_dicts:
+        result = await db.execute(select(*PRODUCT_COLUMNS).offset(skip).limit(limit))
+        return _product_dicts(result)
     result = await db.execute(select(database.ProductDB).offset(skip).limit(limit))
     return result.scalars().all()
 
 
+# Most products one batch lookup may ask for
+MAX_BATCH_LOOKUP = 100
+
+
+def _matches_any(column_, values: list, item_type):
+    """column = ANY(:values) with a single array parameter on Postgres."""
+    if database.engine.dialect.name == "postgresql":
+        return column_ == any_(literal(values, ARRAY(item_type)))
+    return column_.in_(values)
+
+
+async def _get_products_by(
+    db: AsyncSession, field: str, values: list, item_type, as_dicts: bool
+) -> list[database.ProductDB] | list[dict]:
+    values = list(dict.fromkeys(values))
+    if len(values) > MAX_BATCH_LOOKUP:
+        raise ValueError(
+            f"At most {MAX_BATCH_LOOKUP} products can be looked up at once"
+        )
+    if not values:
+        return []
+    column_ = getattr(database.ProductDB, field)
+    columns = PRODUCT_COLUMNS if as_dicts else (database.ProductDB,)
+    result = await db.execute(
+        select(*columns).filter(_matches_any(column_, values, item_type))
+    )
+    if as_dicts:
+        products = _product_dicts(result)
+        key = {product[field]: product for product in products}
+    else:
+        products = result.scalars().all()
+        key = {getattr(product, field): product for product in products}
+    return [key[value] for value in values if value in key]
+
+
+async def get_products_by_ids(
+    db: AsyncSession, product_ids: list[int], as_dicts: bool = False
+) -> list[database.ProductDB] | list[dict]:
+    """Fetch the products with the given ids in one query.
+
+    Products come back in the order of product_ids, once each; ids that
+    don't exist are skipped. as_dicts works as for get_products.
+
+    Raises ValueError for more than MAX_BATCH_LOOKUP ids.
+    """
+    return await _get_products_by(db, "id", product_ids, Integer, as_dicts)
+
+
+async def get_products_by_names(
+    db: AsyncSession, names: list[str], as_dicts: bool = False
+) -> list[database.ProductDB] | list[dict]:
+    """Fetch the products with the given names in one query.
+
+    Works like get_products_by_ids.
+    """
+    return await _get_products_by(db, "name", names, String, as_dicts)
+
+
+def encode_cursor(values: dict) -> str:
+    """Encode keyset values as an opaque, URL-safe cursor."""
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, **fields: type) -> dict:
+    """Decode a cursor made by encode_cursor and check its field types.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, dict) or not all(
+        isinstance(values.get(name), kind) for name, kind in fields.items()
+    ):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+# Largest page one paged query may ask for
+MAX_PAGE_LIMIT = 1000
+
+
+def check_page_limit(limit: int) -> None:
+    """Raise ValueError unless limit is between 1 and MAX_PAGE_LIMIT."""
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}, got {limit}")
+
+
+async def get_products_page(
+    db: AsyncSession,
+    cursor: str | None = None,
+    limit: int = 100,
+    as_dicts: bool = False,
+) -> tuple[list[database.ProductDB] | list[dict], str | None]:
+    """Fetch products ordered by id, continuing after cursor.
+
+    Returns the products and the cursor of the next page, or None on the
+    last page. Unlike skip, the cost of a page doesn't grow with its depth
+    and rows inserted meanwhile don't shift later pages. as_dicts works as
+    for get_products.
+    """
+    check_page_limit(limit)
+    columns = PRODUCT_COLUMNS if as_dicts else (database.ProductDB,)
+    statement = select(*columns).order_by(database.ProductDB.id)
+    if cursor is not None:
+        after = decode_cursor(cursor, id=int)
+        statement = statement.filter(database.ProductDB.id > after["id"])
+    result = await db.execute(statement.limit(limit + 1))
+    products = _product_dicts(result) if as_dicts else list(result.scalars().all())
+
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor({"id": _product_id(products[-1])})
+    return products, next_cursor
+
+
+def _product_id(product: database.ProductDB | dict) -> int:
+    return product["id"] if isinstance(product, dict) else product.id
+
+
 async def search_products(
     db: AsyncSession, query: str, skip: int = 0, limit: int = 100
 ) -> list[database.ProductDB]:  # Return list of DB models
+    ranked = await search_products_ranked(db, query=query, skip=skip, limit=limit)
+    return [product for product, _ in ranked]
+
+
+def _full_text_search(query: str):
+    search_vector = literal_column("products.search_vector")
+    tsquery = func.websearch_to_tsquery(database.SEARCH_CONFIG, query)
+    rank = func.ts_rank(search_vector, tsquery)
+    return (
+        select(database.ProductDB, rank).filter(search_vector.op("@@")(tsquery)),
+        rank,
+    )
+
+
+def _trigram_search(query: str):
+    # "%" is pg_trgm's similarity operator, served by the trigram index
+    similarity = func.similarity(database.ProductDB.name, query)
+    return (
+        select(database.ProductDB, similarity).filter(
+            database.ProductDB.name.op("%")(query)
+        ),
+        similarity,
+    )
+
+
+def _substring_search(query: str):
     search_term = f"%{query}%"
-    result = await db.execute(
-        select(database.ProductDB)
-        .filter(
+    name_match = database.ProductDB.name.ilike(search_term)
+    score = case((name_match, 1.0), else_=0.5)
+    return (
+        select(database.ProductDB, score).filter(
+            or_(name_match, database.ProductDB.description.ilike(search_term))
+        ),
+        score,
+    )
+
+
+_SEARCH_MODES = {
+    "full_text": _full_text_search,
+    "trigram": _trigram_search,
+    "substring": _substring_search,
+}
+
+
+def _default_search_mode() -> str:
+    return "full_text" if database.search_features["full_text"] else "substring"
+
+
+async def _run_search(
+    db: AsyncSession,
+    query: str,
+    mode: str,
+    limit: int,
+    skip: int = 0,
+    after: dict | None = None,
+    as_dicts: bool = False,
+) -> list[tuple[database.ProductDB | dict, float]]:
+    statement, score = _SEARCH_MODES[mode](query)
+    if as_dicts:
+        statement = statement.with_only_columns(*PRODUCT_COLUMNS, score)
+    if after is not None:
+        statement = statement.filter(
             or_(
-                database.ProductDB.name.ilike(search_term),
-                database.ProductDB.description.ilike(search_term),
+                score < after["score"],
+                and_(score == after["score"], database.ProductDB.id > after["id"]),
             )
         )
+    result = await db.execute(
+        statement.order_by(score.desc(), database.ProductDB.id)
         .offset(skip)
         .limit(limit)
     )
-    return result.scalars().all()
+    if as_dicts:
+        return [(dict(zip(PRODUCT_FIELDS, row[:-1])), float(row[-1])) for row in result]
+    return [(product, float(score)) for product, score in result.all()]
+
+
+async def search_products_ranked(
+    db: AsyncSession,
+    query: str,
+    skip: int = 0,
+    limit: int = 100,
+    as_dicts: bool = False,
+) -> list[tuple[database.ProductDB | dict, float]]:
+    """Search products by relevance and return (product, score) pairs.
+
+    On Postgres the search_vector column is matched with websearch syntax
+    and ranked with ts_rank (name matches weigh more than description
+    matches). If that finds nothing, for example because of a typo, product
+    names are matched by trigram similarity instead. Other databases fall
+    back to substring matching, ranking name matches first. as_dicts works
+    as for get_products.
+    """
+    mode = _default_search_mode()
+    rows = await _run_search(db, query, mode, limit, skip=skip, as_dicts=as_dicts)
+    if rows or mode != "full_text" or not database.search_features["trigram"]:
+        return rows
+    # Past the last page of full-text matches, not a typo
+    if skip and await _run_search(db, query, mode, 1):
+        return []
+    return await _run_search(db, query, "trigram", limit, skip=skip, as_dicts=as_dicts)
+
+
+async def search_products_page(
+    db: AsyncSession,
+    query: str,
+    cursor: str | None = None,
+    limit: int = 100,
+    as_dicts: bool = False,
+) -> tuple[list[tuple[database.ProductDB | dict, float]], str | None]:
+    """Search products by relevance, continuing after cursor.
+
+    Pages are ordered by (score descending, id) like search_products_ranked.
+    The first page decides between full-text and trigram matching and the
+    cursor carries that choice to the following pages.
+
+    Returns the (product, score) pairs and the cursor of the next page, or
+    None on the last page. as_dicts works as for get_products.
+    """
+    check_page_limit(limit)
+    if cursor is None:
+        mode = _default_search_mode()
+        rows = await _run_search(db, query, mode, limit + 1, as_dicts=as_dicts)
+        if not rows and mode == "full_text" and database.search_features["trigram"]:
+            mode = "trigram"
+            rows = await _run_search(db, query, mode, limit + 1, as_dicts=as_dicts)
+    else:
+        after = decode_cursor(cursor, mode=str, score=(int, float), id=int)
+        mode = after["mode"]
+        if mode not in _SEARCH_MODES:
+            raise ValueError("Invalid cursor")
+        rows = await _run_search(
+            db, query, mode, limit + 1, after=after, as_dicts=as_dicts
+        )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        product, score = rows[-1]
+        next_cursor = encode_cursor(
+            {"mode": mode, "score": score, "id": _product_id(product)}
+        )
+    return rows, next_cursor
 
 
 async def add_product(
@@ -61,6 +370,206 @@ async def add_product(
     return db_product
 
 
+# Rows staged per COPY (or batched INSERT) during a bulk import
+IMPORT_BATCH_SIZE = 5000
+# Rejected rows beyond this many are counted but not described
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_FIELDS = ("name", "description", "inventory", "price")
+
+# Temporary, so concurrent imports on other connections don't see each other
+IMPORT_STAGING_DDL = (
+    "CREATE TEMPORARY TABLE IF NOT EXISTS product_import ("
+    "line integer, name text, description text, inventory integer, "
+    "price numeric(10, 2))"
+)
+import_staging = table(
+    "product_import",
+    column("line", Integer),
+    column("name", Text),
+    column("description", Text),
+    column("inventory", Integer),
+    column("price", Numeric(10, 2)),
+)
+# The last row wins when an import repeats a name
+IMPORT_LATEST_ROWS = (
+    "product_import.line IN (SELECT max(line) FROM product_import GROUP BY name)"
+)
+IMPORT_COUNT_SQL = (
+    "SELECT count(*), count(products.id) FROM product_import "
+    "LEFT JOIN products ON products.name = product_import.name "
+    f"WHERE {IMPORT_LATEST_ROWS}"
+)
+IMPORT_UPSERT_SQL = (
+    "INSERT INTO products (name, description, inventory, price) "
+    "SELECT name, description, inventory, price FROM product_import "
+    f"WHERE {IMPORT_LATEST_ROWS} "
+    "ON CONFLICT (name) DO UPDATE SET description = excluded.description, "
+    "inventory = excluded.inventory, price = excluded.price"
+)
+
+
+async def _iterate(lines: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    if isinstance(lines, AsyncIterable):
+        async for line in lines:
+            yield line
+    else:
+        for line in lines:
+            yield line
+
+
+async def _csv_records(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield (line number, fields, error) for CSV text with a header row.
+
+    A record continues on the next line while one of its quotes is open.
+    """
+    header = None
+    pending: list[str] = []
+    number = start = 0
+    async for line in lines:
+        number += 1
+        if not pending:
+            start = number
+        pending.append(line)
+        record = "\n".join(pending)
+        if record.count('"') % 2:
+            continue
+        pending = []
+        if not record.strip():
+            continue
+        try:
+            values = next(csv.reader([record]))
+        except csv.Error as e:
+            yield start, None, str(e)
+            continue
+
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            if not {"name", "inventory", "price"} <= set(header):
+                raise ValueError(
+                    "CSV header must include name, inventory and price columns"
+                )
+            continue
+        if len(values) != len(header):
+            yield start, None, f"expected {len(header)} fields, got {len(values)}"
+            continue
+        row = dict(zip(header, values))
+        fields = {name: row[name] for name in IMPORT_FIELDS if name in row}
+        if not fields.get("description"):
+            fields["description"] = None
+        yield start, fields, None
+    if pending:
+        yield start, None, "unterminated quoted field"
+
+
+async def _ndjson_records(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield (line number, fields, error) for NDJSON text, one object per line."""
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(fields, dict):
+            yield number, None, "expected a JSON object"
+            continue
+        yield number, fields, None
+
+
+_RECORD_PARSERS = {"csv": _csv_records, "ndjson": _ndjson_records}
+
+
+def _validate_import_row(fields: dict) -> tuple[models.ProductCreate | None, str]:
+    try:
+        product = models.ProductCreate.model_validate(fields)
+    except ValidationError as e:
+        error = e.errors()[0]
+        location = ".".join(str(part) for part in error["loc"])
+        return None, f"{location}: {error['msg']}"
+    if not product.name.strip():
+        return None, "name: must not be empty"
+    return product, ""
+
+
+async def _stage_products(db: AsyncSession, rows: list[tuple]) -> None:
+    """Load (line, name, description, inventory, price) rows into staging."""
+    connection = await db.connection()
+    if connection.dialect.driver == "asyncpg":
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "product_import", records=rows, columns=("line", *IMPORT_FIELDS)
+        )
+        return
+    await db.execute(
+        insert(import_staging),
+        [dict(zip(("line", *IMPORT_FIELDS), row)) for row in rows],
+    )
+
+
+async def bulk_import_products(
+    db: AsyncSession,
+    lines: Iterable[str] | AsyncIterable[str],
+    format: str = "csv",
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> models.BulkImportResult:
+    """Insert or update products, matched by name, from CSV or NDJSON lines.
+
+    Valid rows are staged in a temporary table in batches, with COPY on
+    asyncpg and batched INSERTs otherwise, then merged into products with
+    one upsert. Invalid rows are rejected without failing the import. CSV
+    needs a header row naming the name, inventory and price columns, and
+    optionally description. The caller commits.
+
+    Raises ValueError for an unknown format or a CSV header that lacks a
+    required column.
+    """
+    if format not in _RECORD_PARSERS:
+        raise ValueError(f"Unsupported import format {format!r}")
+    result = models.BulkImportResult()
+
+    await db.execute(text(IMPORT_STAGING_DDL))
+    await db.execute(text("DELETE FROM product_import"))
+    batch: list[tuple] = []
+    async for number, fields, error in _RECORD_PARSERS[format](_iterate(lines)):
+        product = None
+        if fields is not None:
+            product, error = _validate_import_row(fields)
+        if product is None:
+            result.rejected += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(f"line {number}: {error}")
+            continue
+        batch.append(
+            (
+                number,
+                product.name,
+                product.description,
+                product.inventory,
+                Decimal(str(product.price)),
+            )
+        )
+        if len(batch) >= batch_size:
+            await _stage_products(db, batch)
+            batch = []
+    if batch:
+        await _stage_products(db, batch)
+
+    staged, existing = (await db.execute(text(IMPORT_COUNT_SQL))).one()
+    await db.execute(text(IMPORT_UPSERT_SQL))
+    await db.execute(text("DROP TABLE product_import"))
+    result.inserted = staged - existing
+    result.updated = existing
+    return result
+
+
 async def remove_product(
     db: AsyncSession, product_id: int
 ) -> database.ProductDB | None:  # Return DB model
@@ -76,38 +585,284 @@ async def remove_product(
     return None
 
 
+async def _reserve_inventory(
+    db: AsyncSession, product_id: int, quantity: int
+) -> database.ProductDB:
+    """Deduct quantity from a product's inventory if enough is in stock.
+
+    The conditional UPDATE checks and deducts in one statement and locks the
+    product row until the transaction ends, so concurrent orders can't
+    oversell. Raises ValueError if the product doesn't exist or has too
+    little inventory.
+    """
+    if quantity <= 0:
+        raise ValueError(f"Quantity must be positive. Requested: {quantity}")
+    result = await db.execute(
+        update(database.ProductDB)
+        .where(
+            database.ProductDB.id == product_id,
+            database.ProductDB.inventory >= quantity,
+        )
+        .values(inventory=database.ProductDB.inventory - quantity)
+        .returning(database.ProductDB)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    db_product = result.scalars().first()
+    if db_product is not None:
+        return db_product
+
+    # Only failed reservations pay for a second query, to word the error
+    result = await db.execute(
+        select(database.ProductDB)
+        .filter(database.ProductDB.id == product_id)
+        .execution_options(populate_existing=True)
+    )
+    db_product = result.scalars().first()
+    if not db_product:
+        raise ValueError(f"Product with id {product_id} not found.")
+    raise ValueError(
+        f"Insufficient inventory for product {db_product.name}. "
+        f"Available: {db_product.inventory}, Requested: {quantity}"
+    )
+
+
+def _upsert(table_):
+    """INSERT for the engine's dialect, which supports ON CONFLICT."""
+    if database.engine.dialect.name == "postgresql":
+        return postgresql.insert(table_)
+    return sqlite.insert(table_)
+
+
+async def _record_sales(
+    db: AsyncSession,
+    sales: list[tuple[database.ProductDB, int]],
+    ordered_at: datetime,
+) -> None:
+    """Add ordered (product, quantity) pairs to the product_sales totals.
+
+    One upsert per product, in the caller's transaction, so the totals
+    commit or roll back with the orders. The product rows are already
+    locked by _reserve_inventory, so the totals rows are locked in the
+    same order.
+    """
+    sales_table = database.ProductSalesDB.__table__
+    statement = _upsert(sales_table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[sales_table.c.product_id],
+        set_={
+            "units_sold": sales_table.c.units_sold + statement.excluded.units_sold,
+            "order_count": sales_table.c.order_count + 1,
+            "revenue": sales_table.c.revenue + statement.excluded.revenue,
+            "last_ordered_at": statement.excluded.last_ordered_at,
+        },
+    )
+    await db.execute(
+        statement,
+        [
+            {
+                "product_id": product.id,
+                "units_sold": quantity,
+                "order_count": 1,
+                "revenue": product.price * quantity,
+                "last_ordered_at": ordered_at,
+            }
+            for product, quantity in sales
+        ],
+    )
+
+
 async def order_product(
     db: AsyncSession, order_details: models.ProductOrderRequest
 ) -> database.OrderDB:  # Return DB model
-    # Get product within the current session
-    product_result = await db.execute(
-        select(database.ProductDB).filter(
-            database.ProductDB.id == order_details.product_id
+    """Place an order, deducting its quantity from the product's inventory.
+
+    Runs as three statements, the conditional inventory UPDATE, the order
+    INSERT and the product_sales upsert. The caller commits, or rolls back
+    on ValueError.
+    """
+    db_product = await _reserve_inventory(
+        db, order_details.product_id, order_details.quantity
+    )
+    ordered_at = database.utcnow()
+    result = await db.execute(
+        insert(database.OrderDB)
+        .values(
+            product_id=order_details.product_id,
+            quantity=order_details.quantity,
+            customer_identifier=order_details.customer_identifier,
+            created_at=ordered_at,
         )
+        .returning(database.OrderDB)
     )
-    db_product = product_result.scalars().first()
+    db_order = result.scalars().one()
+    await _record_sales(db, [(db_product, order_details.quantity)], ordered_at)
+    return db_order
 
-    if not db_product:
-        raise ValueError(f"Product with id {order_details.product_id} not found.")
 
-    if db_product.inventory < order_details.quantity:
-        raise ValueError(
-            f"Not enough inventory for product '{db_product.name}'. "
-            f"Available: {db_product.inventory}, "
-            f"Requested: {order_details.quantity}"
+async def order_products(
+    db: AsyncSession, order_details: models.MultiProductOrderRequest
+) -> list[database.OrderDB]:  # Return DB models
+    """Place one order per product, reserving all stock in one transaction.
+
+    Quantities of repeated products are summed. Inventory is reserved in
+    product id order, so concurrent multi-item orders lock rows in the same
+    order and can't deadlock. The caller commits, or rolls back on
+    ValueError so that the reservations already made are released.
+    """
+    quantities: dict[int, int] = {}
+    for item in order_details.items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    if not quantities:
+        raise ValueError("Order has no items.")
+
+    product_ids = sorted(quantities)
+    sales = []
+    for product_id in product_ids:
+        quantity = quantities[product_id]
+        sales.append((await _reserve_inventory(db, product_id, quantity), quantity))
+    ordered_at = database.utcnow()
+    result = await db.execute(
+        insert(database.OrderDB).returning(
+            database.OrderDB, sort_by_parameter_order=True
+        ),
+        [
+            {
+                "product_id": product_id,
+                "quantity": quantities[product_id],
+                "customer_identifier": order_details.customer_identifier,
+                "created_at": ordered_at,
+            }
+            for product_id in product_ids
+        ],
+    )
+    db_orders = list(result.scalars().all())
+    await _record_sales(db, sales, ordered_at)
+    return db_orders
+
+
+async def get_orders_page(
+    db: AsyncSession,
+    customer_identifier: str | None = None,
+    product_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> tuple[list[database.OrderDB], str | None]:
+    """Fetch orders newest first, optionally of one customer or product.
+
+    Pages continue after cursor like get_products_page. Filtered pages are
+    served from the (customer_identifier, id) and (product_id, id) indexes.
+    """
+    check_page_limit(limit)
+    statement = select(database.OrderDB).order_by(database.OrderDB.id.desc())
+    if customer_identifier is not None:
+        statement = statement.filter(
+            database.OrderDB.customer_identifier == customer_identifier
         )
+    if product_id is not None:
+        statement = statement.filter(database.OrderDB.product_id == product_id)
+    if cursor is not None:
+        after = decode_cursor(cursor, id=int)
+        statement = statement.filter(database.OrderDB.id < after["id"])
+    result = await db.execute(statement.limit(limit + 1))
+    orders = list(result.scalars().all())
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor({"id": orders[-1].id})
+    return orders, next_cursor
+
+
+# Fields of models.ProductSales, in its order
+SALES_FIELDS = (
+    "product_id",
+    "name",
+    "units_sold",
+    "order_count",
+    "revenue",
+    "last_ordered_at",
+)
+SALES_COLUMNS = (
+    database.ProductDB.id,
+    database.ProductDB.name,
+    func.coalesce(database.ProductSalesDB.units_sold, 0),
+    func.coalesce(database.ProductSalesDB.order_count, 0),
+    cast(func.coalesce(database.ProductSalesDB.revenue, 0), Float),
+    database.ProductSalesDB.last_ordered_at,
+)
+_SALES_RANKINGS = {
+    "units": database.ProductSalesDB.units_sold,
+    "revenue": database.ProductSalesDB.revenue,
+}
+
+
+def _sales_dicts(rows) -> list[dict]:
+    return [dict(zip(SALES_FIELDS, row)) for row in rows]
+
 
-    db_product.inventory -= order_details.quantity
+async def get_top_sellers(
+    db: AsyncSession, by: str = "units", limit: int = 10
+) -> list[dict]:
+    """Fetch the best selling products, by units sold or by revenue.
 
-    db_order = database.OrderDB(
-        product_id=order_details.product_id,
-        quantity=order_details.quantity,
-        customer_identifier=order_details.customer_identifier,
+    Served from the product_sales totals and their index, so the cost
+    doesn't depend on the number of orders. Raises ValueError for an
+    unknown ranking.
+    """
+    ranking = _SALES_RANKINGS.get(by)
+    if ranking is None:
+        raise ValueError(f"Unknown ranking: {by}. Use one of: units, revenue")
+    result = await db.execute(
+        select(*SALES_COLUMNS)
+        .join(
+            database.ProductDB,
+            database.ProductDB.id == database.ProductSalesDB.product_id,
+        )
+        .order_by(ranking.desc(), database.ProductSalesDB.product_id)
+        .limit(limit)
     )
-    db.add(db_product)  # Add updated product (inventory change) to session
-    db.add(db_order)
+    return _sales_dicts(result)
 
-    await db.flush()
-    await db.refresh(db_order)
-    await db.refresh(db_product)
-    return db_order
+
+async def get_product_sales(db: AsyncSession, product_ids: list[int]) -> list[dict]:
+    """Fetch the sales totals of the given products in one query.
+
+    Products come back in the order of product_ids; products never ordered
+    have zero totals and ids that don't exist are skipped. Raises
+    ValueError for more than MAX_BATCH_LOOKUP ids.
+    """
+    product_ids = list(dict.fromkeys(product_ids))
+    if len(product_ids) > MAX_BATCH_LOOKUP:
+        raise ValueError(
+            f"At most {MAX_BATCH_LOOKUP} products can be looked up at once"
+        )
+    if not product_ids:
+        return []
+    result = await db.execute(
+        select(*SALES_COLUMNS)
+        .outerjoin(
+            database.ProductSalesDB,
+            database.ProductSalesDB.product_id == database.ProductDB.id,
+        )
+        .filter(_matches_any(database.ProductDB.id, product_ids, Integer))
+    )
+    sales = {row["product_id"]: row for row in _sales_dicts(result)}
+    return [sales[product_id] for product_id in product_ids if product_id in sales]
+
+
+async def get_low_stock_products(
+    db: AsyncSession, threshold: int = 10, limit: int = 50, as_dicts: bool = False
+) -> list[database.ProductDB] | list[dict]:
+    """Fetch products with at most threshold units in stock, fewest first.
+
+    Served from the index on products.inventory. as_dicts works as for
+    get_products.
+    """
+    columns = PRODUCT_COLUMNS if as_dicts else (database.ProductDB,)
+    result = await db.execute(
+        select(*columns)
+        .filter(database.ProductDB.inventory <= threshold)
+        .order_by(database.ProductDB.inventory, database.ProductDB.id)
+        .limit(limit)
+    )
+    return _product_dicts(result) if as_dicts else list(result.scalars().all())
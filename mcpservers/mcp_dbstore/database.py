@@ -1,6 +1,18 @@
 import os
+from datetime import datetime, timezone
 
-from sqlalchemy import Column, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
@@ -33,12 +45,16 @@ class ProductDB(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, unique=True)
     description = Column(Text, nullable=True)
-    inventory = Column(Integer, default=0)
+    inventory = Column(Integer, default=0, index=True)
     price = Column(Numeric(10, 2), nullable=False, default=0.00)
 
     orders = relationship("OrderDB", back_populates="product")
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class OrderDB(Base):
     __tablename__ = "orders"
 
@@ -46,11 +62,121 @@ class OrderDB(Base):
     product_id = Column(Integer, ForeignKey("products.id"))
     quantity = Column(Integer)
     customer_identifier = Column(String)
+    # Also set client side, so SQLite stores every row in the same format
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=utcnow,
+        server_default=func.now(),
+    )
 
     product = relationship("ProductDB", back_populates="orders")
 
+    # Order history is paged newest first by id, per customer or per product
+    __table_args__ = (
+        Index("ix_orders_customer_identifier_id", "customer_identifier", "id"),
+        Index("ix_orders_product_id_id", "product_id", "id"),
+    )
+
+
+class ProductSalesDB(Base):
+    """Running sales totals of a product, updated by every order."""
+
+    __tablename__ = "product_sales"
+
+    product_id = Column(
+        Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    units_sold = Column(Integer, nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    last_ordered_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_product_sales_units_sold", "units_sold"),
+        Index("ix_product_sales_revenue", "revenue"),
+    )
+
+
+# Text search configuration used for the products.search_vector column
+SEARCH_CONFIG = "english"
+
+# Set by ensure_search_indexes(); the trigram fallback needs pg_trgm
+search_features = {"full_text": False, "trigram": False}
+
+# Postgres only, and idempotent so that it can run on every startup. The
+# generated column is recomputed by Postgres on every insert and update.
+SEARCH_VECTOR_DDL = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector "
+    "ON products USING GIN (search_vector)",
+]
+TRIGRAM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm "
+    "ON products USING GIN (name gin_trgm_ops)",
+]
+
+
+# create_all only creates missing tables, so the order history column and
+# indexes are added to existing tables here. Postgres only, and idempotent.
+ORDER_HISTORY_DDL = [
+    "ALTER TABLE orders ADD COLUMN IF NOT EXISTS "
+    "created_at timestamptz NOT NULL DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_orders_customer_identifier_id "
+    "ON orders (customer_identifier, id)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_product_id_id ON orders (product_id, id)",
+    "CREATE INDEX IF NOT EXISTS ix_products_inventory ON products (inventory)",
+]
+
+# Fills product_sales from the orders placed before it existed. Only runs
+# while product_sales is empty; past orders are valued at the current price.
+PRODUCT_SALES_BACKFILL_SQL = """
+INSERT INTO product_sales
+    (product_id, units_sold, order_count, revenue, last_ordered_at)
+SELECT o.product_id, sum(o.quantity), count(*), sum(o.quantity * p.price),
+       max(o.created_at)
+FROM orders o JOIN products p ON p.id = o.product_id
+WHERE NOT EXISTS (SELECT 1 FROM product_sales)
+GROUP BY o.product_id
+ON CONFLICT (product_id) DO NOTHING
+"""
+
+
+async def ensure_order_history():
+    """Bring the order history indexes and sales totals up to date."""
+    async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            for statement in ORDER_HISTORY_DDL:
+                await conn.execute(text(statement))
+        await conn.execute(text(PRODUCT_SALES_BACKFILL_SQL))
+
+
+async def ensure_search_indexes():
+    """Create the full-text and trigram search structures on Postgres."""
+    if engine.dialect.name != "postgresql":
+        return
+    async with engine.begin() as conn:
+        for statement in SEARCH_VECTOR_DDL:
+            await conn.execute(text(statement))
+    search_features["full_text"] = True
+    try:
+        async with engine.begin() as conn:
+            for statement in TRIGRAM_DDL:
+                await conn.execute(text(statement))
+        search_features["trigram"] = True
+    except Exception as e:
+        # Creating the extension needs privileges the store user may lack
+        print(f"WARNING:  MCP_DBStore: Trigram search unavailable: {e}")
+
 
 async def create_db_and_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await ensure_search_indexes()
+    await ensure_order_history()
     print("INFO:     MCP_DBStore: Database tables checked/created.")
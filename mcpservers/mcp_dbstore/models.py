@@ -1,6 +1,7 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ProductBase(BaseModel):
@@ -21,6 +22,13 @@ class Product(ProductBase):
         from_attributes = True
 
 
+class BulkImportResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    errors: List[str] = []
+
+
 class OrderBase(BaseModel):
     product_id: int
     quantity: int
@@ -33,6 +41,7 @@ class OrderCreate(OrderBase):
 
 class Order(OrderBase):
     id: int
+    created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -42,3 +51,22 @@ class ProductOrderRequest(BaseModel):
     product_id: int
     quantity: int
     customer_identifier: str
+
+
+class OrderItem(BaseModel):
+    product_id: int
+    quantity: int = Field(gt=0)
+
+
+class MultiProductOrderRequest(BaseModel):
+    items: List[OrderItem] = Field(min_length=1)
+    customer_identifier: str
+
+
+class ProductSales(BaseModel):
+    product_id: int
+    name: str
+    units_sold: int
+    order_count: int
+    revenue: float
+    last_ordered_at: Optional[datetime] = None
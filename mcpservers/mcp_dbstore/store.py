@@ -1,56 +1,152 @@
 import asyncio
-from typing import Any, Dict, List, Optional
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from mcp.server.fastmcp import FastMCP
 
-from . import crud, database
+from . import cache, crud, database
 from . import models as PydanticModels
 
-mcp_server = FastMCP()
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Runs around every client session."""
+    async with cache.invalidation_listener():
+        yield
+
+
+mcp_server = FastMCP(lifespan=lifespan)
 
 
 @mcp_server.tool()
 async def get_products(skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
     """Fetches a list of all products from the database."""
     async with database.AsyncSessionLocal() as session:
-        db_products = await crud.get_products(session, skip=skip, limit=limit)
-        return [
-            PydanticModels.Product.model_validate(p).model_dump() for p in db_products
-        ]
+        return await crud.get_products(session, skip=skip, limit=limit, as_dicts=True)
+
+
+@mcp_server.tool()
+async def get_products_page(
+    cursor: Optional[str] = None, limit: int = 100
+) -> Dict[str, Any]:
+    """Fetches a page of products ordered by ID.
+    Pass the returned next_cursor to fetch the following page; it is None on
+    the last page. Prefer this over get_products with skip for deep paging.
+    """
+    async with database.AsyncSessionLocal() as session:
+        products, next_cursor = await crud.get_products_page(
+            session, cursor=cursor, limit=limit, as_dicts=True
+        )
+        return {"products": products, "next_cursor": next_cursor}
 
 
 @mcp_server.tool()
 async def get_product_by_id(product_id: int) -> Optional[Dict[str, Any]]:
     """Fetches a single product by its ID from the database."""
-    async with database.AsyncSessionLocal() as session:
-        db_product = await crud.get_product_by_id(session, product_id=product_id)
-        if db_product:
-            return PydanticModels.Product.model_validate(db_product).model_dump()
-        return None
+
+    async def load() -> Optional[Dict[str, Any]]:
+        async with database.AsyncSessionLocal() as session:
+            db_product = await crud.get_product_by_id(session, product_id=product_id)
+            if db_product:
+                return PydanticModels.Product.model_validate(db_product).model_dump()
+            return None
+
+    return await cache.product_cache.get_or_load("id", product_id, load)
 
 
 @mcp_server.tool()
 async def get_product_by_name(name: str) -> Optional[Dict[str, Any]]:
     """Fetches a single product by its name from the database."""
-    async with database.AsyncSessionLocal() as session:
-        db_product = await crud.get_product_by_name(session, name=name)
-        if db_product:
-            return PydanticModels.Product.model_validate(db_product).model_dump()
-        return None
+
+    async def load() -> Optional[Dict[str, Any]]:
+        async with database.AsyncSessionLocal() as session:
+            db_product = await crud.get_product_by_name(session, name=name)
+            if db_product:
+                return PydanticModels.Product.model_validate(db_product).model_dump()
+            return None
+
+    return await cache.product_cache.get_or_load("name", name, load)
+
+
+@mcp_server.tool()
+async def get_products_by_ids(product_ids: List[int]) -> List[Dict[str, Any]]:
+    """Fetches several products by their IDs at once, in the requested order.
+    IDs that don't exist are left out. Up to 100 IDs per call.
+    """
+
+    async def load(missing: List[int]) -> List[Dict[str, Any]]:
+        async with database.AsyncSessionLocal() as session:
+            return await crud.get_products_by_ids(session, missing, as_dicts=True)
+
+    if len(product_ids) > crud.MAX_BATCH_LOOKUP:
+        raise ValueError(
+            f"At most {crud.MAX_BATCH_LOOKUP} products can be looked up at once"
+        )
+    return await cache.product_cache.get_many_or_load("id", product_ids, load)
+
+
+@mcp_server.tool()
+async def get_products_by_names(names: List[str]) -> List[Dict[str, Any]]:
+    """Fetches several products by their names at once, in the requested order.
+    Names that don't exist are left out. Up to 100 names per call.
+    """
+
+    async def load(missing: List[str]) -> List[Dict[str, Any]]:
+        async with database.AsyncSessionLocal() as session:
+            return await crud.get_products_by_names(session, missing, as_dicts=True)
+
+    if len(names) > crud.MAX_BATCH_LOOKUP:
+        raise ValueError(
+            f"At most {crud.MAX_BATCH_LOOKUP} products can be looked up at once"
+        )
+    return await cache.product_cache.get_many_or_load("name", names, load)
+
+
+def _with_scores(
+    ranked: List[tuple[Dict[str, Any], float]], include_score: bool
+) -> List[Dict[str, Any]]:
+    if include_score:
+        for product, score in ranked:
+            product["score"] = score
+    return [product for product, _ in ranked]
 
 
 @mcp_server.tool()
 async def search_products(
-    query: str, skip: int = 0, limit: int = 100
+    query: str, skip: int = 0, limit: int = 100, include_score: bool = False
 ) -> List[Dict[str, Any]]:
-    """Searches for products based on a query string (name or description)."""
+    """Searches for products based on a query string (name or description).
+    Results are ordered by relevance, best match first. Set include_score to
+    add each product's relevance score under "score".
+    """
+    async with database.AsyncSessionLocal() as session:
+        ranked = await crud.search_products_ranked(
+            session, query=query, skip=skip, limit=limit, as_dicts=True
+        )
+        return _with_scores(ranked, include_score)
+
+
+@mcp_server.tool()
+async def search_products_page(
+    query: str,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    include_score: bool = False,
+) -> Dict[str, Any]:
+    """Searches for products by relevance, one page at a time.
+    Pass the returned next_cursor with the same query to fetch the following
+    page; it is None on the last page. Set include_score to add each
+    product's relevance score under "score".
+    """
     async with database.AsyncSessionLocal() as session:
-        db_products = await crud.search_products(
-            session, query=query, skip=skip, limit=limit
+        ranked, next_cursor = await crud.search_products_page(
+            session, query=query, cursor=cursor, limit=limit, as_dicts=True
         )
-        return [
-            PydanticModels.Product.model_validate(p).model_dump() for p in db_products
-        ]
+        return {
+            "products": _with_scores(ranked, include_score),
+            "next_cursor": next_cursor,
+        }
 
 
 @mcp_server.tool()
@@ -63,16 +159,43 @@ async def add_product(
     )
     async with database.AsyncSessionLocal() as session:
         db_product = await crud.add_product(session, product=product_create)
+        await cache.invalidate_on_commit(
+            session, product_ids=[db_product.id], names=[db_product.name]
+        )
         await session.commit()
         return PydanticModels.Product.model_validate(db_product).model_dump()
 
 
+@mcp_server.tool()
+async def import_products(data: str, format: str = "csv") -> Dict[str, Any]:
+    """Adds or updates many products at once, matching existing ones by name.
+    data holds CSV with a header row (name, description, inventory, price) or
+    NDJSON with one product object per line; set format to "csv" or "ndjson".
+    Invalid rows are skipped. Returns the inserted, updated and rejected
+    counts, with the reasons for the first rejected rows under "errors".
+    """
+    async with database.AsyncSessionLocal() as session:
+        try:
+            result = await crud.bulk_import_products(
+                session, data.splitlines(), format=format
+            )
+            await cache.invalidate_on_commit(session, clear=True)
+            await session.commit()
+            return result.model_dump()
+        except Exception:
+            await session.rollback()
+            raise
+
+
 @mcp_server.tool()
 async def remove_product(product_id: int) -> Optional[Dict[str, Any]]:
     """Removes a product from the database by its ID."""
     async with database.AsyncSessionLocal() as session:
         db_product = await crud.remove_product(session, product_id=product_id)
         if db_product:
+            await cache.invalidate_on_commit(
+                session, product_ids=[db_product.id], names=[db_product.name]
+            )
             await session.commit()
             return PydanticModels.Product.model_validate(db_product).model_dump()
         return None
@@ -83,8 +206,8 @@ async def order_product(
     product_id: int, quantity: int, customer_identifier: str
 ) -> Dict[str, Any]:
     """Places an order for a product.
-    This involves checking inventory, deducting the quantity from the product's
-    inventory, and creating an order record in the database.
+    The quantity is deducted from the product's inventory only if enough is in
+    stock, in the same transaction that creates the order record.
     Raises ValueError if product not found or insufficient inventory.
     """
     order_request = PydanticModels.ProductOrderRequest(
@@ -95,16 +218,106 @@ async def order_product(
     async with database.AsyncSessionLocal() as session:
         try:
             db_order = await crud.order_product(session, order_details=order_request)
+            await cache.invalidate_on_commit(session, product_ids=[product_id])
             await session.commit()
             return PydanticModels.Order.model_validate(db_order).model_dump()
-        except ValueError:
+        except Exception:
             await session.rollback()
             raise
+
+
+@mcp_server.tool()
+async def order_products(
+    items: List[PydanticModels.OrderItem], customer_identifier: str
+) -> List[Dict[str, Any]]:
+    """Places an order for several products at once.
+    Each item names a product_id and a quantity. Either every item is ordered,
+    with one order record per product, or none is.
+    Raises ValueError if a product is not found or has insufficient inventory.
+    """
+    order_request = PydanticModels.MultiProductOrderRequest(
+        items=items, customer_identifier=customer_identifier
+    )
+    async with database.AsyncSessionLocal() as session:
+        try:
+            db_orders = await crud.order_products(session, order_details=order_request)
+            await cache.invalidate_on_commit(
+                session, product_ids=[o.product_id for o in db_orders]
+            )
+            await session.commit()
+            return [
+                PydanticModels.Order.model_validate(o).model_dump() for o in db_orders
+            ]
         except Exception:
             await session.rollback()
             raise
 
 
+@mcp_server.tool()
+async def get_order_history(
+    customer_identifier: Optional[str] = None,
+    product_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """Fetches orders newest first, one page at a time.
+    Filter by customer_identifier, product_id or both. Pass the returned
+    next_cursor with the same filters to fetch the following page; it is None
+    on the last page.
+    """
+    async with database.AsyncSessionLocal() as session:
+        orders, next_cursor = await crud.get_orders_page(
+            session,
+            customer_identifier=customer_identifier,
+            product_id=product_id,
+            cursor=cursor,
+            limit=limit,
+        )
+        return {
+            "orders": [
+                PydanticModels.Order.model_validate(o).model_dump() for o in orders
+            ],
+            "next_cursor": next_cursor,
+        }
+
+
+@mcp_server.tool()
+async def get_top_selling_products(
+    limit: int = 10, by: str = "units"
+) -> List[Dict[str, Any]]:
+    """Fetches the best selling products with their sales totals.
+    Set by to "units" to rank by units sold or "revenue" to rank by revenue.
+    """
+    async with database.AsyncSessionLocal() as session:
+        return await crud.get_top_sellers(session, by=by, limit=limit)
+
+
+@mcp_server.tool()
+async def get_low_stock_products(
+    threshold: int = 10, limit: int = 50
+) -> List[Dict[str, Any]]:
+    """Fetches products with at most threshold units in stock, fewest first."""
+    async with database.AsyncSessionLocal() as session:
+        return await crud.get_low_stock_products(
+            session, threshold=threshold, limit=limit, as_dicts=True
+        )
+
+
+@mcp_server.tool()
+async def get_revenue_by_product(
+    product_ids: Optional[List[int]] = None, limit: int = 100
+) -> List[Dict[str, Any]]:
+    """Fetches units sold, order count and revenue per product.
+    With product_ids (up to 100), returns those products in the requested
+    order, with zero totals for products never ordered. Without, returns the
+    products with the highest revenue first.
+    """
+    async with database.AsyncSessionLocal() as session:
+        if product_ids is not None:
+            return await crud.get_product_sales(session, product_ids)
+        return await crud.get_top_sellers(session, by="revenue", limit=limit)
+
+
 async def run_startup_tasks():
     print("INFO:     MCP_DBStore Server startup tasks beginning...")
     await database.create_db_and_tables()
@@ -114,6 +327,7 @@ async def run_startup_tasks():
 
 if __name__ == "__main__":
     asyncio.run(run_startup_tasks())
-    print("INFO:     Starting MCP_DBStore FastMCP server on port 8002...")
-    mcp_server.settings.port = 8002
+    port = int(os.getenv("MCP_PORT", "8002"))
+    print(f"INFO:     Starting MCP_DBStore FastMCP server on port {port}...")
+    mcp_server.settings.port = port
     mcp_server.run(transport="sse")
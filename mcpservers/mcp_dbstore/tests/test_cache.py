@@ -0,0 +1,94 @@
+import pytest
+import pytest_asyncio
+
+from .. import cache, database, store
+from ..cache import ProductCache
+
+
+@pytest_asyncio.fixture(scope="function")
+async def clean_db():
+    async with database.engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.drop_all)
+        await conn.run_sync(database.Base.metadata.create_all)
+    cache.product_cache.clear()
+    yield
+
+
+def test_product_cache_keys_and_invalidation():
+    """Test that products are reachable and invalidated by id and by name."""
+    product_cache = ProductCache(max_entries=10, ttl=60)
+    product_cache.put({"id": 1, "name": "Lamp"}, generation=0)
+
+    assert product_cache.get("id", 1) == {"id": 1, "name": "Lamp"}
+    assert product_cache.get("name", "Lamp") == {"id": 1, "name": "Lamp"}
+
+    product_cache.invalidate(names=["Lamp"])
+    assert product_cache.get("id", 1) is None
+    assert product_cache.get("name", "Lamp") is None
+
+    # A load that started before the invalidation is not stored
+    product_cache.put({"id": 1, "name": "Lamp"}, generation=0)
+    assert product_cache.get("id", 1) is None
+
+
+def test_product_cache_evicts_least_recently_used():
+    """Test that the least recently used products are evicted first."""
+    product_cache = ProductCache(max_entries=4, ttl=60)
+    product_cache.put({"id": 1, "name": "Lamp"}, generation=0)
+    product_cache.put({"id": 2, "name": "Desk"}, generation=0)
+    product_cache.get("id", 1)
+    product_cache.get("name", "Lamp")
+    product_cache.put({"id": 3, "name": "Rug"}, generation=0)
+
+    assert product_cache.get("id", 1) is not None
+    assert product_cache.get("id", 2) is None
+    assert product_cache.get("id", 3) is not None
+
+
+@pytest.mark.asyncio
+async def test_lookup_tools_are_cached_and_invalidated(clean_db):
+    """Test that lookups are served from the cache until a write commits."""
+    product = await store.add_product(name="Lamp", inventory=5, price=20.0)
+
+    assert (await store.get_product_by_id(product["id"]))["inventory"] == 5
+    hits = cache.product_cache.hits
+    assert (await store.get_product_by_name("Lamp"))["inventory"] == 5
+    assert cache.product_cache.hits == hits + 1
+
+    await store.order_product(
+        product_id=product["id"], quantity=2, customer_identifier="cust123"
+    )
+    assert (await store.get_product_by_name("Lamp"))["inventory"] == 3
+
+    with pytest.raises(ValueError):
+        await store.order_product(
+            product_id=product["id"], quantity=10, customer_identifier="cust123"
+        )
+    hits = cache.product_cache.hits
+    assert (await store.get_product_by_id(product["id"]))["inventory"] == 3
+    assert cache.product_cache.hits == hits + 1
+
+    await store.remove_product(product["id"])
+    assert await store.get_product_by_id(product["id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_tool_loads_only_uncached_products(clean_db, monkeypatch):
+    """Test that batch lookups reuse cached products and load the rest."""
+    lamp = await store.add_product(name="Lamp", inventory=5, price=20.0)
+    desk = await store.add_product(name="Desk", inventory=1, price=150.0)
+    await store.get_product_by_id(lamp["id"])
+
+    loaded = []
+    load_by_ids = store.crud.get_products_by_ids
+
+    async def counting_load(session, product_ids, as_dicts=False):
+        loaded.extend(product_ids)
+        return await load_by_ids(session, product_ids, as_dicts=as_dicts)
+
+    monkeypatch.setattr(store.crud, "get_products_by_ids", counting_load)
+    products = await store.get_products_by_ids([desk["id"], lamp["id"], 999])
+
+    assert [p["name"] for p in products] == ["Desk", "Lamp"]
+    assert loaded == [desk["id"], 999]
+    assert (await store.get_products_by_names(["Desk"]))[0]["inventory"] == 1
@@ -4,7 +4,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 # Adjust these imports based on your project structure
 from .. import crud, database
-from ..models import ProductCreate, ProductOrderRequest
+from ..models import (
+    MultiProductOrderRequest,
+    OrderItem,
+    Product,
+    ProductCreate,
+    ProductOrderRequest,
+)
 
 
 @pytest_asyncio.fixture(scope="function")  # function scope for clean DB per test
@@ -60,6 +66,46 @@ async def test_get_product_not_found(db_session: AsyncSession):
     assert retrieved_product_db is None
 
 
+@pytest.mark.asyncio
+async def test_bulk_import_products(db_session: AsyncSession):
+    """Test importing CSV and NDJSON rows with updates and rejections."""
+    await crud.add_product(
+        db_session, ProductCreate(name="Lamp", inventory=1, price=20.00)
+    )
+    await db_session.commit()
+
+    csv_lines = [
+        "name,description,inventory,price",
+        'Lamp,"Desk lamp, with\na long arm",4,22.50',
+        "Chair,,10,45.00",
+        "Table,Oak table,many,120.00",
+        "Chair,Office chair,12,49.00",
+    ]
+    result = await crud.bulk_import_products(db_session, csv_lines, format="csv")
+    await db_session.commit()
+
+    assert (result.inserted, result.updated, result.rejected) == (1, 1, 1)
+    assert result.errors[0].startswith("line 4: inventory")
+    lamp = await crud.get_product_by_name(db_session, name="Lamp")
+    await db_session.refresh(lamp)
+    assert lamp.description == "Desk lamp, with\na long arm"
+    assert lamp.inventory == 4
+    chair = await crud.get_product_by_name(db_session, name="Chair")
+    assert chair.description == "Office chair"  # The last row wins
+
+    ndjson_lines = [
+        '{"name": "Rug", "inventory": 2, "price": 80}',
+        "not json",
+        '{"name": "Chair", "inventory": 0, "price": 49}',
+    ]
+    result = await crud.bulk_import_products(db_session, ndjson_lines, format="ndjson")
+    await db_session.commit()
+
+    assert (result.inserted, result.updated, result.rejected) == (1, 1, 1)
+    with pytest.raises(ValueError, match="CSV header"):
+        await crud.bulk_import_products(db_session, ["title,price"], format="csv")
+
+
 @pytest.mark.asyncio
 async def test_order_product_successful(db_session: AsyncSession):
     """Test successfully ordering a product with sufficient inventory."""
@@ -94,9 +140,11 @@ async def test_order_product_insufficient_inventory(db_session: AsyncSession):
     )
     product_db = await crud.add_product(db_session, product=product_in)
     await db_session.commit()
+    # Rolling back expires product_db, so keep its id
+    product_id = product_db.id
 
     order_details = ProductOrderRequest(
-        product_id=product_db.id, quantity=2, customer_identifier="cust456"
+        product_id=product_id, quantity=2, customer_identifier="cust456"
     )
 
     with pytest.raises(
@@ -111,9 +159,7 @@ async def test_order_product_insufficient_inventory(db_session: AsyncSession):
     await db_session.rollback()  # Rollback any potential changes from the
     # failed order attempt
 
-    check_product_db = await crud.get_product_by_id(
-        db_session, product_id=product_db.id
-    )
+    check_product_db = await crud.get_product_by_id(db_session, product_id=product_id)
     assert check_product_db.inventory == 1  # Inventory should not have changed
 
 
@@ -127,6 +173,237 @@ async def test_order_product_not_found(db_session: AsyncSession):
         await crud.order_product(db_session, order_details=order_details)
 
 
+@pytest.mark.asyncio
+async def test_order_products(db_session: AsyncSession):
+    """Test ordering several products, with a repeated product, at once."""
+    first = await crud.add_product(
+        db_session, ProductCreate(name="Pen", inventory=5, price=1.50)
+    )
+    second = await crud.add_product(
+        db_session, ProductCreate(name="Notebook", inventory=3, price=4.00)
+    )
+    await db_session.commit()
+
+    order_details = MultiProductOrderRequest(
+        items=[
+            OrderItem(product_id=second.id, quantity=1),
+            OrderItem(product_id=first.id, quantity=2),
+            OrderItem(product_id=second.id, quantity=1),
+        ],
+        customer_identifier="cust321",
+    )
+    orders = await crud.order_products(db_session, order_details=order_details)
+    await db_session.commit()
+
+    assert [(o.product_id, o.quantity) for o in orders] == [
+        (first.id, 2),
+        (second.id, 2),
+    ]
+    assert all(o.id is not None for o in orders)
+    assert (await crud.get_product_by_id(db_session, first.id)).inventory == 3
+    assert (await crud.get_product_by_id(db_session, second.id)).inventory == 1
+
+
+@pytest.mark.asyncio
+async def test_order_products_is_all_or_nothing(db_session: AsyncSession):
+    """Test that a multi-item order reserves nothing if one item fails."""
+    first = await crud.add_product(
+        db_session, ProductCreate(name="Pen", inventory=5, price=1.50)
+    )
+    second = await crud.add_product(
+        db_session, ProductCreate(name="Notebook", inventory=1, price=4.00)
+    )
+    await db_session.commit()
+    first_id, second_id = first.id, second.id
+
+    order_details = MultiProductOrderRequest(
+        items=[
+            OrderItem(product_id=first_id, quantity=2),
+            OrderItem(product_id=second_id, quantity=2),
+        ],
+        customer_identifier="cust654",
+    )
+    with pytest.raises(ValueError, match="Insufficient inventory for product Notebook"):
+        await crud.order_products(db_session, order_details=order_details)
+    await db_session.rollback()
+
+    assert (await crud.get_product_by_id(db_session, first_id)).inventory == 5
+    assert (await crud.get_product_by_id(db_session, second_id)).inventory == 1
+
+
+@pytest.mark.asyncio
+async def test_get_orders_page(db_session: AsyncSession):
+    """Test paging through order history per customer and per product."""
+    pen = await crud.add_product(
+        db_session, ProductCreate(name="Pen", inventory=50, price=1.50)
+    )
+    ink = await crud.add_product(
+        db_session, ProductCreate(name="Ink", inventory=50, price=3.00)
+    )
+    await db_session.commit()
+    for customer, product_id in [
+        ("alice", pen.id),
+        ("bob", pen.id),
+        ("alice", ink.id),
+        ("alice", pen.id),
+    ]:
+        await crud.order_product(
+            db_session,
+            ProductOrderRequest(
+                product_id=product_id, quantity=1, customer_identifier=customer
+            ),
+        )
+    await db_session.commit()
+
+    orders, cursor = await crud.get_orders_page(
+        db_session, customer_identifier="alice", limit=2
+    )
+    assert [o.product_id for o in orders] == [pen.id, ink.id]
+    assert all(o.created_at is not None for o in orders)
+    orders, cursor = await crud.get_orders_page(
+        db_session, customer_identifier="alice", cursor=cursor, limit=2
+    )
+    assert [o.product_id for o in orders] == [pen.id]
+    assert cursor is None
+
+    orders, _ = await crud.get_orders_page(db_session, product_id=pen.id)
+    assert [o.customer_identifier for o in orders] == ["alice", "bob", "alice"]
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await crud.get_orders_page(db_session, cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_sales_totals_follow_orders(db_session: AsyncSession):
+    """Test that every order updates the sales totals the analytics read."""
+    pen = await crud.add_product(
+        db_session, ProductCreate(name="Pen", inventory=10, price=1.50)
+    )
+    lamp = await crud.add_product(
+        db_session, ProductCreate(name="Lamp", inventory=4, price=20.00)
+    )
+    rug = await crud.add_product(
+        db_session, ProductCreate(name="Rug", inventory=2, price=90.00)
+    )
+    await db_session.commit()
+    pen_id, lamp_id, rug_id = pen.id, lamp.id, rug.id
+
+    await crud.order_product(
+        db_session,
+        ProductOrderRequest(product_id=pen_id, quantity=6, customer_identifier="a"),
+    )
+    await crud.order_products(
+        db_session,
+        MultiProductOrderRequest(
+            items=[
+                OrderItem(product_id=pen_id, quantity=2),
+                OrderItem(product_id=lamp_id, quantity=1),
+            ],
+            customer_identifier="b",
+        ),
+    )
+    await db_session.commit()
+    # A failed order leaves the totals alone
+    with pytest.raises(ValueError):
+        await crud.order_products(
+            db_session,
+            MultiProductOrderRequest(
+                items=[
+                    OrderItem(product_id=lamp_id, quantity=1),
+                    OrderItem(product_id=rug_id, quantity=5),
+                ],
+                customer_identifier="c",
+            ),
+        )
+    await db_session.rollback()
+
+    by_units = await crud.get_top_sellers(db_session, by="units")
+    assert [(s["name"], s["units_sold"]) for s in by_units] == [
+        ("Pen", 8),
+        ("Lamp", 1),
+    ]
+    assert by_units[0]["order_count"] == 2
+    assert by_units[0]["revenue"] == pytest.approx(12.0)
+    by_revenue = await crud.get_top_sellers(db_session, by="revenue", limit=1)
+    assert [s["name"] for s in by_revenue] == ["Lamp"]
+    with pytest.raises(ValueError, match="Unknown ranking"):
+        await crud.get_top_sellers(db_session, by="margin")
+
+    sales = await crud.get_product_sales(db_session, [rug_id, 999, lamp_id])
+    assert [(s["name"], s["units_sold"], s["revenue"]) for s in sales] == [
+        ("Rug", 0, 0.0),
+        ("Lamp", 1, 20.0),
+    ]
+
+    low_stock = await crud.get_low_stock_products(
+        db_session, threshold=3, as_dicts=True
+    )
+    assert [(p["name"], p["inventory"]) for p in low_stock] == [
+        ("Pen", 2),
+        ("Rug", 2),
+        ("Lamp", 3),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_product_dicts_match_model_serialization(db_session: AsyncSession):
+    """Test that the column-projected rows serialize like models.Product."""
+    await crud.add_product(
+        db_session,
+        ProductCreate(name="Alpha Lamp", description="Bright", inventory=3, price=9.99),
+    )
+    await crud.add_product(
+        db_session, ProductCreate(name="Beta Lamp", inventory=0, price=120)
+    )
+    await db_session.commit()
+
+    expected = [
+        Product.model_validate(p).model_dump()
+        for p in await crud.get_products(db_session)
+    ]
+    assert await crud.get_products(db_session, as_dicts=True) == expected
+    assert list(expected[0]) == list(
+        (await crud.get_products(db_session, as_dicts=True))[0]
+    )
+
+    page, _ = await crud.get_products_page(db_session, limit=1, as_dicts=True)
+    assert page == expected[:1]
+
+    ranked = await crud.search_products_ranked(db_session, query="Lamp")
+    ranked_dicts = await crud.search_products_ranked(
+        db_session, query="Lamp", as_dicts=True
+    )
+    assert ranked_dicts == [
+        (Product.model_validate(p).model_dump(), score) for p, score in ranked
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_products_by_ids_and_names(db_session: AsyncSession):
+    """Test batch lookups keep the requested order and skip unknown products."""
+    lamp = await crud.add_product(
+        db_session, ProductCreate(name="Lamp", inventory=1, price=20.00)
+    )
+    desk = await crud.add_product(
+        db_session, ProductCreate(name="Desk", inventory=2, price=150.00)
+    )
+    await db_session.commit()
+
+    by_ids = await crud.get_products_by_ids(
+        db_session, [desk.id, 999, lamp.id, desk.id]
+    )
+    assert [p.name for p in by_ids] == ["Desk", "Lamp"]
+
+    by_names = await crud.get_products_by_names(
+        db_session, ["Lamp", "Rug", "Desk"], as_dicts=True
+    )
+    assert [p["id"] for p in by_names] == [lamp.id, desk.id]
+
+    with pytest.raises(ValueError, match="At most"):
+        await crud.get_products_by_ids(
+            db_session, list(range(crud.MAX_BATCH_LOOKUP + 1))
+        )
+
+
 @pytest.mark.asyncio
 async def test_search_products(db_session: AsyncSession):
     """Test searching for products."""
@@ -153,3 +430,92 @@ async def test_search_products(db_session: AsyncSession):
 
     results_nothing = await crud.search_products(db_session, query="XYZNoSuchProduct")
     assert len(results_nothing) == 0
+
+
+@pytest.mark.asyncio
+async def test_search_products_ranked(db_session: AsyncSession):
+    """Test that name matches rank above description matches."""
+    await crud.add_product(
+        db_session,
+        ProductCreate(
+            name="Travel Mug", description="Keeps coffee hot", inventory=3, price=9.5
+        ),
+    )
+    await crud.add_product(
+        db_session,
+        ProductCreate(name="Coffee Grinder", inventory=7, price=49.0),
+    )
+    await db_session.commit()
+
+    ranked = await crud.search_products_ranked(db_session, query="coffee")
+    assert [product.name for product, _ in ranked] == ["Coffee Grinder", "Travel Mug"]
+    assert ranked[0][1] > ranked[1][1]
+
+    second_page = await crud.search_products_ranked(
+        db_session, query="coffee", skip=1, limit=1
+    )
+    assert [product.name for product, _ in second_page] == ["Travel Mug"]
+
+
+@pytest.mark.asyncio
+async def test_get_products_page(db_session: AsyncSession):
+    """Test walking the catalog with keyset cursors."""
+    for i in range(5):
+        await crud.add_product(
+            db_session, ProductCreate(name=f"Item {i}", inventory=1, price=1.0)
+        )
+    await db_session.commit()
+
+    names, cursor = [], None
+    while True:
+        page, cursor = await crud.get_products_page(db_session, cursor=cursor, limit=2)
+        names.extend(product.name for product in page)
+        if cursor is None:
+            break
+    assert names == [f"Item {i}" for i in range(5)]
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await crud.get_products_page(db_session, cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_search_products_page(db_session: AsyncSession):
+    """Test that search cursors follow the (score, id) order."""
+    for name, description in [
+        ("Lamp", "Desk lamp with a solar panel"),
+        ("Solar Charger", None),
+        ("Solar Lantern", None),
+        ("Tent", "Fits a solar shower"),
+    ]:
+        await crud.add_product(
+            db_session,
+            ProductCreate(name=name, description=description, inventory=1, price=1.0),
+        )
+    await db_session.commit()
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = await crud.search_products_page(
+            db_session, query="solar", cursor=cursor, limit=3
+        )
+        pages.append([product.name for product, _ in page])
+        if cursor is None:
+            break
+    assert pages == [["Solar Charger", "Solar Lantern", "Lamp"], ["Tent"]]
+
+
+@pytest.mark.parametrize("limit", [0, -1, crud.MAX_PAGE_LIMIT + 1])
+@pytest.mark.asyncio
+async def test_page_limit_is_validated(db_session: AsyncSession, limit: int):
+    """Test that paged queries reject limits outside 1..MAX_PAGE_LIMIT."""
+    await crud.add_product(
+        db_session, ProductCreate(name="Item", inventory=1, price=1.0)
+    )
+    await db_session.commit()
+
+    with pytest.raises(ValueError, match="limit must be between"):
+        await crud.get_products_page(db_session, limit=limit)
+    with pytest.raises(ValueError, match="limit must be between"):
+        await crud.search_products_page(db_session, query="Item", limit=limit)
+    with pytest.raises(ValueError, match="limit must be between"):
+        await crud.get_orders_page(db_session, limit=limit)
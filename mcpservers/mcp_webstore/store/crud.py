@@ -1,4 +1,33 @@
-from sqlalchemy import or_, select
+import base64
+import csv
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+from pydantic import ValidationError
+from sqlalchemy import (
+    ARRAY,
+    Float,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    and_,
+    any_,
+    case,
+    cast,
+    column,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import database, models
@@ -18,6 +47,58 @@ async def get_product_by_name(db: AsyncSession, name: str) -> models.Product | N
     return result.scalars().first()
 
 
+# Most products one batch lookup may ask for
+MAX_BATCH_LOOKUP = 100
+
+
+def _matches_any(column_, values: list, item_type):
+    """column = ANY(:values) with a single array parameter on Postgres."""
+    if database.engine.dialect.name == "postgresql":
+        return column_ == any_(literal(values, ARRAY(item_type)))
+    return column_.in_(values)
+
+
+async def _get_products_by(
+    db: AsyncSession, field: str, values: list, item_type
+) -> list[models.Product]:
+    values = list(dict.fromkeys(values))
+    if len(values) > MAX_BATCH_LOOKUP:
+        raise ValueError(
+            f"At most {MAX_BATCH_LOOKUP} products can be looked up at once"
+        )
+    if not values:
+        return []
+    column_ = getattr(database.ProductDB, field)
+    result = await db.execute(
+        select(database.ProductDB).filter(_matches_any(column_, values, item_type))
+    )
+    key = {getattr(product, field): product for product in result.scalars().all()}
+    return [key[value] for value in values if value in key]
+
+
+async def get_products_by_ids(
+    db: AsyncSession, product_ids: list[int]
+) -> list[models.Product]:
+    """Fetch the products with the given ids in one query.
+
+    Products come back in the order of product_ids, once each; ids that
+    don't exist are skipped.
+
+    Raises ValueError for more than MAX_BATCH_LOOKUP ids.
+    """
+    return await _get_products_by(db, "id", product_ids, Integer)
+
+
+async def get_products_by_names(
+    db: AsyncSession, names: list[str]
+) -> list[models.Product]:
+    """Fetch the products with the given names in one query.
+
+    Works like get_products_by_ids.
+    """
+    return await _get_products_by(db, "name", names, String)
+
+
 async def get_products(
     db: AsyncSession, skip: int = 0, limit: int = 100
 ) -> list[models.Product]:
@@ -43,6 +124,101 @@ async def search_products(
     return result.scalars().all()
 
 
+def encode_cursor(values: dict) -> str:
+    """Encode keyset values as an opaque, URL-safe cursor."""
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, **fields: type) -> dict:
+    """Decode a cursor made by encode_cursor and check its field types.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, dict) or not all(
+        isinstance(values.get(name), kind) for name, kind in fields.items()
+    ):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+# Largest page one paged query may ask for
+MAX_PAGE_LIMIT = 1000
+
+
+def check_page_limit(limit: int) -> None:
+    """Raise ValueError unless limit is between 1 and MAX_PAGE_LIMIT."""
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}, got {limit}")
+
+
+async def get_products_page(
+    db: AsyncSession, cursor: str | None = None, limit: int = 100
+) -> tuple[list[models.Product], str | None]:
+    """Fetch products ordered by id, continuing after cursor.
+
+    Returns the products and the cursor of the next page, or None on the
+    last page.
+    """
+    check_page_limit(limit)
+    statement = select(database.ProductDB).order_by(database.ProductDB.id)
+    if cursor is not None:
+        after = decode_cursor(cursor, id=int)
+        statement = statement.filter(database.ProductDB.id > after["id"])
+    result = await db.execute(statement.limit(limit + 1))
+    products = list(result.scalars().all())
+
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor({"id": products[-1].id})
+    return products, next_cursor
+
+
+async def search_products_page(
+    db: AsyncSession, query: str, cursor: str | None = None, limit: int = 100
+) -> tuple[list[models.Product], str | None]:
+    """Search products, continuing after cursor.
+
+    Name matches rank above description-only matches; pages are ordered by
+    (rank descending, id).
+
+    Returns the products and the cursor of the next page, or None on the
+    last page.
+    """
+    check_page_limit(limit)
+    search_term = f"%{query}%"
+    name_match = database.ProductDB.name.ilike(search_term)
+    rank = case((name_match, 1), else_=0)
+    statement = select(database.ProductDB, rank).filter(
+        or_(name_match, database.ProductDB.description.ilike(search_term))
+    )
+    if cursor is not None:
+        after = decode_cursor(cursor, rank=int, id=int)
+        statement = statement.filter(
+            or_(
+                rank < after["rank"],
+                and_(rank == after["rank"], database.ProductDB.id > after["id"]),
+            )
+        )
+    result = await db.execute(
+        statement.order_by(rank.desc(), database.ProductDB.id).limit(limit + 1)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_product, last_rank = rows[-1]
+        next_cursor = encode_cursor({"rank": last_rank, "id": last_product.id})
+    return [product for product, _ in rows], next_cursor
+
+
 async def add_product(
     db: AsyncSession, product: models.ProductCreate
 ) -> models.Product:
@@ -54,6 +230,206 @@ async def add_product(
     return db_product
 
 
+# Rows staged per COPY (or batched INSERT) during a bulk import
+IMPORT_BATCH_SIZE = 5000
+# Rejected rows beyond this many are counted but not described
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_FIELDS = ("name", "description", "inventory", "price")
+
+# Temporary, so concurrent imports on other connections don't see each other
+IMPORT_STAGING_DDL = (
+    "CREATE TEMPORARY TABLE IF NOT EXISTS product_import ("
+    "line integer, name text, description text, inventory integer, "
+    "price numeric(10, 2))"
+)
+import_staging = table(
+    "product_import",
+    column("line", Integer),
+    column("name", Text),
+    column("description", Text),
+    column("inventory", Integer),
+    column("price", Numeric(10, 2)),
+)
+# The last row wins when an import repeats a name
+IMPORT_LATEST_ROWS = (
+    "product_import.line IN (SELECT max(line) FROM product_import GROUP BY name)"
+)
+IMPORT_COUNT_SQL = (
+    "SELECT count(*), count(products.id) FROM product_import "
+    "LEFT JOIN products ON products.name = product_import.name "
+    f"WHERE {IMPORT_LATEST_ROWS}"
+)
+IMPORT_UPSERT_SQL = (
+    "INSERT INTO products (name, description, inventory, price) "
+    "SELECT name, description, inventory, price FROM product_import "
+    f"WHERE {IMPORT_LATEST_ROWS} "
+    "ON CONFLICT (name) DO UPDATE SET description = excluded.description, "
+    "inventory = excluded.inventory, price = excluded.price"
+)
+
+
+async def _iterate(lines: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    if isinstance(lines, AsyncIterable):
+        async for line in lines:
+            yield line
+    else:
+        for line in lines:
+            yield line
+
+
+async def _csv_records(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield (line number, fields, error) for CSV text with a header row.
+
+    A record continues on the next line while one of its quotes is open.
+    """
+    header = None
+    pending: list[str] = []
+    number = start = 0
+    async for line in lines:
+        number += 1
+        if not pending:
+            start = number
+        pending.append(line)
+        record = "\n".join(pending)
+        if record.count('"') % 2:
+            continue
+        pending = []
+        if not record.strip():
+            continue
+        try:
+            values = next(csv.reader([record]))
+        except csv.Error as e:
+            yield start, None, str(e)
+            continue
+
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            if not {"name", "inventory", "price"} <= set(header):
+                raise ValueError(
+                    "CSV header must include name, inventory and price columns"
+                )
+            continue
+        if len(values) != len(header):
+            yield start, None, f"expected {len(header)} fields, got {len(values)}"
+            continue
+        row = dict(zip(header, values))
+        fields = {name: row[name] for name in IMPORT_FIELDS if name in row}
+        if not fields.get("description"):
+            fields["description"] = None
+        yield start, fields, None
+    if pending:
+        yield start, None, "unterminated quoted field"
+
+
+async def _ndjson_records(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield (line number, fields, error) for NDJSON text, one object per line."""
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(fields, dict):
+            yield number, None, "expected a JSON object"
+            continue
+        yield number, fields, None
+
+
+_RECORD_PARSERS = {"csv": _csv_records, "ndjson": _ndjson_records}
+
+
+def _validate_import_row(fields: dict) -> tuple[models.ProductCreate | None, str]:
+    try:
+        product = models.ProductCreate.model_validate(fields)
+    except ValidationError as e:
+        error = e.errors()[0]
+        location = ".".join(str(part) for part in error["loc"])
+        return None, f"{location}: {error['msg']}"
+    if not product.name.strip():
+        return None, "name: must not be empty"
+    return product, ""
+
+
+async def _stage_products(db: AsyncSession, rows: list[tuple]) -> None:
+    """Load (line, name, description, inventory, price) rows into staging."""
+    connection = await db.connection()
+    if connection.dialect.driver == "asyncpg":
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "product_import", records=rows, columns=("line", *IMPORT_FIELDS)
+        )
+        return
+    await db.execute(
+        insert(import_staging),
+        [dict(zip(("line", *IMPORT_FIELDS), row)) for row in rows],
+    )
+
+
+async def bulk_import_products(
+    db: AsyncSession,
+    lines: Iterable[str] | AsyncIterable[str],
+    format: str = "csv",
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> models.BulkImportResult:
+    """Insert or update products, matched by name, from CSV or NDJSON lines.
+
+    Valid rows are staged in a temporary table in batches, with COPY on
+    asyncpg and batched INSERTs otherwise, then merged into products with
+    one upsert. Invalid rows are rejected without failing the import. CSV
+    needs a header row naming the name, inventory and price columns, and
+    optionally description. The caller commits.
+
+    Raises ValueError for an unknown format or a CSV header that lacks a
+    required column.
+    """
+    if format not in _RECORD_PARSERS:
+        raise ValueError(f"Unsupported import format {format!r}")
+    result = models.BulkImportResult()
+
+    await db.execute(text(IMPORT_STAGING_DDL))
+    await db.execute(text("DELETE FROM product_import"))
+    batch: list[tuple] = []
+    async for number, fields, error in _RECORD_PARSERS[format](_iterate(lines)):
+        product = None
+        if fields is not None:
+            product, error = _validate_import_row(fields)
+        if product is None:
+            result.rejected += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(f"line {number}: {error}")
+            continue
+        batch.append(
+            (
+                number,
+                product.name,
+                product.description,
+                product.inventory,
+                Decimal(str(product.price)),
+            )
+        )
+        if len(batch) >= batch_size:
+            await _stage_products(db, batch)
+            batch = []
+    if batch:
+        await _stage_products(db, batch)
+
+    staged, existing = (await db.execute(text(IMPORT_COUNT_SQL))).one()
+    await db.execute(text(IMPORT_UPSERT_SQL))
+    await db.execute(text("DROP TABLE product_import"))
+    result.inserted = staged - existing
+    result.updated = existing
+    return result
+
+
 async def remove_product(db: AsyncSession, product_id: int) -> models.Product | None:
     db_product = await get_product_by_id(
         db, product_id
@@ -79,37 +455,212 @@ async def remove_product(db: AsyncSession, product_id: int) -> models.Product |
     return None
 
 
+def _upsert(table_):
+    """INSERT for the engine's dialect, which supports ON CONFLICT."""
+    if database.engine.dialect.name == "postgresql":
+        return postgresql.insert(table_)
+    return sqlite.insert(table_)
+
+
+async def _record_sale(
+    db: AsyncSession,
+    product_id: int,
+    quantity: int,
+    price: Decimal,
+    ordered_at: datetime,
+) -> None:
+    """Add an ordered quantity to the product's product_sales totals.
+
+    Runs in the order's transaction, so the totals commit or roll back with
+    the order.
+    """
+    sales_table = database.ProductSalesDB.__table__
+    statement = _upsert(sales_table).values(
+        product_id=product_id,
+        units_sold=quantity,
+        order_count=1,
+        revenue=price * quantity,
+        last_ordered_at=ordered_at,
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[sales_table.c.product_id],
+            set_={
+                "units_sold": sales_table.c.units_sold + statement.excluded.units_sold,
+                "order_count": sales_table.c.order_count + 1,
+                "revenue": sales_table.c.revenue + statement.excluded.revenue,
+                "last_ordered_at": statement.excluded.last_ordered_at,
+            },
+        )
+    )
+
+
 async def order_product(
     db: AsyncSession, order_details: models.ProductOrderRequest
 ) -> models.Order:
+    """Place an order, deducting its quantity from the product's inventory.
+
+    The conditional UPDATE checks and deducts in one statement and locks the
+    product row until the transaction ends, so concurrent orders can't
+    oversell. The product's sales totals are updated in the same
+    transaction.
+    """
+    if order_details.quantity <= 0:
+        raise ValueError(
+            f"Quantity must be positive. Requested: {order_details.quantity}"
+        )
     result = await db.execute(
-        select(database.ProductDB).filter(
-            database.ProductDB.id == order_details.product_id
+        update(database.ProductDB)
+        .where(
+            database.ProductDB.id == order_details.product_id,
+            database.ProductDB.inventory >= order_details.quantity,
         )
+        .values(inventory=database.ProductDB.inventory - order_details.quantity)
+        .returning(database.ProductDB.price)
     )
-    db_product = result.scalars().first()
-
-    if not db_product:
-        raise ValueError(f"Product with id {order_details.product_id} not found.")
-
-    if db_product.inventory < order_details.quantity:
+    price = result.scalar()
+    if price is None:
+        # Only failed orders pay for a second query, to word the error
+        db_product = await get_product_by_id(db, order_details.product_id)
+        if not db_product:
+            raise ValueError(f"Product with id {order_details.product_id} not found.")
         raise ValueError(
-            f"Not enough inventory for product '{db_product.name}'. "
+            f"Insufficient inventory for product {db_product.name}. "
             f"Available: {db_product.inventory}, "
             f"Requested: {order_details.quantity}"
         )
 
-    db_product.inventory -= order_details.quantity
+    ordered_at = database.utcnow()
+    result = await db.execute(
+        insert(database.OrderDB)
+        .values(
+            product_id=order_details.product_id,
+            quantity=order_details.quantity,
+            customer_identifier=order_details.customer_identifier,
+            created_at=ordered_at,
+        )
+        .returning(database.OrderDB)
+    )
+    db_order = result.scalars().one()
+    await _record_sale(
+        db, order_details.product_id, order_details.quantity, price, ordered_at
+    )
+    return db_order
+
+
+async def get_orders_page(
+    db: AsyncSession,
+    customer_identifier: str | None = None,
+    product_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> tuple[list[models.Order], str | None]:
+    """Fetch orders newest first, optionally of one customer or product.
+
+    Pages continue after cursor like get_products_page. Filtered pages are
+    served from the (customer_identifier, id) and (product_id, id) indexes.
+    """
+    check_page_limit(limit)
+    statement = select(database.OrderDB).order_by(database.OrderDB.id.desc())
+    if customer_identifier is not None:
+        statement = statement.filter(
+            database.OrderDB.customer_identifier == customer_identifier
+        )
+    if product_id is not None:
+        statement = statement.filter(database.OrderDB.product_id == product_id)
+    if cursor is not None:
+        after = decode_cursor(cursor, id=int)
+        statement = statement.filter(database.OrderDB.id < after["id"])
+    result = await db.execute(statement.limit(limit + 1))
+    orders = list(result.scalars().all())
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor({"id": orders[-1].id})
+    return orders, next_cursor
+
+
+SALES_COLUMNS = (
+    database.ProductDB.id.label("product_id"),
+    database.ProductDB.name,
+    func.coalesce(database.ProductSalesDB.units_sold, 0).label("units_sold"),
+    func.coalesce(database.ProductSalesDB.order_count, 0).label("order_count"),
+    cast(func.coalesce(database.ProductSalesDB.revenue, 0), Float).label("revenue"),
+    database.ProductSalesDB.last_ordered_at,
+)
+_SALES_RANKINGS = {
+    "units": database.ProductSalesDB.units_sold,
+    "revenue": database.ProductSalesDB.revenue,
+}
 
-    db_order = database.OrderDB(
-        product_id=order_details.product_id,
-        quantity=order_details.quantity,
-        customer_identifier=order_details.customer_identifier,
+
+async def get_top_sellers(
+    db: AsyncSession, by: str = "units", limit: int = 10
+) -> list[models.ProductSales]:
+    """Fetch the best selling products, by units sold or by revenue.
+
+    Served from the product_sales totals and their index, so the cost
+    doesn't depend on the number of orders. Raises ValueError for an
+    unknown ranking.
+    """
+    ranking = _SALES_RANKINGS.get(by)
+    if ranking is None:
+        raise ValueError(f"Unknown ranking: {by}. Use one of: units, revenue")
+    result = await db.execute(
+        select(*SALES_COLUMNS)
+        .join(
+            database.ProductDB,
+            database.ProductDB.id == database.ProductSalesDB.product_id,
+        )
+        .order_by(ranking.desc(), database.ProductSalesDB.product_id)
+        .limit(limit)
     )
-    db.add(db_order)
-    db.add(db_product)  # Add updated product back to session to track inventory change
+    return [models.ProductSales.model_validate(row) for row in result.mappings()]
 
-    await db.flush()
-    await db.refresh(db_order)
-    await db.refresh(db_product)
-    return db_order
+
+async def get_product_sales(
+    db: AsyncSession, product_ids: list[int]
+) -> list[models.ProductSales]:
+    """Fetch the sales totals of the given products in one query.
+
+    Products come back in the order of product_ids; products never ordered
+    have zero totals and ids that don't exist are skipped. Raises
+    ValueError for more than MAX_BATCH_LOOKUP ids.
+    """
+    product_ids = list(dict.fromkeys(product_ids))
+    if len(product_ids) > MAX_BATCH_LOOKUP:
+        raise ValueError(
+            f"At most {MAX_BATCH_LOOKUP} products can be looked up at once"
+        )
+    if not product_ids:
+        return []
+    result = await db.execute(
+        select(*SALES_COLUMNS)
+        .outerjoin(
+            database.ProductSalesDB,
+            database.ProductSalesDB.product_id == database.ProductDB.id,
+        )
+        .filter(_matches_any(database.ProductDB.id, product_ids, Integer))
+    )
+    sales = {
+        row["product_id"]: models.ProductSales.model_validate(row)
+        for row in result.mappings()
+    }
+    return [sales[product_id] for product_id in product_ids if product_id in sales]
+
+
+async def get_low_stock_products(
+    db: AsyncSession, threshold: int = 10, limit: int = 50
+) -> list[models.Product]:
+    """Fetch products with at most threshold units in stock, fewest first.
+
+    Served from the index on products.inventory.
+    """
+    result = await db.execute(
+        select(database.ProductDB)
+        .filter(database.ProductDB.inventory <= threshold)
+        .order_by(database.ProductDB.inventory, database.ProductDB.id)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
@@ -1,8 +1,9 @@
+import codecs
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator as TypingAsyncGenerator  # Renamed to avoid clash
-from typing import List
+from typing import AsyncIterator, List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession  # Import AsyncSession for type hinting
 
 from . import crud, database, models
@@ -44,6 +45,25 @@ async def read_products(
     return products
 
 
+@app.get(
+    "/products/page",
+    response_model=models.ProductPage,
+    summary="Get a page of products, ordered by ID",
+)
+async def read_products_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=crud.MAX_PAGE_LIMIT),
+    db: AsyncSession = Depends(database.get_db),
+):
+    try:
+        products, next_cursor = await crud.get_products_page(
+            db, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return models.ProductPage(products=products, next_cursor=next_cursor)
+
+
 @app.post("/products/", response_model=models.Product, summary="Add a new product")
 async def create_product(
     product: models.ProductCreate, db: AsyncSession = Depends(database.get_db)
@@ -52,6 +72,38 @@ async def create_product(
     return await crud.add_product(db=db, product=product)
 
 
+def _parse_ids(values: List[str]) -> List[int]:
+    """Read ids passed repeated or comma-separated."""
+    try:
+        return [int(i) for value in values for i in value.split(",") if i]
+    except ValueError:
+        raise ValueError("ids must be integers")
+
+
+@app.get(
+    "/products/batch",
+    response_model=List[models.Product],
+    summary="Get several products by ID or by name",
+)
+async def read_products_batch(
+    ids: Optional[List[str]] = Query(None),
+    names: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(database.get_db),
+):
+    """
+    Pass either ids (repeated or comma-separated) or names (repeated).
+    Products come back in the requested order; unknown ones are left out.
+    """
+    if (ids is None) == (names is None):
+        raise HTTPException(status_code=400, detail="Pass either ids or names")
+    try:
+        if ids is None:
+            return await crud.get_products_by_names(db, names)
+        return await crud.get_products_by_ids(db, _parse_ids(ids))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get(
     "/products/id/{product_id}",
     response_model=models.Product,
@@ -99,6 +151,61 @@ async def search_products_endpoint(
     return products
 
 
+@app.get(
+    "/products/search/page",
+    response_model=models.ProductPage,
+    summary="Search for products, one page at a time",
+)
+async def search_products_page_endpoint(
+    query: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=crud.MAX_PAGE_LIMIT),
+    db: AsyncSession = Depends(database.get_db),
+):
+    try:
+        products, next_cursor = await crud.search_products_page(
+            db, query=query, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return models.ProductPage(products=products, next_cursor=next_cursor)
+
+
+async def _body_lines(request: Request) -> AsyncIterator[str]:
+    """Split the streamed request body into lines as chunks arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+@app.post(
+    "/products/bulk",
+    response_model=models.BulkImportResult,
+    summary="Add or update products in bulk from a CSV or NDJSON body",
+)
+async def bulk_import_products_endpoint(
+    request: Request,
+    format: str = "csv",
+    db: AsyncSession = Depends(database.get_db),
+):
+    """
+    Stream CSV (with a name, description, inventory, price header) or NDJSON
+    in the request body. Products are matched by name; invalid rows are
+    rejected and reported without failing the import.
+    """
+    try:
+        return await crud.bulk_import_products(db, _body_lines(request), format=format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.delete(
     "/products/{product_id}",
     response_model=models.Product,
@@ -130,5 +237,82 @@ async def create_order(
         )
 
 
+@app.get(
+    "/orders/",
+    response_model=models.OrderPage,
+    summary="Get orders newest first, one page at a time",
+)
+async def read_orders(
+    customer_identifier: Optional[str] = None,
+    product_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=crud.MAX_PAGE_LIMIT),
+    db: AsyncSession = Depends(database.get_db),
+):
+    """
+    Filter by customer_identifier, product_id or both. Pass next_cursor back
+    with the same filters to fetch the following page.
+    """
+    try:
+        orders, next_cursor = await crud.get_orders_page(
+            db,
+            customer_identifier=customer_identifier,
+            product_id=product_id,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return models.OrderPage(orders=orders, next_cursor=next_cursor)
+
+
+@app.get(
+    "/analytics/top-sellers",
+    response_model=List[models.ProductSales],
+    summary="Get the best selling products, by units sold or revenue",
+)
+async def read_top_sellers(
+    by: str = "units", limit: int = 10, db: AsyncSession = Depends(database.get_db)
+):
+    try:
+        return await crud.get_top_sellers(db, by=by, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get(
+    "/analytics/low-stock",
+    response_model=List[models.Product],
+    summary="Get products with at most threshold units in stock",
+)
+async def read_low_stock(
+    threshold: int = 10, limit: int = 50, db: AsyncSession = Depends(database.get_db)
+):
+    return await crud.get_low_stock_products(db, threshold=threshold, limit=limit)
+
+
+@app.get(
+    "/analytics/revenue",
+    response_model=List[models.ProductSales],
+    summary="Get units sold and revenue per product",
+)
+async def read_revenue(
+    ids: Optional[List[str]] = Query(None),
+    limit: int = 100,
+    db: AsyncSession = Depends(database.get_db),
+):
+    """
+    With ids (repeated or comma-separated), returns those products in the
+    requested order, including ones never ordered. Without, returns the
+    products with the highest revenue first.
+    """
+    try:
+        if ids is None:
+            return await crud.get_top_sellers(db, by="revenue", limit=limit)
+        return await crud.get_product_sales(db, _parse_ids(ids))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # To run this app (for local development):
 # uvicorn appservers.store.main:app --reload --port 8001
@@ -1,4 +1,5 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -21,6 +22,18 @@ class Product(ProductBase):
         from_attributes = True
 
 
+class ProductPage(BaseModel):
+    products: List[Product]
+    next_cursor: Optional[str] = None
+
+
+class BulkImportResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    errors: List[str] = []
+
+
 class OrderBase(BaseModel):
     product_id: int
     quantity: int
@@ -33,6 +46,7 @@ class OrderCreate(OrderBase):
 
 class Order(OrderBase):
     id: int
+    created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -42,3 +56,17 @@ class ProductOrderRequest(BaseModel):
     product_id: int
     quantity: int
     customer_identifier: str
+
+
+class OrderPage(BaseModel):
+    orders: List[Order]
+    next_cursor: Optional[str] = None
+
+
+class ProductSales(BaseModel):
+    product_id: int
+    name: str
+    units_sold: int
+    order_count: int
+    revenue: float
+    last_ordered_at: Optional[datetime] = None
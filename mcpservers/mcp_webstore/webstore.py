@@ -1,20 +1,97 @@
+"""
+MCP server exposing the Store Server REST API as tools.
+
+Requests go through one pooled httpx client, created when the first client
+session starts and closed when the last one ends. Identical GET tool calls
+that arrive together share one Store Server request, and GET responses are
+reused for STORE_GET_CACHE_TTL_SECONDS; writes made through this server
+drop the cached responses.
+
+Environment variables:
+- STORE_SERVER_URL: Base URL of the Store Server
+- STORE_HTTP_MAX_CONNECTIONS / STORE_HTTP_MAX_KEEPALIVE: Connection pool limits
+- STORE_HTTP_TIMEOUT_SECONDS: Read, write and pool timeout of requests
+- STORE_HTTP_CONNECT_TIMEOUT_SECONDS: Timeout for opening a connection
+- STORE_HTTP_IMPORT_TIMEOUT_SECONDS: Timeout of bulk imports
+- STORE_GET_CACHE_TTL_SECONDS: Lifetime of cached GET responses (0 disables)
+- STORE_GET_CACHE_MAX_ENTRIES: GET responses kept
+- MCP_PORT: Port of the SSE server (default 8001)
+"""
+
+import asyncio
 import os
-from typing import Any, Dict, List, Optional
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional
 
 import httpx
 from mcp.server.fastmcp import FastMCP
 
-# Initialize FastMCP
-mcp_server = FastMCP()
+STORE_SERVER_URL = os.getenv("STORE_SERVER_URL", "http://localhost:8001")
+STORE_HTTP_MAX_CONNECTIONS = int(os.getenv("STORE_HTTP_MAX_CONNECTIONS", "100"))
+STORE_HTTP_MAX_KEEPALIVE = int(os.getenv("STORE_HTTP_MAX_KEEPALIVE", "20"))
+STORE_HTTP_TIMEOUT_SECONDS = float(os.getenv("STORE_HTTP_TIMEOUT_SECONDS", "10"))
+STORE_HTTP_CONNECT_TIMEOUT_SECONDS = float(
+    os.getenv("STORE_HTTP_CONNECT_TIMEOUT_SECONDS", "5")
+)
+STORE_HTTP_IMPORT_TIMEOUT_SECONDS = float(
+    os.getenv("STORE_HTTP_IMPORT_TIMEOUT_SECONDS", "300")
+)
+STORE_GET_CACHE_TTL_SECONDS = float(os.getenv("STORE_GET_CACHE_TTL_SECONDS", "2"))
+STORE_GET_CACHE_MAX_ENTRIES = int(os.getenv("STORE_GET_CACHE_MAX_ENTRIES", "1000"))
 
-# Initialize FastMCP in japanese
-# エムシーピーサーバー = ファストエムシーピー()
 
-STORE_SERVER_URL = os.getenv("STORE_SERVER_URL", "http://localhost:8001")
+class StoreAPIError(ValueError):
+    """A Store Server request failed.
 
-# HTTP client (using httpx)
-# TODO: It's good practice to use a client instance for connection pooling, etc.
-async_client = httpx.AsyncClient(base_url=STORE_SERVER_URL)
+    status_code is the HTTP status of the response, or None if the Store
+    Server could not be reached.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+_client: Optional[httpx.AsyncClient] = None
+_client_users = 0
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it if needed."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=STORE_SERVER_URL,
+            limits=httpx.Limits(
+                max_connections=STORE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=STORE_HTTP_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(
+                STORE_HTTP_TIMEOUT_SECONDS,
+                connect=STORE_HTTP_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+    return _client
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Runs around every client session; the last one closes the HTTP client."""
+    global _client, _client_users
+    _client_users += 1
+    get_client()
+    try:
+        yield
+    finally:
+        _client_users -= 1
+        if _client_users == 0 and _client is not None:
+            client, _client = _client, None
+            await client.aclose()
+
+
+mcp_server = FastMCP(lifespan=lifespan)
 
 
 async def make_api_request(
@@ -22,48 +99,109 @@ async def make_api_request(
     endpoint: str,
     params: Optional[Dict] = None,
     json_data: Optional[Dict] = None,
-) -> Dict[str, Any]:
-    """Helper function to make API requests to the Store Server."""
+    content: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Any = httpx.USE_CLIENT_DEFAULT,
+) -> Any:
+    """Helper function to make API requests to the Store Server.
+
+    Raises StoreAPIError with the response status if the request fails.
+    """
     try:
-        response = await async_client.request(
-            method, endpoint, params=params, json=json_data
-        )
-        response.raise_for_status()  # Raise an exception for bad status codes
-        # (4xx or 5xx)
-        return response.json()
-    except httpx.HTTPStatusError as e:
-        # Attempt to get more details from the response body if available
-        error_detail = (
-            e.response.json().get("detail", e.response.text)
-            if e.response.content
-            else str(e)
+        response = await get_client().request(
+            method,
+            endpoint,
+            params=params,
+            json=json_data,
+            content=content,
+            headers=headers,
+            timeout=timeout,
         )
-        raise ValueError(
-            f"API Error: {e.response.status_code} - {error_detail} when calling "
-            f"{e.request.method} {e.request.url}"
-        ) from e
     except httpx.RequestError as e:
-        raise ValueError(
+        raise StoreAPIError(
             f"Request Error: Could not connect to Store Server at "
             f"{e.request.url}. Details: {str(e)}"
         ) from e
 
+    if response.is_error:
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        detail = body.get("detail") if isinstance(body, dict) else None
+        raise StoreAPIError(
+            f"API Error: {response.status_code} - {detail or response.text} "
+            f"when calling {method} {response.request.url}",
+            status_code=response.status_code,
+        )
+    return response.json()
+
+
+_get_cache: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+_get_flights: Dict[Hashable, asyncio.Task] = {}
+# Bumped by writes, so responses fetched before a write aren't cached
+_get_generation = 0
+
+
+async def cached_get(endpoint: str, params: Optional[Dict] = None) -> Any:
+    """GET a Store Server resource, sharing identical concurrent requests.
+
+    Successful responses are reused for STORE_GET_CACHE_TTL_SECONDS. A caller
+    that is cancelled doesn't cancel the request the others are waiting for.
+    """
+    key = (
+        endpoint,
+        tuple(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in sorted((params or {}).items())
+        ),
+    )
+    entry = _get_cache.get(key)
+    if entry is not None:
+        if entry[0] > time.monotonic():
+            return entry[1]
+        del _get_cache[key]
+
+    flight = _get_flights.get(key)
+    if flight is None:
+        generation = _get_generation
+        flight = asyncio.ensure_future(make_api_request("GET", endpoint, params))
+
+        def done(task: asyncio.Task) -> None:
+            _get_flights.pop(key, None)
+            if task.cancelled() or task.exception() is not None:
+                return
+            if STORE_GET_CACHE_TTL_SECONDS > 0 and generation == _get_generation:
+                expires = time.monotonic() + STORE_GET_CACHE_TTL_SECONDS
+                _get_cache[key] = (expires, task.result())
+                while len(_get_cache) > STORE_GET_CACHE_MAX_ENTRIES:
+                    _get_cache.popitem(last=False)
+
+        flight.add_done_callback(done)
+        _get_flights[key] = flight
+    return await asyncio.shield(flight)
+
+
+def invalidate_get_cache() -> None:
+    """Drop cached GET responses after a write."""
+    global _get_generation
+    _get_generation += 1
+    _get_cache.clear()
+
 
 @mcp_server.tool()
 async def get_products(skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
     """Fetches a list of all products from the Store Server API."""
-    return await make_api_request(
-        "GET", "/products/", params={"skip": skip, "limit": limit}
-    )
+    return await cached_get("/products/", params={"skip": skip, "limit": limit})
 
 
 @mcp_server.tool()
 async def get_product_by_id(product_id: int) -> Optional[Dict[str, Any]]:
     """Fetches a single product by its ID from the Store Server API."""
     try:
-        return await make_api_request("GET", f"/products/id/{product_id}")
-    except ValueError as e:
-        if "404" in str(e):  # crude check for 404
+        return await cached_get(f"/products/id/{product_id}")
+    except StoreAPIError as e:
+        if e.status_code == 404:
             return None  # Product not found
         raise
 
@@ -72,48 +210,124 @@ async def get_product_by_id(product_id: int) -> Optional[Dict[str, Any]]:
 async def get_product_by_name(name: str) -> Optional[Dict[str, Any]]:
     """Fetches a single product by its name from the Store Server API."""
     try:
-        return await make_api_request("GET", f"/products/name/{name}")
-    except ValueError as e:
-        if "404" in str(e):
+        return await cached_get(f"/products/name/{name}")
+    except StoreAPIError as e:
+        if e.status_code == 404:
             return None  # Product not found
         raise
 
 
+@mcp_server.tool()
+async def get_products_by_ids(product_ids: List[int]) -> List[Dict[str, Any]]:
+    """Fetches several products by their IDs at once from the Store Server API.
+    Products come back in the requested order; IDs that don't exist are left
+    out. Up to 100 IDs per call.
+    """
+    if not product_ids:
+        return []
+    return await cached_get("/products/batch", params={"ids": product_ids})
+
+
+@mcp_server.tool()
+async def get_products_by_names(names: List[str]) -> List[Dict[str, Any]]:
+    """Fetches several products by their names at once from the Store Server API.
+    Products come back in the requested order; names that don't exist are
+    left out. Up to 100 names per call.
+    """
+    if not names:
+        return []
+    return await cached_get("/products/batch", params={"names": names})
+
+
 @mcp_server.tool()
 async def search_products(
     query: str, skip: int = 0, limit: int = 100
 ) -> List[Dict[str, Any]]:
     """Searches for products via the Store Server API based on a query string."""
     try:
-        return await make_api_request(
-            "GET",
+        return await cached_get(
             "/products/search/",
             params={"query": query, "skip": skip, "limit": limit},
         )
-    except ValueError as e:
-        if "404" in str(e):  # crude check for 404 when no products found
+    except StoreAPIError as e:
+        if e.status_code == 404:  # No products found
             return []
         raise
 
 
+@mcp_server.tool()
+async def get_products_page(
+    cursor: Optional[str] = None, limit: int = 100
+) -> Dict[str, Any]:
+    """Fetches one page of products, ordered by ID, from the Store Server API.
+
+    Pass the returned next_cursor to fetch the following page; it is None on
+    the last page.
+    """
+    params: Dict[str, Any] = {"limit": limit}
+    if cursor is not None:
+        params["cursor"] = cursor
+    return await cached_get("/products/page", params=params)
+
+
+@mcp_server.tool()
+async def search_products_page(
+    query: str, cursor: Optional[str] = None, limit: int = 100
+) -> Dict[str, Any]:
+    """Searches for products via the Store Server API, one page at a time.
+
+    Pass the returned next_cursor to fetch the following page; it is None on
+    the last page.
+    """
+    params: Dict[str, Any] = {"query": query, "limit": limit}
+    if cursor is not None:
+        params["cursor"] = cursor
+    return await cached_get("/products/search/page", params=params)
+
+
 @mcp_server.tool()
 async def add_product(
     name: str, description: Optional[str] = None, inventory: int = 0
 ) -> Dict[str, Any]:
     """Adds a new product via the Store Server API."""
     payload = {"name": name, "description": description, "inventory": inventory}
-    return await make_api_request("POST", "/products/", json_data=payload)
+    product = await make_api_request("POST", "/products/", json_data=payload)
+    invalidate_get_cache()
+    return product
+
+
+@mcp_server.tool()
+async def import_products(data: str, format: str = "csv") -> Dict[str, Any]:
+    """Adds or updates many products at once via the Store Server API.
+    data holds CSV with a header row (name, description, inventory, price) or
+    NDJSON with one product object per line; set format to "csv" or "ndjson".
+    Existing products are matched by name and invalid rows are skipped.
+    Returns the inserted, updated and rejected counts.
+    """
+    content_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    result = await make_api_request(
+        "POST",
+        "/products/bulk",
+        params={"format": format},
+        content=data,
+        headers={"Content-Type": content_type},
+        timeout=STORE_HTTP_IMPORT_TIMEOUT_SECONDS,
+    )
+    invalidate_get_cache()
+    return result
 
 
 @mcp_server.tool()
 async def remove_product(product_id: int) -> Optional[Dict[str, Any]]:
     """Removes a product by its ID via the Store Server API."""
     try:
-        return await make_api_request("DELETE", f"/products/{product_id}")
-    except ValueError as e:
-        if "404" in str(e):
+        product = await make_api_request("DELETE", f"/products/{product_id}")
+    except StoreAPIError as e:
+        if e.status_code == 404:
             return None  # Product not found
         raise
+    invalidate_get_cache()
+    return product
 
 
 @mcp_server.tool()
@@ -128,19 +342,70 @@ async def order_product(
         "quantity": quantity,
         "customer_identifier": customer_identifier,
     }
-    return await make_api_request("POST", "/orders/", json_data=payload)
+    order = await make_api_request("POST", "/orders/", json_data=payload)
+    invalidate_get_cache()
+    return order
 
 
-# TODO: managed async client lifecycle
-# @mcp_server.on_event("startup")
-# async def startup_event():
-#     global async_client
-#     async_client = httpx.AsyncClient(base_url=STORE_SERVER_URL)
+@mcp_server.tool()
+async def get_order_history(
+    customer_identifier: Optional[str] = None,
+    product_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """Fetches orders newest first, one page at a time, from the Store Server API.
+
+    Filter by customer_identifier, product_id or both. Pass the returned
+    next_cursor with the same filters to fetch the following page; it is None
+    on the last page.
+    """
+    params: Dict[str, Any] = {"limit": limit}
+    if customer_identifier is not None:
+        params["customer_identifier"] = customer_identifier
+    if product_id is not None:
+        params["product_id"] = product_id
+    if cursor is not None:
+        params["cursor"] = cursor
+    return await cached_get("/orders/", params=params)
+
+
+@mcp_server.tool()
+async def get_top_selling_products(
+    limit: int = 10, by: str = "units"
+) -> List[Dict[str, Any]]:
+    """Fetches the best selling products with their sales totals.
+    Set by to "units" to rank by units sold or "revenue" to rank by revenue.
+    """
+    return await cached_get("/analytics/top-sellers", params={"by": by, "limit": limit})
+
+
+@mcp_server.tool()
+async def get_low_stock_products(
+    threshold: int = 10, limit: int = 50
+) -> List[Dict[str, Any]]:
+    """Fetches products with at most threshold units in stock, fewest first."""
+    return await cached_get(
+        "/analytics/low-stock", params={"threshold": threshold, "limit": limit}
+    )
+
+
+@mcp_server.tool()
+async def get_revenue_by_product(
+    product_ids: Optional[List[int]] = None, limit: int = 100
+) -> List[Dict[str, Any]]:
+    """Fetches units sold, order count and revenue per product.
+    With product_ids (up to 100), returns those products in the requested
+    order, with zero totals for products never ordered. Without, returns the
+    products with the highest revenue first.
+    """
+    if product_ids is not None:
+        if not product_ids:
+            return []
+        return await cached_get("/analytics/revenue", params={"ids": product_ids})
+    return await cached_get("/analytics/revenue", params={"limit": limit})
 
-# @mcp_server.on_event("shutdown")
-# async def shutdown_event():
-#     await async_client.close()
 
 if __name__ == "__main__":
-    mcp_server.settings.port = 8001
+    mcp_server.settings.port = int(os.getenv("MCP_PORT", "8001"))
     mcp_server.run(transport="sse")
@@ -45,3 +45,12 @@ def validate_exact_text(response, expected_text):
         f"Combined text from SSE chunks: '{combined_text}' "
         f"Raw response body: {body_text[:500]}..."  # Show first 500 chars for debugging
     )
+
+
+def validate_list_contains_id(response, expected_id):
+    """Check that a JSON list response contains an item with the given id."""
+    ids = [item.get("id") for item in response.json()]
+    if expected_id in ids:
+        return True
+
+    raise AssertionError(f"Expected id '{expected_id}' not found in {ids}")